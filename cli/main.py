@@ -9,24 +9,50 @@ def main():
 
     Parses the `--ask` argument from the command line,
     forwards it to `answer_free_form`, and prints a
-    formatted recommendation to stdout.
+    formatted recommendation to stdout. `--refresh-trails`
+    bypasses the local trail catalog snapshot. `--stream` prints
+    each recommendation field as soon as the LLM has produced it.
 
     :return: None
     """
     parser = argparse.ArgumentParser(description="RunBuddy AI – free-form CLI (refactor)")
     parser.add_argument("--ask", type=str, required=True, help="Free-form question")
+    parser.add_argument("--refresh-trails", action="store_true",
+                        help="Re-download the trail sheet instead of using the local snapshot")
+    parser.add_argument("--stream", action="store_true",
+                        help="Print the trail, reason and cautions as they arrive")
     args = parser.parse_args()
 
-    ans = answer_free_form(args.ask)
-
-    print("\n=== RunBuddy Recommendation ===")
+    if not args.stream:
+        ans = answer_free_form(args.ask, refresh_trails=args.refresh_trails)
+        print("\n=== RunBuddy Recommendation ===")
+        print(f"When:     {ans['when']['date']} {ans['when']['time']}")
+        print(f"City:     {ans['city']}")
+        r = ans["result"]
+        print(f"Trail:    {r.get('trail_name')}")
+        print(f"Reason:   {r.get('reason')}")
+        if r.get("cautions"):
+            print(f"Cautions: {r.get('cautions')}")
+        print(f"Source:   {r.get('source')}")
+        return
+
+    labels = {"trail_name": "Trail:    ", "reason": "Reason:   ", "cautions": "Cautions: "}
+    shown = []
+
+    def on_field(name, value):
+        if name not in labels or (name == "cautions" and not value):
+            return
+        if not shown:
+            print("\n=== RunBuddy Recommendation ===")
+        shown.append(name)
+        print(f"{labels[name]}{value}", flush=True)
+
+    ans = answer_free_form(args.ask, refresh_trails=args.refresh_trails, on_field=on_field)
+    if not shown:
+        print("\n=== RunBuddy Recommendation ===")
     print(f"When:     {ans['when']['date']} {ans['when']['time']}")
     print(f"City:     {ans['city']}")
-    r = ans["result"]
-    print(f"Trail:    {r.get('trail_name')}")
-    print(f"Reason:   {r.get('reason')}")
-    if r.get("cautions"):
-        print(f"Cautions: {r.get('cautions')}")
+    print(f"Source:   {ans['result'].get('source')}")
 
 
 if __name__ == "__main__":
@@ -1,22 +1,25 @@
 """RunBuddy orchestrator.
 
-Pipeline:
-  parse → resolve time (user time > calendar > now+1h) → load trails → weather → pick city → LLM.
+Pipeline (dependency graph, independent stages run concurrently):
+  parse ──→ resolve time (user time > calendar > now+1h) ──→ weather ──┐
+  load trails (starts immediately, alongside parse) ──→ prefilter ─────┴→ score/top-K → LLM or rules (deadline)
 This file coordinates services and ensures consistent timezone handling.
 """
 
-from typing import Any, Dict
+from typing import Any, Callable, Dict, List, Optional, Tuple
 import datetime
 from zoneinfo import ZoneInfo
 
-from ..config import LOCAL_TZ, DEFAULT_EVENING, CITY_COORDS
+from ..config import LOCAL_TZ, DEFAULT_EVENING, CITY_COORDS, PIPELINE_MAX_WORKERS
 from ..nlp import parser as parser_mod
-from ..nlp import parser as parser_mod
-from ..integrations.sheets import load_trails_from_sheet
-from ..integrations.calendar import calendar_time_for_date, next_run_event_time
-from ..services.weather import get_weather_forecast
+from ..integrations.trail_catalog import load_trail_catalog_with_version
+from ..integrations.calendar import sync_run_events
+from ..services.weather import get_weather_forecasts
 from ..services.trail_filter import prefilter_trails, pick_best_city_and_weather
-from ..services.recommender import get_trail_recommendation
+from ..services.trail_scoring import shortlist_trails
+from ..services.recommender import recommend_with_deadline
+from ..models.domain import Trail
+from .pipeline import Stage, run_stages
 
 # Ensure we can call parser regardless of the exported name
 def _parse(q: str, allowed_cities: list[str]) -> Dict[str, Any]:
@@ -60,15 +63,16 @@ def resolve_when(question: str, parsed: Dict[str, Any]):
             print(f"[TIME] Failed to parse user time, will try calendar. Error: {e}")
             when_dt = None
 
-    # Step 1b: calendar fallback
+    # Step 1b: calendar fallback (one sync, then both lookups from memory)
     if when_dt is None:
         try:
-            today_dt = calendar_time_for_date(datetime.datetime.now(tz=LOCAL_TZ).date())
+            events = sync_run_events()
+            today_dt = events.time_for_date(datetime.datetime.now(tz=LOCAL_TZ).date())
             if today_dt:
                 when_dt = today_dt
                 print(f"[CAL] Using today's calendar time: {when_dt.isoformat()}" )
             else:
-                nxt = next_run_event_time()
+                nxt = events.next_run_time()
                 if nxt:
                     when_dt = nxt
                     print(f"[CAL] Using next calendar event time: {when_dt.isoformat()}" )
@@ -82,44 +86,88 @@ def resolve_when(question: str, parsed: Dict[str, Any]):
         print(f"[TIME] Defaulting to now+1h: {when_dt.isoformat()}" )
     return when_dt
 
-def answer_free_form(question: str) -> Dict[str, Any]:
-    # Cities we know
-    allowed_cities = list({*CITY_COORDS.keys()})
-    parsed = _parse(question, allowed_cities)
-
-    when_dt = resolve_when(question, parsed)
-
-    trails = load_trails_from_sheet()
-
-    # If the user specified a city, prefilter
-    if parsed.get('city'):
-        trails = prefilter_trails(trails, parsed['city'])
-
-    # Weather snapshot per city
-    city_weather = {}
-    for city, (lat, lon) in CITY_COORDS.items():
-        try:
-            fc = get_weather_forecast(lat, lon, when_dt)
-            if fc:
-                city_weather[city] = fc
-        except Exception as e:
-            print(f"[WX] {city} fetch failed: {e}")
-
+def _stage_parse(question: str, allowed_cities: list[str]) -> Dict[str, Any]:
+    return _parse(question, allowed_cities)
+
+def _stage_trails(refresh_trails: bool) -> Tuple[List[Trail], Optional[str]]:
+    # No stage dependencies: the catalog load starts while NLP parsing is still running.
+    # The version travels with the list so a background refresh can't mismatch them.
+    return load_trail_catalog_with_version(force_refresh=refresh_trails)
+
+def _stage_candidates(parsed: Dict[str, Any], trails: Tuple[List[Trail], Optional[str]]) -> List[Trail]:
+    trails, version = trails
+    # Prefilter on city and any trail constraints from the question (indexed lookup)
+    candidates = prefilter_trails(trails, parsed.get('city'), parsed.get('constraints'), version)
+    print(f"[TRAILS] {len(candidates)}/{len(trails)} candidate trails")
+    return candidates
+
+def _stage_weather(when_dt: datetime.datetime) -> Dict[str, Dict]:
+    # Weather snapshot per city (one batched request for all cities)
+    return get_weather_forecasts(CITY_COORDS, when_dt)
+
+def _stage_recommend(parsed: Dict[str, Any], when_dt: datetime.datetime,
+                     city_weather: Dict[str, Dict], candidates: List[Trail],
+                     trails: Tuple[List[Trail], Optional[str]],
+                     on_field: Optional[Callable[[str, Any], None]]) -> Dict[str, Any]:
+    trails, version = trails
     chosen_city, weather_snapshot = pick_best_city_and_weather(city_weather)
 
-    # Ask the LLM to choose among candidate trails using current weather snapshot.
-    result = get_trail_recommendation(
+    # Score locally and only send the best RECOMMENDER_TOP_K trails to the LLM
+    # (features are cached per catalog version; candidates are rows of `trails`)
+    shortlist = shortlist_trails(candidates, weather_snapshot or {}, city_weather=city_weather,
+                                 catalog=trails, version=version)
+    if len(shortlist) < len(candidates):
+        print(f"[TRAILS] Shortlisted {len(shortlist)}/{len(candidates)} by weather score")
+
+    # Ask the LLM to choose among candidate trails using current weather snapshot;
+    # past RECOMMENDER_DEADLINE_S the rule-based pick from the local scores is used.
+    result = recommend_with_deadline(
         calendar_event={"start": when_dt.isoformat(), "summary": ""},
         weather_forecast=weather_snapshot or {},
-        trail_conditions=trails,
+        trail_conditions=shortlist,
+        city_weather=city_weather,
+        stream=on_field is not None,
+        on_field=on_field,
     )
     if not result.get("location"):
         result["location"] = parsed.get('city') or chosen_city
+    return {"city": parsed.get('city') or chosen_city, "result": result}
+
+# Explicit dependency graph; each stage runs as soon as its inputs exist.
+ANSWER_PIPELINE = (
+    Stage("parsed", _stage_parse, ("question", "allowed_cities")),
+    Stage("trails", _stage_trails, ("refresh_trails",)),
+    Stage("when_dt", resolve_when, ("question", "parsed")),
+    Stage("candidates", _stage_candidates, ("parsed", "trails")),
+    Stage("city_weather", _stage_weather, ("when_dt",)),
+    Stage("answer", _stage_recommend, ("parsed", "when_dt", "city_weather", "candidates", "trails", "on_field")),
+)
+
+def answer_free_form(question: str, refresh_trails: bool = False,
+                     on_field: Optional[Callable[[str, Any], None]] = None) -> Dict[str, Any]:
+    """Answer a free-form question.
+
+    :param on_field: If given, the LLM answer is streamed and this is called
+        with (field, value) as each recommendation field completes.
+    """
+    # Cities we know
+    allowed_cities = list({*CITY_COORDS.keys()})
+
+    timings: Dict[str, float] = {}
+    out = run_stages(
+        ANSWER_PIPELINE,
+        {"question": question, "allowed_cities": allowed_cities, "refresh_trails": refresh_trails,
+         "on_field": on_field},
+        max_workers=PIPELINE_MAX_WORKERS,
+        timings=timings,
+    )
+    print("[PIPE] " + ", ".join(f"{k}={v * 1000:.0f}ms" for k, v in timings.items()))
 
+    parsed, when_dt, answer = out["parsed"], out["when_dt"], out["answer"]
     return {
         "intent": parsed.get('intent'),
         "question": question,
         "when": {"date": when_dt.date().isoformat(), "time": when_dt.strftime('%H:%M')},
-        "city": parsed.get('city') or chosen_city,
-        "result": result,
+        "city": answer["city"],
+        "result": answer["result"],
     }
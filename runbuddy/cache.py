@@ -0,0 +1,188 @@
+"""Small in-process caches shared by RunBuddy services.
+
+- `TTLCache`: thread-safe LRU with per-entry expiry and hit/miss counters.
+- `SQLiteStore`: optional on-disk backend so entries survive restarts.
+  The file is only created on first use, so importing a service that owns
+  a cache touches nothing on disk.
+Values written to disk must be JSON-serializable.
+"""
+
+import json
+import sqlite3
+import threading
+import time
+from collections import OrderedDict
+from pathlib import Path
+from typing import Any, Dict, Optional, Tuple
+
+_MISSING = object()
+
+
+class SQLiteStore:
+    """Key/value table in a local SQLite file with expiry and a row cap."""
+
+    def __init__(self, path: str | Path, table: str, max_rows: int = 10_000):
+        """Describe the backing table; the file is opened on first access.
+
+        :param path: SQLite file path; parent directories are created when opened.
+        :param table: Table name (one table per cache).
+        :param max_rows: Oldest rows beyond this count are dropped on write.
+        """
+        self.path = Path(path).expanduser()
+        self.table = table
+        self.max_rows = max_rows
+        self._lock = threading.Lock()
+        self._conn: Optional[sqlite3.Connection] = None
+
+    @property
+    def conn(self) -> sqlite3.Connection:
+        """Connection to the backing file, opening it (and the table) on first use."""
+        if self._conn is None:
+            try:
+                self.path.parent.mkdir(parents=True, exist_ok=True)
+            except OSError as e:
+                raise sqlite3.OperationalError(f"cannot create {self.path.parent}: {e}") from e
+            conn = sqlite3.connect(str(self.path), check_same_thread=False)
+            with conn:
+                conn.execute(
+                    f"CREATE TABLE IF NOT EXISTS {self.table} ("
+                    "key TEXT PRIMARY KEY, value TEXT NOT NULL, "
+                    "expires_at REAL, stored_at REAL NOT NULL)"
+                )
+            self._conn = conn
+        return self._conn
+
+    def get(self, key: str) -> Optional[Tuple[Any, Optional[float]]]:
+        """Return (value, expires_at) for a live key, or None."""
+        with self._lock:
+            row = self.conn.execute(
+                f"SELECT value, expires_at FROM {self.table} WHERE key = ?", (key,)
+            ).fetchone()
+        if not row:
+            return None
+        value, expires_at = row
+        if expires_at is not None and expires_at <= time.time():
+            self.delete(key)
+            return None
+        return json.loads(value), expires_at
+
+    def set(self, key: str, value: Any, expires_at: Optional[float]) -> None:
+        """Insert or replace a key, then prune expired and excess rows."""
+        now = time.time()
+        with self._lock, self.conn:
+            self._conn.execute(
+                f"INSERT OR REPLACE INTO {self.table} (key, value, expires_at, stored_at) "
+                "VALUES (?, ?, ?, ?)",
+                (key, json.dumps(value, ensure_ascii=False), expires_at, now),
+            )
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE expires_at IS NOT NULL AND expires_at <= ?", (now,)
+            )
+            self._conn.execute(
+                f"DELETE FROM {self.table} WHERE key IN ("
+                f"SELECT key FROM {self.table} ORDER BY stored_at DESC LIMIT -1 OFFSET ?)",
+                (self.max_rows,),
+            )
+
+    def delete(self, key: Optional[str] = None) -> None:
+        """Delete one key, or every row when `key` is None."""
+        with self._lock, self.conn:
+            if key is None:
+                self._conn.execute(f"DELETE FROM {self.table}")
+            else:
+                self._conn.execute(f"DELETE FROM {self.table} WHERE key = ?", (key,))
+
+
+class TTLCache:
+    """Bounded LRU cache with per-entry expiry and an optional disk tier.
+
+    Memory is checked first; on a miss the disk store (if any) is consulted
+    and a live row is promoted back into memory.
+    """
+
+    def __init__(self, max_entries: int = 256, ttl_s: Optional[float] = None,
+                 disk: Optional[SQLiteStore] = None):
+        """Create an empty cache.
+
+        :param max_entries: In-memory capacity; least recently used entries are evicted.
+        :param ttl_s: Default lifetime in seconds when `set` gets no explicit expiry (None = forever).
+        :param disk: Optional persistent backend.
+        """
+        self.max_entries = max_entries
+        self.ttl_s = ttl_s
+        self.disk = disk
+        self._data: "OrderedDict[str, Tuple[Any, Optional[float]]]" = OrderedDict()
+        self._lock = threading.Lock()
+        self._stats = {"hits": 0, "disk_hits": 0, "misses": 0, "evictions": 0, "expired": 0}
+
+    def get(self, key: str, default: Any = None) -> Any:
+        """Return a live value for `key`, else `default`."""
+        now = time.time()
+        with self._lock:
+            entry = self._data.get(key, _MISSING)
+            if entry is not _MISSING:
+                value, expires_at = entry
+                if expires_at is None or expires_at > now:
+                    self._data.move_to_end(key)
+                    self._stats["hits"] += 1
+                    return value
+                del self._data[key]
+                self._stats["expired"] += 1
+
+        if self.disk is not None:
+            try:
+                row = self.disk.get(key)
+            except sqlite3.Error:
+                row = None
+            if row is not None:
+                value, expires_at = row
+                with self._lock:
+                    self._put(key, value, expires_at)
+                    self._stats["disk_hits"] += 1
+                return value
+
+        with self._lock:
+            self._stats["misses"] += 1
+        return default
+
+    def set(self, key: str, value: Any, expires_at: Optional[float] = None) -> None:
+        """Store a value; `expires_at` is an epoch timestamp overriding the default TTL."""
+        if expires_at is None and self.ttl_s is not None:
+            expires_at = time.time() + self.ttl_s
+        with self._lock:
+            self._put(key, value, expires_at)
+        if self.disk is not None:
+            try:
+                self.disk.set(key, value, expires_at)
+            except sqlite3.Error as e:
+                print(f"[CACHE] disk write failed for {self.disk.table}: {e}")
+
+    def invalidate(self, key: Optional[str] = None) -> None:
+        """Drop one key, or everything (memory and disk) when `key` is None."""
+        with self._lock:
+            if key is None:
+                self._data.clear()
+            else:
+                self._data.pop(key, None)
+        if self.disk is not None:
+            try:
+                self.disk.delete(key)
+            except sqlite3.Error as e:
+                print(f"[CACHE] disk delete failed for {self.disk.table}: {e}")
+
+    def stats(self) -> Dict[str, Any]:
+        """Counters plus current size and hit rate."""
+        with self._lock:
+            out: Dict[str, Any] = dict(self._stats)
+            out["size"] = len(self._data)
+        lookups = out["hits"] + out["disk_hits"] + out["misses"]
+        out["hit_rate"] = ((out["hits"] + out["disk_hits"]) / lookups) if lookups else 0.0
+        return out
+
+    def _put(self, key: str, value: Any, expires_at: Optional[float]) -> None:
+        # Caller holds self._lock.
+        self._data[key] = (value, expires_at)
+        self._data.move_to_end(key)
+        while len(self._data) > self.max_entries:
+            self._data.popitem(last=False)
+            self._stats["evictions"] += 1
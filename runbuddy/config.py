@@ -1,21 +1,87 @@
 """Central configuration for RunBuddy (env, constants, cities)."""
 
 import os
+from pathlib import Path
 from zoneinfo import ZoneInfo
 
 LOCAL_TZ = ZoneInfo(os.getenv("LOCAL_TZ", "America/Toronto"))
 DUCKLING_URL = os.getenv("DUCKLING_URL", "http://localhost:8000/parse")
+# Duckling has a local fallback (dateparser), so failed calls are not retried by default
+DUCKLING_RETRIES = int(os.getenv("DUCKLING_RETRIES", "0"))
+DUCKLING_TIMEOUT_S = float(os.getenv("DUCKLING_TIMEOUT_S", "3.0"))
+# Circuit breaker: skip Duckling after N consecutive failures, probe again after the timeout
+DUCKLING_FAILURE_THRESHOLD = int(os.getenv("DUCKLING_FAILURE_THRESHOLD", "3"))
+DUCKLING_RESET_TIMEOUT_S = float(os.getenv("DUCKLING_RESET_TIMEOUT_S", "30"))
+DUCKLING_HALF_OPEN_PROBES = int(os.getenv("DUCKLING_HALF_OPEN_PROBES", "1"))
 GROQ_API_KEY = os.getenv("GROQ_API_KEY", "")
 
+# spaCy is only used for NER, so the other pipeline components are not loaded
+SPACY_MODEL = os.getenv("SPACY_MODEL", "en_core_web_sm")
+SPACY_EXCLUDE = [c for c in os.getenv(
+    "SPACY_EXCLUDE", "tok2vec,tagger,parser,attribute_ruler,lemmatizer,senter"
+).split(",") if c]
+# Parse cache: LRU size, entry lifetime and reference-time bucket width
+PARSE_CACHE_MAX_ENTRIES = int(os.getenv("PARSE_CACHE_MAX_ENTRIES", "1024"))
+PARSE_CACHE_TTL_S = float(os.getenv("PARSE_CACHE_TTL_S", "900"))
+PARSE_CACHE_BUCKET_S = int(os.getenv("PARSE_CACHE_BUCKET_S", "300"))
+
+# Batch parsing: spaCy nlp.pipe batch size
+PARSE_BATCH_SIZE = int(os.getenv("PARSE_BATCH_SIZE", "64"))
+# Place-name gazetteer (city -> aliases/neighbourhoods) matched before NER
+GAZETTEER_PATH = os.getenv("GAZETTEER_PATH", str(Path(__file__).resolve().parent / "nlp" / "gazetteer.json"))
+
+# Intent classifier: training data, serialized artifact and minimum confidence
+INTENT_TRAINING_DATA = os.getenv("INTENT_TRAINING_DATA", "training_data.jsonl")
+INTENT_MODEL_PATH = os.getenv("INTENT_MODEL_PATH", str(Path.home() / ".cache" / "runbuddy" / "intent_model.joblib"))
+INTENT_CONFIDENCE_THRESHOLD = float(os.getenv("INTENT_CONFIDENCE_THRESHOLD", "0.45"))
+# "batch" = TF-IDF model retrained on data changes; "online" = hashed SGD model
+# updated in mini-batches from the feedback log and checkpointed to disk
+INTENT_BACKEND = os.getenv("INTENT_BACKEND", "batch").lower()
+INTENT_FEEDBACK_LOG = os.getenv("INTENT_FEEDBACK_LOG", "intent_feedback.jsonl")
+INTENT_ONLINE_CHECKPOINT = os.getenv("INTENT_ONLINE_CHECKPOINT", str(Path.home() / ".cache" / "runbuddy" / "intent_online.joblib"))
+INTENT_HASH_BITS = int(os.getenv("INTENT_HASH_BITS", "18"))  # 2**18 features, fixed memory
+INTENT_ONLINE_BATCH_SIZE = int(os.getenv("INTENT_ONLINE_BATCH_SIZE", "256"))
+INTENT_CHECKPOINT_EVERY = int(os.getenv("INTENT_CHECKPOINT_EVERY", "10"))  # mini-batches
+# Labels the online model can emit (fixed up front: partial_fit cannot add classes later)
+INTENT_LABELS = [l for l in os.getenv(
+    "INTENT_LABELS", "where_today,which_location_today,where_tomorrow,free_form"
+).split(",") if l]
+# Startup budget (ms) enforced by `python -m runbuddy.import_budget`
+IMPORT_BUDGET_MS = float(os.getenv("IMPORT_BUDGET_MS", "1500"))
+
 DEFAULT_EVENING = os.getenv("DEFAULT_EVENING", "19:00")
 
+# Trail catalog snapshot (local copy of the Google Sheet reused across runs).
+# Revalidation: "ttl" re-downloads after TRAIL_CATALOG_TTL_S; "drive" first compares
+# the spreadsheet's Drive modifiedTime (needs the drive.metadata.readonly scope).
+TRAIL_CATALOG_PATH = os.getenv("TRAIL_CATALOG_PATH", str(Path.home() / ".cache" / "runbuddy" / "trail_catalog.json"))
+TRAIL_CATALOG_REVALIDATE = os.getenv("TRAIL_CATALOG_REVALIDATE", "ttl").lower()
+TRAIL_CATALOG_TTL_S = int(os.getenv("TRAIL_CATALOG_TTL_S", "900"))
+# Past the TTL but within this window, serve the snapshot and refresh in the background
+TRAIL_CATALOG_MAX_STALE_S = int(os.getenv("TRAIL_CATALOG_MAX_STALE_S", "86400"))
+
 SCOPES = [
     "https://www.googleapis.com/auth/spreadsheets.readonly",
     "https://www.googleapis.com/auth/calendar.readonly",
 ]
+if TRAIL_CATALOG_REVALIDATE == "drive":
+    SCOPES.append("https://www.googleapis.com/auth/drive.metadata.readonly")
+
+# Calendar run-event index and syncToken, persisted so later runs sync incrementally
+# (empty string = keep them in memory only)
+CALENDAR_STATE_PATH = os.getenv("CALENDAR_STATE_PATH", str(Path.home() / ".cache" / "runbuddy" / "calendar_events.json"))
+
+# Refresh Google access tokens in the background this long before they expire
+GOOGLE_TOKEN_REFRESH_MARGIN_S = int(os.getenv("GOOGLE_TOKEN_REFRESH_MARGIN_S", "300"))
 
 GOOGLE_SHEET_ID = os.getenv("GOOGLE_SHEET_ID", "1eqmM0XgmAXBJlfgetFm_y6lWoGW9tHHKH_0Z91WauCk")
-SHEET_RANGE = os.getenv("SHEET_RANGE", "Sheet1!A1:L999")
+# Trail sheet layout: tab + column span; rows are read in windows until the data ends.
+SHEET_TAB = os.getenv("SHEET_TAB", "Sheet1")
+SHEET_FIRST_COLUMN = os.getenv("SHEET_FIRST_COLUMN", "A")
+SHEET_LAST_COLUMN = os.getenv("SHEET_LAST_COLUMN", "L")
+SHEET_PAGE_ROWS = int(os.getenv("SHEET_PAGE_ROWS", "500"))
+# Row windows fetched per values.batchGet call
+SHEET_PAGES_PER_CALL = int(os.getenv("SHEET_PAGES_PER_CALL", "4"))
 
 # Cities (can also be loaded from a sheet later)
 ALLOWED_CITIES = set(os.getenv("ALLOWED_CITIES", "Scarborough,Markham,Pickering").split(","))
@@ -24,3 +90,47 @@ CITY_COORDS = {
     "Markham":     (43.8800, -79.2700),
     "Pickering":   (43.8400, -79.0300),
 }
+
+# Orchestrator: thread pool size for concurrent pipeline stages
+PIPELINE_MAX_WORKERS = int(os.getenv("PIPELINE_MAX_WORKERS", "4"))
+
+# Shared HTTP transport (keep-alive session per host)
+HTTP_POOL_CONNECTIONS = int(os.getenv("HTTP_POOL_CONNECTIONS", "4"))
+HTTP_POOL_MAXSIZE = int(os.getenv("HTTP_POOL_MAXSIZE", "10"))
+HTTP_TIMEOUT_S = float(os.getenv("HTTP_TIMEOUT_S", "5"))
+HTTP_RETRIES = int(os.getenv("HTTP_RETRIES", "2"))
+HTTP_BACKOFF_S = float(os.getenv("HTTP_BACKOFF_S", "0.3"))
+
+# Recommender: trails sent to the LLM after local scoring (0 = send every candidate)
+RECOMMENDER_TOP_K = int(os.getenv("RECOMMENDER_TOP_K", "5"))
+# Context sent to the LLM: "compact" table or "json"; compact context is shrunk to the token budget
+RECOMMENDER_CONTEXT_FORMAT = os.getenv("RECOMMENDER_CONTEXT_FORMAT", "compact").lower()
+RECOMMENDER_CONTEXT_TOKEN_BUDGET = int(os.getenv("RECOMMENDER_CONTEXT_TOKEN_BUDGET", "600"))
+# Recommendation deadline: past it the rule-based pick (local trail scores) is returned.
+# After RECOMMENDER_HEDGE_AFTER_S without an answer a second request goes to the cheaper
+# hedge model (0 = no hedge); whichever LLM answers first within the deadline wins.
+RECOMMENDER_MODEL = os.getenv("RECOMMENDER_MODEL", "llama3-70b-8192")
+RECOMMENDER_DEADLINE_S = float(os.getenv("RECOMMENDER_DEADLINE_S", "8"))
+RECOMMENDER_HEDGE_AFTER_S = float(os.getenv("RECOMMENDER_HEDGE_AFTER_S", "3"))
+RECOMMENDER_HEDGE_MODEL = os.getenv("RECOMMENDER_HEDGE_MODEL", "llama3-8b-8192")
+# Recommendation cache: answers reused for the same candidates, weather bands and time-of-day bucket
+RECOMMENDATION_CACHE_MAX_ENTRIES = int(os.getenv("RECOMMENDATION_CACHE_MAX_ENTRIES", "512"))
+RECOMMENDATION_CACHE_TTL_S = float(os.getenv("RECOMMENDATION_CACHE_TTL_S", "3600"))
+RECOMMENDATION_CACHE_MAX_ROWS = int(os.getenv("RECOMMENDATION_CACHE_MAX_ROWS", "5000"))
+# SQLite file for the on-disk tier; set to an empty string to keep it in memory only.
+RECOMMENDATION_CACHE_PATH = os.getenv("RECOMMENDATION_CACHE_PATH", str(Path.home() / ".cache" / "runbuddy" / "recommendations.sqlite"))
+RECOMMENDATION_TEMP_BAND_C = float(os.getenv("RECOMMENDATION_TEMP_BAND_C", "4"))
+RECOMMENDATION_TIME_BUCKET_H = int(os.getenv("RECOMMENDATION_TIME_BUCKET_H", "3"))
+
+# Weather: max locations per Open-Meteo request (larger lists are chunked)
+WEATHER_BATCH_SIZE = int(os.getenv("WEATHER_BATCH_SIZE", "50"))
+
+# Forecast cache: full hourly day per (rounded lat/lon, date).
+# Entries expire at the next model refresh boundary (+ publish lag).
+FORECAST_GRID_DECIMALS = int(os.getenv("FORECAST_GRID_DECIMALS", "2"))
+FORECAST_MODEL_REFRESH_S = int(os.getenv("FORECAST_MODEL_REFRESH_S", "3600"))
+FORECAST_PUBLISH_LAG_S = int(os.getenv("FORECAST_PUBLISH_LAG_S", "900"))
+FORECAST_CACHE_MAX_ENTRIES = int(os.getenv("FORECAST_CACHE_MAX_ENTRIES", "256"))
+FORECAST_CACHE_MAX_ROWS = int(os.getenv("FORECAST_CACHE_MAX_ROWS", "5000"))
+# SQLite file for the on-disk tier; set to an empty string to keep it in memory only.
+FORECAST_CACHE_PATH = os.getenv("FORECAST_CACHE_PATH", str(Path.home() / ".cache" / "runbuddy" / "forecasts.sqlite"))
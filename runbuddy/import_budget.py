@@ -0,0 +1,81 @@
+"""Import-time budget check for RunBuddy startup.
+
+Measures, in fresh interpreters (`python -X importtime`), how much each
+heavy dependency adds to startup and whether importing the orchestrator
+stays within IMPORT_BUDGET_MS.
+
+Usage: python -m runbuddy.import_budget [--budget-ms N]
+Exits with status 1 when the orchestrator import exceeds the budget.
+"""
+
+import argparse
+import subprocess
+import sys
+from typing import Dict, Iterable, Optional
+
+from .config import IMPORT_BUDGET_MS
+
+# Third-party dependencies worth tracking, plus our own entry points.
+DEPENDENCIES = (
+    "spacy",
+    "dateparser",
+    "sklearn",
+    "groq",
+    "googleapiclient.discovery",
+    "requests",
+    "runbuddy.nlp.parser",
+    "runbuddy.app.runner",
+)
+ENTRYPOINT = "runbuddy.app.runner"
+
+
+def import_cost_ms(module: str) -> Optional[float]:
+    """Cumulative import time of `module` in a fresh interpreter, in ms (None if it fails)."""
+    proc = subprocess.run(
+        [sys.executable, "-X", "importtime", "-c", f"import {module}"],
+        capture_output=True,
+        text=True,
+    )
+    if proc.returncode != 0:
+        return None
+    # Lines look like: "import time:   self [us] | cumulative | imported package"
+    for line in proc.stderr.splitlines():
+        parts = line.split("|")
+        if len(parts) == 3 and parts[2].strip() == module:
+            try:
+                return int(parts[1].strip()) / 1000.0
+            except ValueError:
+                return None
+    return None
+
+
+def measure_import_costs(modules: Iterable[str] = DEPENDENCIES) -> Dict[str, Optional[float]]:
+    """Import cost per module in ms."""
+    return {m: import_cost_ms(m) for m in modules}
+
+
+def main(argv: Optional[list] = None) -> int:
+    """Print per-dependency import costs and enforce the entrypoint budget.
+
+    :return: Process exit status (0 within budget, 1 over budget or unmeasurable).
+    """
+    ap = argparse.ArgumentParser(description="RunBuddy import-time budget check")
+    ap.add_argument("--budget-ms", type=float, default=IMPORT_BUDGET_MS)
+    args = ap.parse_args(argv)
+
+    costs = measure_import_costs()
+    for module, ms in sorted(costs.items(), key=lambda kv: -(kv[1] or 0)):
+        shown = "unavailable" if ms is None else f"{ms:8.1f} ms"
+        print(f"[IMPORT] {module:<28} {shown}")
+
+    total = costs.get(ENTRYPOINT)
+    if total is None:
+        print(f"[IMPORT] Could not import {ENTRYPOINT}")
+        return 1
+    status = "OK" if total <= args.budget_ms else "OVER BUDGET"
+    print(f"[IMPORT] {ENTRYPOINT}: {total:.1f} ms (budget {args.budget_ms:.0f} ms) {status}")
+    return 0 if total <= args.budget_ms else 1
+
+
+if __name__ == "__main__":
+    sys.exit(main())
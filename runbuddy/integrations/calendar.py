@@ -2,18 +2,28 @@
 
 Selects upcoming 'run/jog' events, normalizes their starts,
 and provides per-date lookup with LOCAL_TZ awareness.
+
+`RunEventStore` keeps run events in memory, sorted by start time, and
+stays current through the Calendar API's incremental sync (`syncToken`),
+so a question costs one (usually tiny) list call however many lookups
+it makes. The token and the index are saved to CALENDAR_STATE_PATH, so
+only the very first run pays for the full calendar listing.
 """
 
 import datetime
-from typing import Any, Dict, List, Optional
+import json
+import os
+import threading
+from bisect import bisect_left
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
 from zoneinfo import ZoneInfo
-from googleapiclient.discovery import build
-from ..config import LOCAL_TZ
-from .google_auth import authenticate_google_api
+from googleapiclient.errors import HttpError
+from ..config import CALENDAR_STATE_PATH, LOCAL_TZ
+from .google_auth import get_google_service
 
 def get_upcoming_run_events(max_results: int = 10) -> List[Dict[str, Any]]:
-    creds = authenticate_google_api()
-    service = build("calendar", "v3", credentials=creds)
+    service = get_google_service("calendar", "v3")
     now = datetime.datetime.now(tz=LOCAL_TZ).isoformat()
     events_result = service.events().list(
         calendarId='primary', timeMin=now, maxResults=max_results, singleEvents=True, orderBy='startTime'
@@ -57,26 +67,174 @@ def normalize_calendar_event(event: Dict[str, Any]) -> Dict[str, str]:
     start_iso = start.get("dateTime") or start.get("date") + "T00:00:00Z"
     return {"start": start_iso, "summary": event.get("summary", "")}
 
-def calendar_time_for_date(target_date: datetime.date) -> Optional[datetime.datetime]:
-    events = get_upcoming_run_events(max_results=25)
-    for e in events:
-        start = e.get("start", {})
-        if "dateTime" in start:
-            dt = datetime.datetime.fromisoformat(start["dateTime"].replace("Z", "+00:00"))
-            dt_local = dt.astimezone(LOCAL_TZ)
-            if dt_local.date() == target_date:
-                return dt_local
-        elif "date" in start and start["date"] == target_date.isoformat():
-            return datetime.datetime(target_date.year, target_date.month, target_date.day, 7, 0, tzinfo=LOCAL_TZ)
-    return None
+def _is_run_event(event: Dict[str, Any]) -> bool:
+    summary = (event.get("summary") or "").lower()
+    return event.get("status") != "cancelled" and ("run" in summary or "jog" in summary)
 
-def next_run_event_time() -> Optional[datetime.datetime]:
-    evts = get_upcoming_run_events(max_results=25)
-    nxt = select_next_run_event(evts)
-    if not nxt:
-        return None
-    start = normalize_calendar_event(nxt).get("start")
-    if start:
-        dt = datetime.datetime.fromisoformat(start.replace("Z", "+00:00"))
+def _event_bound(edge: Dict[str, Any]) -> Optional[datetime.datetime]:
+    """Local datetime of an event start/end; all-day dates map to 07:00 like elsewhere."""
+    if "dateTime" in edge:
+        dt = datetime.datetime.fromisoformat(edge["dateTime"].replace("Z", "+00:00"))
         return dt.astimezone(LOCAL_TZ)
+    if "date" in edge:
+        d = datetime.date.fromisoformat(edge["date"])
+        return datetime.datetime(d.year, d.month, d.day, 7, 0, tzinfo=LOCAL_TZ)
     return None
+
+# Longest event we expect to be "in progress" when looking up the next run.
+_MAX_EVENT_SPAN = datetime.timedelta(days=1)
+
+class RunEventStore:
+    """Index of upcoming run/jog events kept current with incremental sync.
+
+    The first `sync()` lists the calendar (singleEvents, no time bounds,
+    since the API rejects timeMin/orderBy together with sync tokens) and
+    keeps only run/jog events that have not finished. Later calls send
+    the stored `syncToken` and apply just the changes; a 410 Gone resets
+    to a full sync. With a `state_path`, the token and the index are
+    loaded from and saved to that JSON file, so a new process resumes
+    incrementally instead of listing the whole calendar again.
+    """
+
+    def __init__(self, calendar_id: str = "primary", page_size: int = 250,
+                 state_path: Optional[str] = None):
+        self.calendar_id = calendar_id
+        self.page_size = page_size
+        self.state_path = Path(state_path).expanduser() if state_path else None
+        self._lock = threading.Lock()
+        self._loaded = False
+        self._sync_token: Optional[str] = None
+        self._events: Dict[str, Tuple[datetime.datetime, datetime.datetime]] = {}
+        self._index: List[Tuple[datetime.datetime, str]] = []
+
+    def sync(self, now: Optional[datetime.datetime] = None) -> None:
+        """Fetch changes since the last sync (or everything on the first call ever)."""
+        service = get_google_service("calendar", "v3")
+        now = now or datetime.datetime.now(tz=LOCAL_TZ)
+        with self._lock:
+            if not self._loaded:
+                self._load_state()
+                self._loaded = True
+            token_before = self._sync_token
+            try:
+                self._pull(service, self._sync_token)
+            except HttpError as e:
+                if getattr(e, "resp", None) is None or e.resp.status != 410:
+                    raise
+                # Sync token expired: start over with a full sync.
+                self._sync_token = None
+                self._events.clear()
+                self._pull(service, None)
+            self._drop_finished(now)
+            self._index = sorted((start, eid) for eid, (start, _) in self._events.items())
+            if self._sync_token != token_before:
+                self._save_state()
+
+    def _drop_finished(self, now: datetime.datetime) -> None:
+        """Forget events that have already ended (they can never answer a lookup)."""
+        for eid in [eid for eid, (_, end) in self._events.items() if end <= now]:
+            del self._events[eid]
+
+    def _load_state(self) -> None:
+        if self.state_path is None or not self.state_path.exists():
+            return
+        try:
+            state = json.loads(self.state_path.read_text())
+            if state.get("calendar_id") != self.calendar_id:
+                return
+            events = {
+                eid: (datetime.datetime.fromisoformat(start), datetime.datetime.fromisoformat(end))
+                for eid, (start, end) in state.get("events", {}).items()
+            }
+        except (OSError, ValueError, TypeError) as e:
+            print(f"[CAL] Ignoring unreadable calendar state {self.state_path}: {e}")
+            return
+        self._events = events
+        self._sync_token = state.get("sync_token")
+
+    def _save_state(self) -> None:
+        if self.state_path is None:
+            return
+        state = {
+            "calendar_id": self.calendar_id,
+            "sync_token": self._sync_token,
+            "events": {eid: [start.isoformat(), end.isoformat()] for eid, (start, end) in self._events.items()},
+        }
+        try:
+            self.state_path.parent.mkdir(parents=True, exist_ok=True)
+            tmp = self.state_path.with_suffix(self.state_path.suffix + ".tmp")
+            tmp.write_text(json.dumps(state))
+            os.replace(tmp, self.state_path)
+        except OSError as e:
+            print(f"[CAL] Could not persist calendar state: {e}")
+
+    def _pull(self, service: Any, sync_token: Optional[str]) -> None:
+        page_token = None
+        while True:
+            kwargs: Dict[str, Any] = {
+                "calendarId": self.calendar_id,
+                "singleEvents": True,
+                "maxResults": self.page_size,
+                "showDeleted": sync_token is not None,
+            }
+            if sync_token:
+                kwargs["syncToken"] = sync_token
+            if page_token:
+                kwargs["pageToken"] = page_token
+            resp = service.events().list(**kwargs).execute()
+            for event in resp.get("items", []):
+                self._apply(event)
+            page_token = resp.get("nextPageToken")
+            if not page_token:
+                self._sync_token = resp.get("nextSyncToken")
+                return
+
+    def _apply(self, event: Dict[str, Any]) -> None:
+        eid = event.get("id")
+        if not eid:
+            return
+        start = _event_bound(event.get("start", {}))
+        if not _is_run_event(event) or start is None:
+            self._events.pop(eid, None)
+            return
+        end = _event_bound(event.get("end", {})) or start
+        self._events[eid] = (start, max(start, end))
+
+    def _upcoming(self, now: datetime.datetime):
+        """Yield (start, end) of events not yet finished, in start order."""
+        i = bisect_left(self._index, (now - _MAX_EVENT_SPAN, ""))
+        for start, eid in self._index[i:]:
+            _, end = self._events[eid]
+            if end > now or start >= now:
+                yield start, end
+
+    def time_for_date(self, target_date: datetime.date,
+                      now: Optional[datetime.datetime] = None) -> Optional[datetime.datetime]:
+        """Start of the first unfinished run event on `target_date`, if any."""
+        now = now or datetime.datetime.now(tz=LOCAL_TZ)
+        with self._lock:
+            for start, _ in self._upcoming(now):
+                if start.date() == target_date:
+                    return start
+                if start.date() > target_date:
+                    break
+        return None
+
+    def next_run_time(self, now: Optional[datetime.datetime] = None) -> Optional[datetime.datetime]:
+        """Start of the earliest unfinished run event."""
+        now = now or datetime.datetime.now(tz=LOCAL_TZ)
+        with self._lock:
+            return next((start for start, _ in self._upcoming(now)), None)
+
+_STORE = RunEventStore(state_path=CALENDAR_STATE_PATH or None)
+
+def sync_run_events() -> RunEventStore:
+    """Bring the process-wide run event store up to date and return it."""
+    _STORE.sync()
+    return _STORE
+
+def calendar_time_for_date(target_date: datetime.date) -> Optional[datetime.datetime]:
+    return sync_run_events().time_for_date(target_date)
+
+def next_run_event_time() -> Optional[datetime.datetime]:
+    return sync_run_events().next_run_time()
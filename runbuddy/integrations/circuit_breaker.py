@@ -0,0 +1,106 @@
+"""Thread-safe circuit breaker for flaky upstream services.
+
+closed    → calls pass; `failure_threshold` consecutive failures trip it open.
+open      → calls are rejected instantly for `reset_timeout_s`.
+half_open → up to `half_open_probes` calls are let through as probes;
+            a success closes the breaker, a failure re-opens it.
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional
+
+CLOSED, OPEN, HALF_OPEN = "closed", "open", "half_open"
+
+
+class CircuitBreaker:
+    """Consecutive-failure breaker with half-open probing and counters."""
+
+    def __init__(self, name: str, failure_threshold: int = 3,
+                 reset_timeout_s: float = 30.0, half_open_probes: int = 1):
+        """
+        :param name: Label used in logs and monitoring snapshots.
+        :param failure_threshold: Consecutive failures that trip the breaker.
+        :param reset_timeout_s: Time spent open before probing again.
+        :param half_open_probes: Concurrent probe calls allowed while half-open.
+        """
+        self.name = name
+        self.failure_threshold = max(1, failure_threshold)
+        self.reset_timeout_s = reset_timeout_s
+        self.half_open_probes = max(1, half_open_probes)
+        self._lock = threading.Lock()
+        self._state = CLOSED
+        self._consecutive_failures = 0
+        self._opened_at: Optional[float] = None
+        self._probes_in_flight = 0
+        self._counters = {"successes": 0, "failures": 0, "rejected": 0, "trips": 0}
+
+    def _refresh_state(self) -> None:
+        # Caller holds self._lock.
+        if self._state == OPEN and self._opened_at is not None \
+                and time.monotonic() - self._opened_at >= self.reset_timeout_s:
+            self._state = HALF_OPEN
+            self._probes_in_flight = 0
+
+    @property
+    def state(self) -> str:
+        with self._lock:
+            self._refresh_state()
+            return self._state
+
+    def allow_request(self) -> bool:
+        """True if a call may proceed now; False means skip the service instantly."""
+        with self._lock:
+            self._refresh_state()
+            if self._state == CLOSED:
+                return True
+            if self._state == HALF_OPEN and self._probes_in_flight < self.half_open_probes:
+                self._probes_in_flight += 1
+                return True
+            self._counters["rejected"] += 1
+            return False
+
+    def record_success(self) -> None:
+        with self._lock:
+            self._counters["successes"] += 1
+            self._consecutive_failures = 0
+            if self._state != CLOSED:
+                print(f"[BREAKER] {self.name} recovered; closing")
+            self._state = CLOSED
+            self._opened_at = None
+            self._probes_in_flight = 0
+
+    def record_failure(self) -> None:
+        with self._lock:
+            self._counters["failures"] += 1
+            self._consecutive_failures += 1
+            if self._state == HALF_OPEN or self._consecutive_failures >= self.failure_threshold:
+                if self._state != OPEN:
+                    self._counters["trips"] += 1
+                    print(f"[BREAKER] {self.name} tripped after {self._consecutive_failures} failure(s)")
+                self._state = OPEN
+                self._opened_at = time.monotonic()
+                self._probes_in_flight = 0
+
+    def reset(self) -> None:
+        """Force the breaker closed (e.g. after reconfiguring the upstream URL)."""
+        with self._lock:
+            self._state = CLOSED
+            self._consecutive_failures = 0
+            self._opened_at = None
+            self._probes_in_flight = 0
+
+    def snapshot(self) -> Dict[str, Any]:
+        """State and counters for monitoring."""
+        with self._lock:
+            self._refresh_state()
+            retry_in = None
+            if self._state == OPEN and self._opened_at is not None:
+                retry_in = max(0.0, self.reset_timeout_s - (time.monotonic() - self._opened_at))
+            return {
+                "name": self.name,
+                "state": self._state,
+                "consecutive_failures": self._consecutive_failures,
+                "retry_in_s": retry_in,
+                **self._counters,
+            }
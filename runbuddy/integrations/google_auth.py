@@ -3,30 +3,58 @@
 - Robust offline access with refresh tokens.
 - Auto re-consent when refresh token is expired/revoked.
 - Stores token.json next to project root.
+- Credentials are cached in memory per process and refreshed in the
+  background shortly before they expire; token.json is read and written
+  under a file lock so concurrent worker processes don't race on it.
+- `get_google_service` builds each API client once (static discovery
+  document) and reuses it; requests go through one authorized HTTP
+  connection object per service and thread, so connections are reused
+  and the shared client is safe to use from pipeline threads.
 """
 
+import contextlib
+import datetime
+import threading
 from pathlib import Path
+from typing import Any, Dict, Iterator, Tuple
+
+import google_auth_httplib2
+import httplib2
 from google.oauth2.credentials import Credentials
 from google_auth_oauthlib.flow import InstalledAppFlow
 from google.auth.transport.requests import Request
 from google.auth.exceptions import RefreshError
+from googleapiclient.discovery import build
+from googleapiclient.http import HttpRequest
 
-from ..config import SCOPES
+try:
+    import fcntl
+except ImportError:  # Windows: no advisory locks, single-process use only
+    fcntl = None
 
-def authenticate_google_api(base_dir: Path | None = None) -> Credentials:
-    """Authenticate with Google APIs using OAuth2.
+from ..config import SCOPES, GOOGLE_TOKEN_REFRESH_MARGIN_S
 
-    - Loads saved token.json if available.
-    - Refreshes token if expired.
-    - Falls back to full interactive flow when needed.
 
-    :param base_dir: Optional path override for where token.json/credentials.json live.
-    :return: Valid Google Credentials object.
-    """
-    import os
-    from pathlib import Path
+@contextlib.contextmanager
+def _token_file_lock(token_path: Path) -> Iterator[None]:
+    """Exclusive inter-process lock guarding token.json reads/writes."""
+    if fcntl is None:
+        yield
+        return
+    lock_path = token_path.with_name(token_path.name + ".lock")
+    with open(lock_path, "a+") as fh:
+        fcntl.flock(fh.fileno(), fcntl.LOCK_EX)
+        try:
+            yield
+        finally:
+            fcntl.flock(fh.fileno(), fcntl.LOCK_UN)
 
-    base_dir = base_dir or Path(__file__).resolve().parents[2]  # project root guess
+
+def _authenticate_from_disk(base_dir: Path) -> Credentials:
+    """Load, refresh or obtain credentials from token.json / the consent flow.
+
+    Caller must hold the token file lock.
+    """
     token_path = base_dir / "token.json"
     client_secret_path = base_dir / "credentials.json"
 
@@ -84,3 +112,138 @@ def authenticate_google_api(base_dir: Path | None = None) -> Credentials:
 
     # Catch-all fallback
     return _run_flow()
+
+
+class _CredentialManager:
+    """Process-wide credential cache with proactive background refresh."""
+
+    def __init__(self) -> None:
+        self._lock = threading.RLock()
+        self._creds: Dict[Path, Credentials] = {}
+        self._timers: Dict[Path, threading.Timer] = {}
+
+    def get(self, base_dir: Path) -> Credentials:
+        with self._lock:
+            creds = self._creds.get(base_dir)
+            # Served from memory until they expire; the timer refreshes them
+            # ahead of time, so token.json is not re-read on every call.
+            if creds is not None and creds.valid:
+                return creds
+            token_path = base_dir / "token.json"
+            with _token_file_lock(token_path):
+                fresh = _authenticate_from_disk(base_dir)
+            self._creds[base_dir] = fresh
+            self._schedule_refresh(base_dir, fresh)
+            return fresh
+
+    @staticmethod
+    def _expires_soon(creds: Credentials) -> bool:
+        if creds.expiry is None:
+            return False
+        # google-auth keeps expiry as a naive UTC datetime
+        now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        return (creds.expiry - now).total_seconds() <= GOOGLE_TOKEN_REFRESH_MARGIN_S
+
+    def _schedule_refresh(self, base_dir: Path, creds: Credentials) -> None:
+        old = self._timers.pop(base_dir, None)
+        if old is not None:
+            old.cancel()
+        if creds.expiry is None or not creds.refresh_token:
+            return
+        now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        delay = (creds.expiry - now).total_seconds() - GOOGLE_TOKEN_REFRESH_MARGIN_S
+        timer = threading.Timer(max(1.0, delay), self._background_refresh, args=(base_dir,))
+        timer.daemon = True
+        timer.start()
+        self._timers[base_dir] = timer
+
+    def _background_refresh(self, base_dir: Path) -> None:
+        try:
+            with self._lock:
+                creds = self._creds.get(base_dir)
+                if creds is None:
+                    return
+                token_path = base_dir / "token.json"
+                with _token_file_lock(token_path):
+                    # Another process may have refreshed already; reuse its token.
+                    on_disk = Credentials.from_authorized_user_file(str(token_path), SCOPES)
+                    if on_disk.valid and not self._expires_soon(on_disk):
+                        creds.token, creds.expiry = on_disk.token, on_disk.expiry
+                    else:
+                        creds.refresh(Request())
+                        token_path.write_text(creds.to_json())
+                self._schedule_refresh(base_dir, creds)
+        except Exception as e:
+            # The next get() falls back to the synchronous path.
+            print(f"[AUTH] Background token refresh failed: {e}")
+
+
+_CREDENTIALS = _CredentialManager()
+
+
+def authenticate_google_api(base_dir: Path | None = None) -> Credentials:
+    """Authenticate with Google APIs using OAuth2.
+
+    - Returns the in-memory credentials while they are valid.
+    - Otherwise loads saved token.json, refreshing it if expired.
+    - Falls back to full interactive flow when needed.
+
+    :param base_dir: Optional path override for where token.json/credentials.json live.
+    :return: Valid Google Credentials object.
+    """
+    base_dir = base_dir or Path(__file__).resolve().parents[2]  # project root guess
+    return _CREDENTIALS.get(base_dir)
+
+
+_services_lock = threading.Lock()
+_services: Dict[Tuple[str, str], Any] = {}
+_thread_http = threading.local()
+
+
+def _authorized_http(key: Tuple[str, str]) -> google_auth_httplib2.AuthorizedHttp:
+    """This thread's authorized connection for one service, reused across requests.
+
+    Rebuilt only when the credentials object itself changes (re-consent);
+    in-place refreshes are picked up by the existing one.
+    """
+    creds = authenticate_google_api()
+    pool: Dict[Tuple[str, str], google_auth_httplib2.AuthorizedHttp] = getattr(_thread_http, "pool", None)
+    if pool is None:
+        pool = _thread_http.pool = {}
+    http = pool.get(key)
+    if http is None or http.credentials is not creds:
+        http = pool[key] = google_auth_httplib2.AuthorizedHttp(creds, http=httplib2.Http())
+    return http
+
+
+def get_google_service(name: str, version: str) -> Any:
+    """Return a cached Google API client, building it on first use.
+
+    Built once per process from the bundled (static) discovery document.
+    Requests use one authorized `httplib2.Http` per service and thread:
+    httplib2 connections must not be shared across threads, but within a
+    thread keeping them lets consecutive calls reuse the TLS connection.
+
+    :param name: API name, e.g. "sheets", "calendar", "drive".
+    :param version: API version, e.g. "v4".
+    :return: googleapiclient Resource.
+    """
+    key = (name, version)
+    with _services_lock:
+        service = _services.get(key)
+        if service is not None:
+            return service
+
+    def _request_builder(http: Any, *args: Any, **kwargs: Any) -> HttpRequest:
+        return HttpRequest(_authorized_http(key), *args, **kwargs)
+
+    service = build(
+        name,
+        version,
+        http=_authorized_http(key),
+        requestBuilder=_request_builder,
+        static_discovery=True,
+        cache_discovery=False,
+    )
+    with _services_lock:
+        return _services.setdefault(key, service)
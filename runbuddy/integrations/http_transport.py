@@ -0,0 +1,151 @@
+"""Shared HTTP transport: one keep-alive `requests.Session` per host.
+
+- Connection pools sized from config (HTTP_POOL_CONNECTIONS / HTTP_POOL_MAXSIZE).
+- Retry with exponential backoff on connection errors and 429/5xx.
+- Per-host counters: requests, errors, latency, new vs reused connections.
+"""
+
+import threading
+import time
+from typing import Any, Dict, Optional
+from urllib.parse import urlsplit
+
+import requests
+from requests.adapters import HTTPAdapter
+from urllib3.util.retry import Retry
+
+from ..config import (
+    HTTP_POOL_CONNECTIONS,
+    HTTP_POOL_MAXSIZE,
+    HTTP_TIMEOUT_S,
+    HTTP_RETRIES,
+    HTTP_BACKOFF_S,
+)
+
+_RETRY_STATUSES = (429, 500, 502, 503, 504)
+
+_lock = threading.Lock()
+_sessions: Dict[str, requests.Session] = {}
+_host_options: Dict[str, Dict[str, Any]] = {}
+_stats: Dict[str, Dict[str, float]] = {}
+
+
+def _host_of(url: str) -> str:
+    parts = urlsplit(url)
+    return f"{parts.scheme}://{parts.netloc}"
+
+
+def configure_host(url: str, **options: Any) -> None:
+    """Override transport options for one host before its session is created.
+
+    Supported options: pool_connections, pool_maxsize, retries, backoff_s, timeout_s.
+    An existing session for the host is dropped so the new options apply.
+
+    :param url: Any URL on the host (scheme + netloc are used).
+    """
+    host = _host_of(url)
+    with _lock:
+        _host_options.setdefault(host, {}).update(options)
+        old = _sessions.pop(host, None)
+    if old is not None:
+        old.close()
+
+
+def _build_session(host: str) -> requests.Session:
+    opts = _host_options.get(host, {})
+    retry = Retry(
+        total=opts.get("retries", HTTP_RETRIES),
+        connect=opts.get("retries", HTTP_RETRIES),
+        read=opts.get("retries", HTTP_RETRIES),
+        status=opts.get("retries", HTTP_RETRIES),
+        backoff_factor=opts.get("backoff_s", HTTP_BACKOFF_S),
+        status_forcelist=_RETRY_STATUSES,
+        allowed_methods=frozenset({"GET", "POST", "HEAD"}),
+        raise_on_status=False,
+        respect_retry_after_header=True,
+    )
+    adapter = HTTPAdapter(
+        pool_connections=opts.get("pool_connections", HTTP_POOL_CONNECTIONS),
+        pool_maxsize=opts.get("pool_maxsize", HTTP_POOL_MAXSIZE),
+        max_retries=retry,
+    )
+    session = requests.Session()
+    session.mount(host + "/", adapter)
+    return session
+
+
+def get_session(url: str) -> requests.Session:
+    """Return the pooled session for the URL's host, creating it on first use."""
+    host = _host_of(url)
+    with _lock:
+        session = _sessions.get(host)
+        if session is None:
+            session = _sessions[host] = _build_session(host)
+            _stats.setdefault(host, {
+                "requests": 0, "errors": 0,
+                "connections_opened": 0, "connections_reused": 0,
+                "latency_total_s": 0.0, "latency_max_s": 0.0,
+            })
+    return session
+
+
+def _opened_connections(session: requests.Session, host: str) -> int:
+    """Total connections ever opened by the host's urllib3 pools."""
+    adapter = session.get_adapter(host + "/")
+    pools = adapter.poolmanager.pools
+    return sum(getattr(pools[k], "num_connections", 0) for k in list(pools.keys()))
+
+
+def request(method: str, url: str, *, timeout: Optional[float] = None, **kwargs: Any) -> requests.Response:
+    """Send a request through the host's pooled session and record metrics.
+
+    :param method: HTTP method.
+    :param url: Absolute URL.
+    :param timeout: Seconds; defaults to the host override or HTTP_TIMEOUT_S.
+    :param kwargs: Passed to `requests.Session.request` (params, data, json, headers...).
+    :return: The response (status is not raised here).
+    """
+    host = _host_of(url)
+    session = get_session(url)
+    if timeout is None:
+        timeout = _host_options.get(host, {}).get("timeout_s", HTTP_TIMEOUT_S)
+
+    opened_before = _opened_connections(session, host)
+    started = time.perf_counter()
+    try:
+        resp = session.request(method, url, timeout=timeout, **kwargs)
+    except Exception:
+        with _lock:
+            _stats[host]["errors"] += 1
+        raise
+    finally:
+        elapsed = time.perf_counter() - started
+        opened = _opened_connections(session, host) - opened_before
+        with _lock:
+            st = _stats[host]
+            st["requests"] += 1
+            st["latency_total_s"] += elapsed
+            st["latency_max_s"] = max(st["latency_max_s"], elapsed)
+            st["connections_opened"] += max(0, opened)
+            if opened <= 0:
+                st["connections_reused"] += 1
+    return resp
+
+
+def get(url: str, **kwargs: Any) -> requests.Response:
+    """GET through the shared transport."""
+    return request("GET", url, **kwargs)
+
+
+def post(url: str, **kwargs: Any) -> requests.Response:
+    """POST through the shared transport."""
+    return request("POST", url, **kwargs)
+
+
+def transport_stats() -> Dict[str, Dict[str, float]]:
+    """Per-host counters, with average latency derived from the totals."""
+    with _lock:
+        out = {host: dict(st) for host, st in _stats.items()}
+    for st in out.values():
+        st["latency_avg_s"] = (st["latency_total_s"] / st["requests"]) if st["requests"] else 0.0
+    return out
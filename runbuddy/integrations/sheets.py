@@ -1,23 +1,90 @@
-"""Google Sheets integration for loading trail rows as dicts."""
-
-from typing import Any, Dict, List
-from googleapiclient.discovery import build
-from .google_auth import authenticate_google_api
-from ..config import GOOGLE_SHEET_ID, SHEET_RANGE
-
-def load_trails_from_sheet() -> List[Dict[str, Any]]:
-    creds = authenticate_google_api()
-    service = build('sheets', 'v4', credentials=creds)
-    sheet = service.spreadsheets()
-    result = sheet.values().get(spreadsheetId=GOOGLE_SHEET_ID, range=SHEET_RANGE).execute()
-    rows = result.get('values', [])
-
-    if not rows:
-        return []
-
-    headers = rows[0]
-    trails: List[Dict[str, Any]] = []
-    for r in rows[1:]:
-        item = {headers[i]: (r[i] if i < len(r) else None) for i in range(len(headers))}
-        trails.append(item)
-    return trails
+"""Google Sheets integration for loading trail rows as typed `Trail` records.
+
+Rows are read in fixed-size windows (several per `values.batchGet` call)
+and streamed, so large catalogs are neither truncated at a fixed range
+nor held twice in memory (raw response + parsed rows).
+"""
+
+from typing import Any, Dict, Iterator, List, Optional
+from .google_auth import get_google_service
+from ..config import (
+    GOOGLE_SHEET_ID,
+    SHEET_TAB,
+    SHEET_FIRST_COLUMN,
+    SHEET_LAST_COLUMN,
+    SHEET_PAGE_ROWS,
+    SHEET_PAGES_PER_CALL,
+)
+from ..models.domain import Trail
+
+def _window(start_row: int, page_rows: int) -> str:
+    end_row = start_row + page_rows - 1
+    return f"{SHEET_TAB}!{SHEET_FIRST_COLUMN}{start_row}:{SHEET_LAST_COLUMN}{end_row}"
+
+def _tab_row_count(service: Any) -> Optional[int]:
+    """Grid row count of SHEET_TAB (blank rows included), or None if not reported."""
+    meta = service.spreadsheets().get(
+        spreadsheetId=GOOGLE_SHEET_ID, fields='sheets.properties(title,gridProperties.rowCount)'
+    ).execute()
+    for sheet in meta.get('sheets', []):
+        props = sheet.get('properties', {})
+        if props.get('title') == SHEET_TAB:
+            return props.get('gridProperties', {}).get('rowCount')
+    return None
+
+def iter_sheet_rows(
+    page_rows: int = SHEET_PAGE_ROWS,
+    pages_per_call: int = SHEET_PAGES_PER_CALL,
+) -> Iterator[Dict[str, Any]]:
+    """Stream data rows as dicts keyed by the header row.
+
+    Requests `pages_per_call` consecutive row windows per batchGet up to the
+    tab's grid row count. The API trims trailing empty rows from each window,
+    so a short window says nothing about the end of the data; only when the
+    row count is unavailable does reading stop, at the first fully empty
+    window. Blank rows inside the data are skipped.
+
+    :param page_rows: Rows per window.
+    :param pages_per_call: Windows requested per API call.
+    :return: Iterator of row dicts.
+    """
+    service = get_google_service('sheets', 'v4')
+    values_api = service.spreadsheets().values()
+    row_count = _tab_row_count(service)
+
+    headers: Optional[List[str]] = None
+    start = 1
+    while row_count is None or start <= row_count:
+        starts = [start + i * page_rows for i in range(pages_per_call)]
+        if row_count is not None:
+            starts = [s for s in starts if s <= row_count]
+        value_ranges = values_api.batchGet(
+            spreadsheetId=GOOGLE_SHEET_ID, ranges=[_window(s, page_rows) for s in starts], majorDimension='ROWS'
+        ).execute().get('valueRanges', [])
+        value_ranges.reverse()  # pop() from the end keeps window order and frees each page
+        while value_ranges:
+            rows = value_ranges.pop().get('values', [])
+            if not rows and row_count is None:
+                return
+            for r in rows:
+                if headers is None:
+                    headers = r
+                    continue
+                if not any(cell not in (None, "") for cell in r):
+                    continue
+                yield {headers[i]: (r[i] if i < len(r) else None) for i in range(len(headers))}
+        start += page_rows * len(starts)
+
+def iter_trails(**kwargs: Any) -> Iterator[Trail]:
+    """Stream `Trail` records; kwargs are passed to `iter_sheet_rows`."""
+    for row in iter_sheet_rows(**kwargs):
+        yield Trail.from_row(row)
+
+def load_trails_from_sheet() -> List[Trail]:
+    return list(iter_trails())
+
+def fetch_sheet_modified_time() -> Optional[str]:
+    """Return the spreadsheet's Drive `modifiedTime` (RFC 3339), a cheap change marker."""
+    service = get_google_service('drive', 'v3')
+    meta = service.files().get(fileId=GOOGLE_SHEET_ID, fields='modifiedTime').execute()
+    return meta.get('modifiedTime')
@@ -0,0 +1,178 @@
+"""Local trail catalog snapshot in front of the Google Sheet.
+
+The sheet rarely changes, so its parsed `Trail` records are kept in memory
+and in a JSON file reused across runs:
+- fresh (age <= TTL): served as-is, no Google calls;
+- stale (within MAX_STALE): served immediately, refreshed in a background thread;
+- expired / missing / forced: refreshed synchronously.
+A refresh first compares the Drive `modifiedTime` when
+TRAIL_CATALOG_REVALIDATE="drive" and only re-downloads when it moved.
+"""
+
+import dataclasses
+import json
+import os
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config import (
+    GOOGLE_SHEET_ID,
+    SHEET_TAB,
+    SHEET_FIRST_COLUMN,
+    SHEET_LAST_COLUMN,
+    TRAIL_CATALOG_PATH,
+    TRAIL_CATALOG_REVALIDATE,
+    TRAIL_CATALOG_TTL_S,
+    TRAIL_CATALOG_MAX_STALE_S,
+)
+from ..models.domain import Trail
+from .sheets import load_trails_from_sheet, fetch_sheet_modified_time
+
+_lock = threading.Lock()
+_refresh_lock = threading.Lock()
+_snapshot: Optional[Dict[str, Any]] = None
+_background: Optional[threading.Thread] = None
+
+
+def _source_id() -> str:
+    return f"{GOOGLE_SHEET_ID}:{SHEET_TAB}!{SHEET_FIRST_COLUMN}:{SHEET_LAST_COLUMN}"
+
+
+def _read_snapshot() -> Optional[Dict[str, Any]]:
+    if not TRAIL_CATALOG_PATH:
+        return None
+    p = Path(TRAIL_CATALOG_PATH).expanduser()
+    if not p.exists():
+        return None
+    try:
+        snap = json.loads(p.read_text())
+    except Exception as e:
+        print(f"[SHEET] Ignoring unreadable catalog snapshot {p}: {e}")
+        return None
+    if snap.get("source") != _source_id() or "trails" not in snap:
+        return None
+    try:
+        snap["trails"] = [Trail(**t) for t in snap["trails"]]
+    except TypeError as e:
+        print(f"[SHEET] Catalog snapshot has an outdated layout, ignoring: {e}")
+        return None
+    return snap
+
+
+def _write_snapshot(snap: Dict[str, Any]) -> None:
+    if not TRAIL_CATALOG_PATH:
+        return
+    p = Path(TRAIL_CATALOG_PATH).expanduser()
+    try:
+        p.parent.mkdir(parents=True, exist_ok=True)
+        tmp = p.with_suffix(p.suffix + ".tmp")
+        data = {**snap, "trails": [dataclasses.asdict(t) for t in snap["trails"]]}
+        tmp.write_text(json.dumps(data, ensure_ascii=False))
+        os.replace(tmp, p)
+    except OSError as e:
+        print(f"[SHEET] Could not persist catalog snapshot: {e}")
+
+
+def _refresh(current: Optional[Dict[str, Any]]) -> Dict[str, Any]:
+    """Revalidate against the sheet; re-download only when it changed."""
+    with _refresh_lock:
+        modified = None
+        if TRAIL_CATALOG_REVALIDATE == "drive":
+            try:
+                modified = fetch_sheet_modified_time()
+            except Exception as e:
+                print(f"[SHEET] modifiedTime check failed, downloading: {e}")
+        if current and modified and modified == current.get("modified_time"):
+            snap = {**current, "checked_at": time.time()}
+        else:
+            trails = load_trails_from_sheet()
+            snap = {
+                "source": _source_id(),
+                "modified_time": modified,
+                "fetched_at": time.time(),
+                "checked_at": time.time(),
+                "trails": trails,
+            }
+            print(f"[SHEET] Catalog refreshed: {len(trails)} trails")
+        _write_snapshot(snap)
+    global _snapshot
+    with _lock:
+        _snapshot = snap
+    return snap
+
+
+def _refresh_in_background(current: Dict[str, Any]) -> None:
+    global _background
+    with _lock:
+        if _background is not None and _background.is_alive():
+            return
+
+        def _run() -> None:
+            try:
+                _refresh(current)
+            except Exception as e:
+                print(f"[SHEET] Background catalog refresh failed: {e}")
+
+        # Daemon so a hung Sheets call never blocks interpreter exit; the snapshot
+        # is replaced atomically, so an interrupted refresh leaves the old one intact.
+        _background = threading.Thread(target=_run, name="trail-catalog-refresh", daemon=True)
+        _background.start()
+
+
+def _current_snapshot(force_refresh: bool) -> Dict[str, Any]:
+    global _snapshot
+    with _lock:
+        snap = _snapshot
+    if snap is None:
+        snap = _read_snapshot()
+        with _lock:
+            _snapshot = snap
+
+    if force_refresh or snap is None:
+        return _refresh(None if force_refresh else snap)
+
+    age = time.time() - snap.get("checked_at", 0)
+    if age <= TRAIL_CATALOG_TTL_S:
+        return snap
+    if age <= TRAIL_CATALOG_TTL_S + TRAIL_CATALOG_MAX_STALE_S:
+        _refresh_in_background(snap)
+        return snap
+    try:
+        return _refresh(snap)
+    except Exception as e:
+        print(f"[SHEET] Refresh failed, serving expired snapshot: {e}")
+        return snap
+
+
+def _version(snap: Optional[Dict[str, Any]]) -> Optional[str]:
+    if not snap:
+        return None
+    return snap.get("modified_time") or str(snap.get("fetched_at"))
+
+
+def load_trail_catalog(force_refresh: bool = False) -> List[Trail]:
+    """Return the trail catalog, using the local snapshot whenever it is fresh enough.
+
+    :param force_refresh: Bypass the snapshot and download the sheet now.
+    :return: List of Trail records.
+    """
+    return _current_snapshot(force_refresh)["trails"]
+
+
+def load_trail_catalog_with_version(force_refresh: bool = False) -> Tuple[List[Trail], Optional[str]]:
+    """`load_trail_catalog` plus the version of that same snapshot.
+
+    Taken from one snapshot, so a background refresh can never pair a new
+    version with the old list (as separate `catalog_version()` calls could).
+    """
+    snap = _current_snapshot(force_refresh)
+    return snap["trails"], _version(snap)
+
+
+def catalog_version() -> Optional[str]:
+    """Identifier of the catalog currently in memory (modifiedTime or fetch time)."""
+    with _lock:
+        snap = _snapshot
+    return _version(snap)
@@ -1,5 +1,6 @@
 """Domain model dataclasses used across RunBuddy."""
 
+import re
 from dataclasses import dataclass
 from typing import Optional, Dict, Any, List
 
@@ -22,3 +23,79 @@ class Recommendation:
     location: Optional[str]
     reason: str
     cautions: Optional[str] = None
+
+# Sheet header -> Trail field. Rows may also already use the field names.
+TRAIL_SHEET_HEADERS = {
+    "Trail Name": "name",
+    "Location": "location",
+    "Length (km)": "length_km",
+    "Difficulty": "difficulty",
+    "Terrain Type": "terrain_type",
+    "Weather Sensitivity": "weather_sensitivity",
+    "Shade Coverage": "shade_coverage",
+    "Mud/Rain Risk": "mud_rain_risk",
+    "Elevation Gain": "elevation_gain",
+    "Notes & Hazards": "hazards",
+}
+
+_NUMBER_RE = re.compile(r"-?\d+(?:[.,]\d+)?")
+
+
+def _clean(value: Any) -> Optional[str]:
+    if value is None:
+        return None
+    s = str(value).strip()
+    return s or None
+
+
+def _first_number(value: Any) -> Optional[float]:
+    """Parse the first number in a cell ("9.0", "9 km", "30 m"); None if there is none."""
+    if isinstance(value, (int, float)):
+        return float(value)
+    m = _NUMBER_RE.search(str(value or ""))
+    return float(m.group(0).replace(",", ".")) if m else None
+
+
+@dataclass(frozen=True, slots=True)
+class Trail:
+    """One catalog trail, normalized once when the sheet is loaded.
+
+    `elevation_gain` keeps the sheet text ("30 m", "Low"); `elevation_gain_m`
+    is its numeric value when the cell holds one.
+    """
+    name: Optional[str]
+    location: Optional[str]
+    length_km: Optional[float] = None
+    difficulty: Optional[str] = None
+    terrain_type: Optional[str] = None
+    weather_sensitivity: Optional[str] = None
+    shade_coverage: Optional[str] = None
+    mud_rain_risk: Optional[str] = None
+    elevation_gain: Optional[str] = None
+    elevation_gain_m: Optional[float] = None
+    hazards: Optional[str] = None
+
+    @classmethod
+    def from_row(cls, row: Dict[str, Any]) -> "Trail":
+        """Build a Trail from a sheet row keyed by headers (or by field names)."""
+        fields = {TRAIL_SHEET_HEADERS.get(k, k): v for k, v in row.items()}
+        elevation = _clean(fields.get("elevation_gain"))
+        return cls(
+            name=_clean(fields.get("name")),
+            location=_clean(fields.get("location")),
+            length_km=_first_number(fields.get("length_km")),
+            difficulty=_clean(fields.get("difficulty")),
+            terrain_type=_clean(fields.get("terrain_type")),
+            weather_sensitivity=_clean(fields.get("weather_sensitivity")),
+            shade_coverage=_clean(fields.get("shade_coverage")),
+            mud_rain_risk=_clean(fields.get("mud_rain_risk")),
+            elevation_gain=elevation,
+            elevation_gain_m=_first_number(elevation),
+            hazards=_clean(fields.get("hazards")),
+        )
+
+    def to_dict(self) -> Dict[str, Any]:
+        """Field-name dict (the shape used in the prompt examples), without elevation_gain_m."""
+        out = {f: getattr(self, f) for f in self.__slots__}
+        out.pop("elevation_gain_m")
+        return out
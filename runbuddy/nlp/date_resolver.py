@@ -0,0 +1,178 @@
+"""Single-pass date/time resolution (fallback after the fast path and Duckling).
+
+One compiled scanner walks the text once and picks out every date span
+("october 25", "11/02", "the 14th", "in 3 days", "next friday"), clock
+time ("at 7am", "18:00"), hour/minute offset and part-of-day word. The
+date span is resolved: relative days and weekdays with the fast-path
+rules, anything else by dateparser, through a `DateDataParser` that is
+built once per reference day (English only, future-preferring), so there
+is no language detection, no whole-sentence parse and no second
+`search_dates` scan. The time of day is then taken from the clock, the
+part-of-day table or the reference time, in that order.
+"""
+
+import re
+import threading
+from datetime import date, datetime, timedelta
+from typing import Any, Dict, List, Optional, Pattern, Tuple
+
+from .fast_time import (_AMBIGUOUS_WEEKDAYS, _CLOCK_RE, _DAY_RE, _OFFSET_RE, _PM_WORDS, _WEEKDAYS, _WORD_NUM,
+                        _clock, _resolve_day, _weekday_ok)
+
+_MONTH = (r"(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may|june?|july?|aug(?:ust)?"
+          r"|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\.?")
+_DAYNUM = r"\d{1,2}(?:st|nd|rd|th)?"
+_YEAR = r"(?:,?\s+\d{4})?"
+_NUM = r"(?:\d{1,3}|an?|one|two|three|four|five|six|seven|eight|nine|ten)"
+_DATE = "|".join((
+    r"\d{4}-\d{1,2}-\d{1,2}",
+    r"\d{1,2}/\d{1,2}(?:/\d{2,4})?",
+    _MONTH + r"\s+" + _DAYNUM + _YEAR,
+    _DAYNUM + r"\s+(?:of\s+)?" + _MONTH + _YEAR,
+    r"in\s+" + _NUM + r"\s+(?:days?|weeks?|months?)",
+    r"\d{1,3}\s+days?\s+ago",
+    r"day after tomorrow|today|tonight|tomorrow|tmrw|tmr|yesterday",
+    r"(?:this|next|coming)\s+(?:week|month|weekend)|weekend",
+    r"(?:(?:this|next|coming)\s+)?(?:" + "|".join(sorted(_WEEKDAYS, key=len, reverse=True)) + r")",
+    r"(?:the\s+)?\d{1,2}(?:st|nd|rd|th)",
+))
+_ORDINAL_ONLY_RE = re.compile(r"(?:the\s+)?\d{1,2}(?:st|nd|rd|th)")
+_EXPLICIT_RE = re.compile(r"\d{4}|yesterday|ago")  # the user asked for that exact/past day
+# dateparser doesn't know these shorthands
+_DATE_ALIASES = {"tonight": "today", "tmrw": "tomorrow", "tmr": "tomorrow", "coming": "next"}
+
+_lock = threading.Lock()
+_scanner_cache: Tuple[Tuple[Tuple[str, str], ...], Optional[Pattern]] = ((), None)
+_parsers: Dict[date, Any] = {}
+
+
+def _scanner(pod: Dict[str, str]) -> Pattern:
+    """Date | offset | clock | part-of-day alternation, compiled once per _POD table."""
+    global _scanner_cache
+    key = tuple(sorted(pod.items()))
+    if _scanner_cache[0] != key or _scanner_cache[1] is None:
+        words = "|".join(re.escape(w) for w in sorted(pod, key=len, reverse=True)) or r"(?!)"
+        pattern = re.compile(
+            r"\b(?P<date>" + _DATE + r")\b"
+            r"|(?P<offset>" + _OFFSET_RE.pattern + r")"
+            r"|(?P<clock>" + _CLOCK_RE.pattern + r")"
+            r"|\b(?P<pod>" + words + r")\b"
+        )
+        _scanner_cache = (key, pattern)
+    return _scanner_cache[1]
+
+
+def _date_parser(day: date) -> Any:
+    """English-only, future-preferring DateDataParser relative to `day` (cached per day)."""
+    parser = _parsers.get(day)
+    if parser is None:
+        with _lock:
+            parser = _parsers.get(day)
+            if parser is None:
+                from dateparser.date import DateDataParser
+                parser = DateDataParser(languages=["en"], settings={
+                    "PREFER_DATES_FROM": "future",
+                    "RELATIVE_BASE": datetime(day.year, day.month, day.day),
+                    "RETURN_AS_TIMEZONE_AWARE": False,
+                })
+                _parsers.clear()  # only the current reference day is ever needed
+                _parsers[day] = parser
+    return parser
+
+
+def _roll_forward(day: date, span: str, today: date) -> date:
+    """Move a past day without a year to its next occurrence ("the 13th" -> next month)."""
+    if day >= today or _EXPLICIT_RE.search(span):
+        return day
+    try:
+        if _ORDINAL_ONLY_RE.fullmatch(span):
+            return day.replace(year=day.year + day.month // 12, month=day.month % 12 + 1)
+        return day.replace(year=day.year + 1)
+    except ValueError:  # e.g. the 31st in a 30-day month
+        return day
+
+
+def _parse_day(spans: List[str], now: datetime) -> Optional[date]:
+    """Calendar day named by the date spans (all of them together, else the last one that parses).
+
+    Relative days, weekdays and weekends are resolved with the fast-path rules,
+    so both paths agree on e.g. "wednesday" (today if it is Wednesday) and
+    "next sat"; everything else goes to dateparser.
+    """
+    if not spans:
+        return None
+    today = now.date()
+    candidates = ([" ".join(spans)] if len(spans) > 1 else []) + spans[::-1]
+    parser = _date_parser(today)
+    for span in candidates:
+        text = " ".join(_DATE_ALIASES.get(w, w) for w in span.split())
+        day_m = _DAY_RE.fullmatch(span) or _DAY_RE.fullmatch(text)
+        if day_m:
+            return _resolve_day(day_m, now).date()
+        found = parser.get_date_data(text).date_obj
+        if found is not None:
+            return _roll_forward(found.date(), span, today)
+    return None
+
+
+def resolve_datetime(text: str, now: datetime, pod: Dict[str, str]) -> Optional[datetime]:
+    """Resolve the query's date and time in one scan.
+
+    :param text: Free-form query.
+    :param now: Reference time (timezone-aware, local); the result uses its tzinfo.
+    :param pod: Part-of-day table, word -> "HH:MM".
+    :return: Local datetime, or None when the text names no date or time.
+    """
+    date_spans: List[str] = []
+    clock_m = offset_m = None
+    pod_word: Optional[str] = None
+    low = text.lower()
+    for m in _scanner(pod).finditer(low):
+        if m.group("date"):
+            span = m.group("date")
+            word = span.rsplit(None, 1)[-1]
+            if word in _AMBIGUOUS_WEEKDAYS and not _weekday_ok(low, m.end("date") - len(word), m.end("date")):
+                continue  # "sat"/"wed" used as a verb
+            date_spans.append(span)
+        elif m.group("offset") and offset_m is None:
+            offset_m = m
+        elif m.group("clock") and clock_m is None:
+            clock_m = m
+        elif m.group("pod") and pod_word is None:
+            pod_word = m.group("pod")
+    if pod_word is None and "tonight" in date_spans and "tonight" in pod:
+        pod_word = "tonight"
+
+    day = _parse_day(date_spans, now)
+    if offset_m and day is None:
+        n = _WORD_NUM.get(offset_m.group("n")) or int(offset_m.group("n"))
+        unit = "hours" if offset_m.group("unit").startswith("h") else "minutes"
+        return (now + timedelta(**{unit: n})).replace(second=0, microsecond=0)
+
+    clock = None
+    if clock_m:
+        try:
+            clock = _clock(clock_m, pm_hint=pod_word in _PM_WORDS)
+        except ValueError:
+            clock = None
+    if day is None and clock is None and pod_word is None:
+        return None
+
+    base = now.replace(year=day.year, month=day.month, day=day.day) if day else now
+    if clock:
+        h, mnt, ambiguous = clock
+    elif pod_word:
+        h, mnt = map(int, pod[pod_word].split(":"))
+        ambiguous = False
+    else:
+        # A day alone keeps the current time of day (as the fast path does).
+        return base
+
+    dt = base.replace(hour=h, minute=mnt, second=0, microsecond=0)
+    if day is None:
+        # Time without a day: prefer the next future occurrence.
+        if ambiguous and dt <= now and dt.replace(hour=h + 12) > now:
+            dt = dt.replace(hour=h + 12)
+        elif dt <= now:
+            dt += timedelta(days=1)
+    return dt
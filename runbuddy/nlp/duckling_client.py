@@ -1,14 +1,45 @@
-"""Thin HTTP client to a Duckling server for time parsing."""
+"""Thin HTTP client to a Duckling server for time parsing.
+
+Calls go through a circuit breaker: after DUCKLING_FAILURE_THRESHOLD
+consecutive failures Duckling is skipped instantly (no timeout wait) for
+DUCKLING_RESET_TIMEOUT_S, then a single probe request decides whether
+it is healthy again. `duckling_health()` exposes the state for monitoring.
+"""
 
 
 # duckling_client.py
 import os
-from typing import Optional
+from typing import Any, Dict, Optional
 from datetime import datetime
 from zoneinfo import ZoneInfo
-import requests
+
+from ..config import (
+    DUCKLING_RETRIES,
+    DUCKLING_TIMEOUT_S,
+    DUCKLING_FAILURE_THRESHOLD,
+    DUCKLING_RESET_TIMEOUT_S,
+    DUCKLING_HALF_OPEN_PROBES,
+)
+from ..integrations import http_transport
+from ..integrations.circuit_breaker import CircuitBreaker, OPEN
 
 LOCAL_TZ = ZoneInfo("America/Toronto")
+_configured_urls: set = set()
+
+BREAKER = CircuitBreaker(
+    "duckling",
+    failure_threshold=DUCKLING_FAILURE_THRESHOLD,
+    reset_timeout_s=DUCKLING_RESET_TIMEOUT_S,
+    half_open_probes=DUCKLING_HALF_OPEN_PROBES,
+)
+
+def duckling_available() -> bool:
+    """Cheap health check: configured and the breaker is not open."""
+    return bool(os.getenv("DUCKLING_URL")) and BREAKER.state != OPEN
+
+def duckling_health() -> Dict[str, Any]:
+    """Breaker state, trip and failure counters, plus the configured URL."""
+    return {"url": os.getenv("DUCKLING_URL"), **BREAKER.snapshot()}
 
 def parse_time(text: str, base_dt: Optional[datetime] = None, locale: str = "en_CA") -> Optional[datetime]:
     url = os.getenv("DUCKLING_URL")
@@ -16,16 +47,24 @@ def parse_time(text: str, base_dt: Optional[datetime] = None, locale: str = "en_
         return None
     base_dt = (base_dt or datetime.now(LOCAL_TZ)).astimezone(LOCAL_TZ)
     base_ms = int(base_dt.timestamp() * 1000)
+    if url not in _configured_urls:
+        http_transport.configure_host(url, retries=DUCKLING_RETRIES)
+        _configured_urls.add(url)
+        BREAKER.reset()
+    if not BREAKER.allow_request():
+        return None
     try:
-        r = requests.post(
+        r = http_transport.post(
             url,
             data={"text": text, "locale": locale, "tz": "America/Toronto", "reftime": str(base_ms)},
-            timeout=3.0,
+            timeout=DUCKLING_TIMEOUT_S,
         )
         r.raise_for_status()
         items = r.json()
     except Exception:
+        BREAKER.record_failure()
         return None
+    BREAKER.record_success()
     for it in items:
         if it.get("dim") != "time":
             continue
@@ -0,0 +1,163 @@
+"""Precompiled rule-based time extractor for short everyday phrases.
+
+Covers "today / tonight / tomorrow / [this|next] <weekday> / this weekend",
+part-of-day words from the `_POD` table ("saturday evening"), explicit
+clock times ("at 6pm", "6:30 am", "18:00") and "in N hours/minutes".
+Anything with calendar dates (month names, 10/25, ordinals, "in 3 days")
+is left to Duckling/dateparser: the extractor returns None so the slower
+engines run.
+"""
+
+import re
+from datetime import datetime, timedelta
+from typing import Dict, Optional, Pattern, Tuple
+
+_WEEKDAYS = {
+    "monday": 0, "mon": 0, "tuesday": 1, "tue": 1, "tues": 1, "wednesday": 2, "wed": 2,
+    "thursday": 3, "thu": 3, "thur": 3, "thurs": 3, "friday": 4, "fri": 4,
+    "saturday": 5, "sat": 5, "sunday": 6,  # no "sun": clashes with "in the sun"
+}
+# Abbreviations that are also everyday words ("I sat down", "we'd wed"): only
+# read as weekdays after this/next/coming/on or with a trailing period ("sat.").
+_AMBIGUOUS_WEEKDAYS = ("sat", "wed")
+_WEEKDAY_CUE_RE = re.compile(r"\b(?:this|next|coming|on)\s+$")
+
+_DAY_RE = re.compile(
+    r"\b(?:(?P<rel>day after tomorrow|today|tonight|tomorrow|tmrw|tmr)"
+    r"|(?P<mod>this|next|coming)?\s*(?P<wd>" + "|".join(sorted(_WEEKDAYS, key=len, reverse=True)) + r")"
+    r"|(?P<weekend>(?:this|next)?\s*weekend))\b"
+)
+_CLOCK_RE = re.compile(
+    r"\b(?:(?P<h12>\d{1,2})(?::(?P<m12>[0-5]\d))?\s*(?P<ampm>a\.?m\.?|p\.?m\.?)"
+    r"|(?P<h24>[01]?\d|2[0-3]):(?P<m24>[0-5]\d)"
+    r"|at\s+(?P<hbare>\d{1,2})(?!\s*(?:a\.?m|p\.?m|km|k|kms|kilomet|mi|miles?|min|minutes?|hours?|h)\b))(?![\d:])"
+)
+_OFFSET_RE = re.compile(r"\bin\s+(?P<n>\d{1,3}|an?|one|two|three)\s+(?P<unit>hours?|hrs?|minutes?|mins?)\b")
+_NOW_RE = re.compile(r"\b(?:right now|now|asap|immediately)\b")
+# Date expressions the fast path doesn't resolve: defer to the full engines.
+_UNSUPPORTED_RE = re.compile(
+    r"\b(?:jan(?:uary)?|feb(?:ruary)?|mar(?:ch)?|apr(?:il)?|may\s+\d|jun(?:e)?|jul(?:y)?|aug(?:ust)?"
+    r"|sep(?:t(?:ember)?)?|oct(?:ober)?|nov(?:ember)?|dec(?:ember)?)\b"
+    r"|\b\d{1,4}[/-]\d{1,2}(?:[/-]\d{1,4})?\b"
+    r"|\b\d{1,2}(?:st|nd|rd|th)\b"
+    r"|\bin\s+\S+\s+(?:days?|weeks?|months?)\b|\bnext\s+(?:week|month)\b|\byesterday\b|\bago\b"
+)
+_WORD_NUM = {"a": 1, "an": 1, "one": 1, "two": 2, "three": 3}
+# Part-of-day words implying afternoon/evening for bare hours ("evening at 7")
+_PM_WORDS = ("afternoon", "evening", "night", "tonight")
+
+_pod_cache: Tuple[Tuple[Tuple[str, str], ...], Optional[Pattern]] = ((), None)
+
+
+def _pod_pattern(pod: Dict[str, str]) -> Optional[Pattern]:
+    """Alternation over the part-of-day table, compiled once per table."""
+    global _pod_cache
+    key = tuple(sorted(pod.items()))
+    if _pod_cache[0] != key:
+        words = sorted(pod, key=len, reverse=True)
+        pattern = re.compile(r"\b(" + "|".join(re.escape(w) for w in words) + r")\b") if words else None
+        _pod_cache = (key, pattern)
+    return _pod_cache[1]
+
+
+def _weekday_ok(text: str, start: int, end: int) -> bool:
+    """False for a bare "sat"/"wed" at text[start:end] that is probably not a weekday."""
+    if text[start:end] not in _AMBIGUOUS_WEEKDAYS:
+        return True
+    return bool(_WEEKDAY_CUE_RE.search(text, 0, start)) or text.startswith(".", end)
+
+
+def _resolve_day(m: "re.Match[str]", now: datetime) -> datetime:
+    rel = m.group("rel")
+    if rel:
+        days = {"today": 0, "tonight": 0, "tomorrow": 1, "tmrw": 1, "tmr": 1, "day after tomorrow": 2}[rel]
+        return now + timedelta(days=days)
+    if m.group("weekend"):
+        if now.weekday() >= 5 and not m.group("weekend").startswith("next"):
+            return now  # already the weekend
+        target, strictly_after = 5, True
+    else:
+        target, strictly_after = _WEEKDAYS[m.group("wd")], m.group("mod") == "next"
+    ahead = (target - now.weekday()) % 7
+    if ahead == 0 and strictly_after:
+        ahead = 7
+    return now + timedelta(days=ahead)
+
+
+def _clock(m: "re.Match[str]", pm_hint: bool) -> Tuple[int, int, bool]:
+    """(hour, minute, ambiguous) from a clock match; ambiguous = bare hour without am/pm."""
+    if m.group("h12"):
+        if int(m.group("h12")) > 12:
+            raise ValueError(m.group("h12"))
+        h, mnt = int(m.group("h12")) % 12, int(m.group("m12") or 0)
+        if m.group("ampm").startswith("p"):
+            h += 12
+        return h, mnt, False
+    if m.group("h24"):
+        return int(m.group("h24")), int(m.group("m24")), False
+    h = int(m.group("hbare"))
+    if h > 23:
+        raise ValueError(h)
+    if pm_hint and 1 <= h < 12:
+        return h + 12, 0, False
+    return h, 0, 1 <= h < 12
+
+
+def fast_extract_datetime(text: str, now: datetime, pod: Dict[str, str]) -> Optional[datetime]:
+    """Resolve common short time phrases without Duckling or dateparser.
+
+    :param text: Free-form query.
+    :param now: Reference time (timezone-aware, local).
+    :param pod: Part-of-day table, word -> "HH:MM".
+    :return: Local datetime, or None when the phrase is not covered.
+    """
+    t = text.lower()
+    if _UNSUPPORTED_RE.search(t):
+        return None
+
+    m = _OFFSET_RE.search(t)
+    if m:
+        n = _WORD_NUM.get(m.group("n")) or int(m.group("n"))
+        unit = "hours" if m.group("unit").startswith("h") else "minutes"
+        return (now + timedelta(**{unit: n})).replace(second=0, microsecond=0)
+
+    day_m = next((m for m in _DAY_RE.finditer(t)
+                  if not m.group("wd") or _weekday_ok(t, m.start("wd"), m.end("wd"))), None)
+    pod_re = _pod_pattern(pod)
+    pod_m = pod_re.search(t) if pod_re else None
+    if day_m and day_m.group("rel") == "tonight" and not pod_m and "tonight" in pod:
+        pod_word = "tonight"
+    else:
+        pod_word = pod_m.group(1) if pod_m else None
+
+    clock_m = _CLOCK_RE.search(t)
+    clock = None
+    if clock_m:
+        try:
+            clock = _clock(clock_m, pm_hint=bool(pod_word in _PM_WORDS or (day_m and day_m.group("rel") == "tonight")))
+        except ValueError:
+            clock = None
+
+    if not day_m and not pod_word and not clock:
+        if _NOW_RE.search(t):
+            return now.replace(second=0, microsecond=0)
+        return None
+
+    day = _resolve_day(day_m, now) if day_m else now
+    if clock:
+        h, mnt, ambiguous = clock
+    elif pod_word:
+        h, mnt = map(int, pod[pod_word].split(":"))
+        ambiguous = False
+    else:
+        # A day alone keeps the current time of day (matches the dateparser path).
+        return day
+
+    dt = day.replace(hour=h, minute=mnt, second=0, microsecond=0)
+    if not day_m:
+        # Time without a day: prefer the next future occurrence.
+        if ambiguous and dt <= now and dt.replace(hour=h + 12) > now:
+            dt = dt.replace(hour=h + 12)
+        elif dt <= now:
+            dt += timedelta(days=1)
+    return dt
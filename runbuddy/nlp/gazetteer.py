@@ -0,0 +1,151 @@
+"""Place-name gazetteer: cities, aliases and neighbourhoods → canonical city.
+
+Names are loaded from a JSON data file (`GAZETTEER_PATH`)::
+
+    {"Scarborough": {"aliases": ["Scarboro", "STC"], "neighbourhoods": ["Rouge", ...]}, ...}
+
+and compiled into a token trie. Matching tokenizes the text once and walks
+the trie from each token, so it only ever matches whole words ("Rouge" does
+not fire inside "Rougemount") and the cost depends on the text length and
+the longest name, not on how many names are loaded.
+"""
+
+import json
+import re
+import threading
+from dataclasses import dataclass
+from pathlib import Path
+from typing import Dict, Iterable, List, Optional, Tuple
+
+from ..config import GAZETTEER_PATH
+
+_TOKEN_RE = re.compile(r"[a-z0-9]+(?:['’][a-z0-9]+)*")
+_END = ""  # trie key marking a complete name (tokens are never empty)
+
+# Priority when two names of equal length overlap: the city itself wins.
+KIND_RANK = {"city": 0, "alias": 1, "neighbourhood": 2}
+
+
+@dataclass(frozen=True)
+class PlaceMatch:
+    city: str  # canonical city
+    name: str  # name as listed in the gazetteer
+    kind: str  # "city", "alias" or "neighbourhood"
+    start: int  # token offsets in the text
+    end: int
+
+
+def _tokens(text: str) -> List[str]:
+    return [t.replace("’", "").replace("'", "") for t in _TOKEN_RE.findall(text.lower())]
+
+
+class Gazetteer:
+    """Token-trie matcher over place names."""
+
+    def __init__(self) -> None:
+        self._root: Dict[str, dict] = {}
+        self._cities: Dict[str, str] = {}  # lowercase -> canonical
+        self.size = 0
+
+    def add(self, name: str, city: str, kind: str = "alias") -> None:
+        """Register `name` as a way of referring to `city`."""
+        toks = _tokens(name)
+        if not toks:
+            return
+        node = self._root
+        for tok in toks:
+            node = node.setdefault(tok, {})
+        current = node.get(_END)
+        if current is None:
+            self.size += 1
+        if current is None or KIND_RANK.get(kind, 9) < KIND_RANK.get(current[2], 9):
+            node[_END] = (city, name, kind)
+        if kind == "city":
+            self._cities[city.lower()] = city
+
+    @classmethod
+    def from_dict(cls, data: Dict[str, Dict[str, List[str]]], cities: Iterable[str] = ()) -> "Gazetteer":
+        """Build from the data-file layout; `cities` adds bare city names not in `data`."""
+        gaz = cls()
+        for city, entry in data.items():
+            gaz.add(city, city, "city")
+            for alias in entry.get("aliases", []):
+                gaz.add(alias, city, "alias")
+            for hood in entry.get("neighbourhoods", []):
+                gaz.add(hood, city, "neighbourhood")
+        for city in cities:
+            gaz.add(city, city, "city")
+        return gaz
+
+    @classmethod
+    def from_file(cls, path: str = GAZETTEER_PATH, cities: Iterable[str] = ()) -> "Gazetteer":
+        p = Path(path).expanduser()
+        try:
+            data = json.loads(p.read_text(encoding="utf-8"))
+        except (OSError, ValueError) as e:
+            print(f"[GAZ] Could not read gazetteer {p}: {e}")
+            data = {}
+        return cls.from_dict(data, cities)
+
+    def cities(self) -> List[str]:
+        return sorted(self._cities.values())
+
+    def find_all(self, text: str) -> List[PlaceMatch]:
+        """Non-overlapping matches, leftmost-longest, in text order."""
+        toks = _tokens(text)
+        out: List[PlaceMatch] = []
+        i = 0
+        while i < len(toks):
+            node, best, j = self._root, None, i
+            while j < len(toks) and toks[j] in node:
+                node = node[toks[j]]
+                j += 1
+                if _END in node:
+                    best = (j, node[_END])
+            if best is None:
+                i += 1
+                continue
+            end, (city, name, kind) = best
+            out.append(PlaceMatch(city, name, kind, i, end))
+            i = end
+        return out
+
+    def match(self, text: str, allowed: Optional[Iterable[str]] = None) -> Optional[PlaceMatch]:
+        """First place in the text, optionally restricted to `allowed` cities."""
+        allowed_l = {c.lower() for c in allowed} if allowed is not None else None
+        for m in self.find_all(text):
+            if allowed_l is None or m.city.lower() in allowed_l:
+                return m
+        return None
+
+    def resolve(self, name: str) -> Optional[str]:
+        """Canonical city when `name` is exactly a known place (e.g. an NER entity)."""
+        toks = _tokens(name)
+        node = self._root
+        for tok in toks:
+            node = node.get(tok)
+            if node is None:
+                return None
+        hit = node.get(_END) if toks else None
+        return hit[0] if hit else None
+
+
+_lock = threading.Lock()
+_cached: Optional[Tuple[Tuple[str, Tuple[str, ...]], Gazetteer]] = None
+
+
+def get_gazetteer(cities: Optional[Iterable[str]] = None, path: str = GAZETTEER_PATH) -> Gazetteer:
+    """The process-wide gazetteer, rebuilt only when the path or extra cities change.
+
+    :param cities: City names to include even if the data file doesn't list them.
+    :param path: Data file location.
+    """
+    global _cached
+    key = (path, tuple(sorted(cities or ())))
+    with _lock:
+        if _cached is not None and _cached[0] == key:
+            return _cached[1]
+    gaz = Gazetteer.from_file(path, key[1])
+    with _lock:
+        _cached = (key, gaz)
+    return gaz
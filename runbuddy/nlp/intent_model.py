@@ -1,11 +1,27 @@
+"""Lightweight ML intent classifier (scikit-learn).
 
-# nlp_model.py - Lightweight ML intent classifier (scikit-learn)
-from typing import List, Tuple
+The TF-IDF + LogisticRegression pipeline is trained offline and saved as
+an artifact tagged with a hash of its training data:
+
+    python -m runbuddy.nlp.intent_model --export [--data training_data.jsonl] [--out PATH]
+
+At runtime the artifact is loaded lazily on first prediction; the model is
+retrained (and the artifact rewritten) only when the training data hash or
+the scikit-learn version no longer match.
+
+With INTENT_BACKEND=online the predictions come from the incremental
+learner in `online_intent` instead (same `predict_*` API).
+"""
+
+import argparse
+import hashlib
 import json
+import threading
+import time
 from pathlib import Path
-from sklearn.feature_extraction.text import TfidfVectorizer
-from sklearn.linear_model import LogisticRegression
-from sklearn.pipeline import Pipeline
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..config import INTENT_TRAINING_DATA, INTENT_MODEL_PATH, INTENT_CONFIDENCE_THRESHOLD, INTENT_BACKEND
 
 SEED_DATA = [
     ("where should i run today", "where_today"),
@@ -20,7 +36,9 @@ SEED_DATA = [
     ("i need a running spot today afternoon", "where_today"),
 ]
 
-def load_training_data(extra_path: str = "training_data.jsonl") -> List[Tuple[str,str]]:
+FALLBACK_LABEL = "free_form"
+
+def load_training_data(extra_path: str = INTENT_TRAINING_DATA) -> List[Tuple[str,str]]:
     data = list(SEED_DATA)
     p = Path(extra_path)
     if p.exists():
@@ -34,7 +52,16 @@ def load_training_data(extra_path: str = "training_data.jsonl") -> List[Tuple[st
                     continue
     return data
 
-def train_model(extra_path: str = "training_data.jsonl") -> Pipeline:
+def training_data_hash(data: List[Tuple[str, str]]) -> str:
+    """Stable SHA-256 of the (text, label) pairs, used to tag artifacts."""
+    return hashlib.sha256(json.dumps(data, ensure_ascii=False).encode("utf-8")).hexdigest()
+
+def train_model(extra_path: str = INTENT_TRAINING_DATA) -> Any:
+    # Imported here so importing this module (and the parser) stays cheap.
+    from sklearn.feature_extraction.text import TfidfVectorizer
+    from sklearn.linear_model import LogisticRegression
+    from sklearn.pipeline import Pipeline
+
     data = load_training_data(extra_path)
     X = [t for (t, y) in data]
     y = [y for (t, y) in data]
@@ -45,12 +72,111 @@ def train_model(extra_path: str = "training_data.jsonl") -> Pipeline:
     pipe.fit(X, y)
     return pipe
 
-try:
-    MODEL = train_model()
-except Exception:
-    MODEL = None
+def export_model(extra_path: str = INTENT_TRAINING_DATA, out_path: str = INTENT_MODEL_PATH) -> Dict[str, Any]:
+    """Train on the current data and write the versioned artifact.
+
+    :return: The artifact dict {model, data_hash, sklearn_version, trained_at}.
+    """
+    import joblib
+    import sklearn
+
+    artifact = {
+        "model": train_model(extra_path),
+        "data_hash": training_data_hash(load_training_data(extra_path)),
+        "sklearn_version": sklearn.__version__,
+        "trained_at": time.time(),
+    }
+    out = Path(out_path).expanduser()
+    out.parent.mkdir(parents=True, exist_ok=True)
+    tmp = out.with_suffix(out.suffix + ".tmp")
+    joblib.dump(artifact, tmp)
+    tmp.replace(out)
+    return artifact
+
+def load_model(extra_path: str = INTENT_TRAINING_DATA, artifact_path: str = INTENT_MODEL_PATH) -> Any:
+    """Load the artifact, retraining only if it is missing or stale."""
+    import joblib
+    import sklearn
+
+    expected = training_data_hash(load_training_data(extra_path))
+    p = Path(artifact_path).expanduser()
+    if p.exists():
+        try:
+            artifact = joblib.load(p)
+            if artifact.get("data_hash") == expected and artifact.get("sklearn_version") == sklearn.__version__:
+                return artifact["model"]
+        except Exception as e:
+            print(f"[INTENT] Ignoring unreadable model artifact {p}: {e}")
+    print("[INTENT] Training data changed or no artifact; retraining")
+    try:
+        return export_model(extra_path, artifact_path)["model"]
+    except OSError as e:
+        print(f"[INTENT] Could not write model artifact: {e}")
+        return train_model(extra_path)
+
+_model_lock = threading.Lock()
+_MODEL: Any = None
+_model_loaded = False
+
+def get_model() -> Any:
+    """The process-wide model, loaded on first use; None if it cannot be built."""
+    global _MODEL, _model_loaded
+    if not _model_loaded:
+        with _model_lock:
+            if not _model_loaded:
+                try:
+                    if INTENT_BACKEND == "online":
+                        from .online_intent import load_learner
+                        _MODEL = load_learner()
+                    else:
+                        _MODEL = load_model()
+                except Exception as e:
+                    print(f"[INTENT] Intent model unavailable: {e}")
+                    _MODEL = None
+                _model_loaded = True
+    return _MODEL
+
+def predict_proba(text: str) -> Tuple[str, float]:
+    """Most likely label and its probability ((FALLBACK_LABEL, 0.0) without a model)."""
+    model = get_model()
+    if model is None:
+        return FALLBACK_LABEL, 0.0
+    probs = model.predict_proba([text])[0]
+    best = int(probs.argmax())
+    return str(model.classes_[best]), float(probs[best])
+
+def predict_label(text: str, threshold: Optional[float] = None) -> str:
+    """Predicted label, or FALLBACK_LABEL when confidence is below `threshold`."""
+    threshold = INTENT_CONFIDENCE_THRESHOLD if threshold is None else threshold
+    label, conf = predict_proba(text)
+    return label if conf >= threshold else FALLBACK_LABEL
+
+def predict_labels(texts: List[str], threshold: Optional[float] = None) -> List[str]:
+    """Vectorized `predict_label`: one predict_proba matrix call for all texts."""
+    if not texts:
+        return []
+    threshold = INTENT_CONFIDENCE_THRESHOLD if threshold is None else threshold
+    model = get_model()
+    if model is None:
+        return [FALLBACK_LABEL] * len(texts)
+    probs = model.predict_proba(list(texts))
+    best = probs.argmax(axis=1)
+    return [
+        str(model.classes_[b]) if probs[i, b] >= threshold else FALLBACK_LABEL
+        for i, b in enumerate(best)
+    ]
+
+def main(argv: Optional[list] = None) -> None:
+    ap = argparse.ArgumentParser(description="Train/export the RunBuddy intent model")
+    ap.add_argument("--export", action="store_true", help="Train and write the model artifact")
+    ap.add_argument("--data", default=INTENT_TRAINING_DATA, help="Extra JSONL training data")
+    ap.add_argument("--out", default=INTENT_MODEL_PATH, help="Artifact path")
+    args = ap.parse_args(argv)
+    if args.export:
+        artifact = export_model(args.data, args.out)
+        print(f"[INTENT] Wrote {args.out} (data {artifact['data_hash'][:12]}, sklearn {artifact['sklearn_version']})")
+    else:
+        ap.print_help()
 
-def predict_label(text: str) -> str:
-    if MODEL is None:
-        return "free_form"
-    return MODEL.predict([text])[0]
+if __name__ == "__main__":
+    main()
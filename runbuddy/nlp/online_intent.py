@@ -0,0 +1,234 @@
+"""Incremental intent learner (hashed features + SGD `partial_fit`).
+
+Used when INTENT_BACKEND=online. Labelled queries are appended to a JSONL
+feedback log ({"text": ..., "label": ...} per line) and absorbed in
+mini-batches; no full retrain is ever needed:
+
+    python -m runbuddy.nlp.online_intent --learn [--log intent_feedback.jsonl]
+
+- Features come from a HashingVectorizer with 2**INTENT_HASH_BITS columns,
+  so memory stays fixed however much vocabulary the log contains.
+- The model and the log read offset are checkpointed every
+  INTENT_CHECKPOINT_EVERY mini-batches; a restart loads the checkpoint and
+  only reads log lines added since.
+- The label set is fixed (INTENT_LABELS); rows with other labels are skipped.
+"""
+
+import argparse
+import json
+import random
+import threading
+import time
+from pathlib import Path
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+from ..config import (
+    INTENT_TRAINING_DATA,
+    INTENT_FEEDBACK_LOG,
+    INTENT_ONLINE_CHECKPOINT,
+    INTENT_HASH_BITS,
+    INTENT_ONLINE_BATCH_SIZE,
+    INTENT_CHECKPOINT_EVERY,
+    INTENT_LABELS,
+)
+from .intent_model import load_training_data
+
+BOOTSTRAP_EPOCHS = 20
+
+
+def _vectorizer(hash_bits: int) -> Any:
+    from sklearn.feature_extraction.text import HashingVectorizer
+    return HashingVectorizer(n_features=2 ** hash_bits, ngram_range=(1, 2), alternate_sign=False, norm="l2")
+
+
+def _read_batches(path: Path, offset: int, batch_size: int) -> Iterator[Tuple[List[Tuple[str, str]], int]]:
+    """Yield (rows, offset after them) from `offset`; a trailing partial line is left unread."""
+    with path.open("rb") as f:
+        f.seek(offset)
+        batch: List[Tuple[str, str]] = []
+        while True:
+            line = f.readline()
+            if not line or not line.endswith(b"\n"):
+                break
+            offset += len(line)
+            try:
+                obj = json.loads(line)
+                batch.append((str(obj["text"]), str(obj["label"])))
+            except Exception:
+                continue
+            if len(batch) >= batch_size:
+                yield batch, offset
+                batch = []
+        if batch:
+            yield batch, offset
+
+
+class OnlineIntentLearner:
+    """Hashed-feature SGD classifier exposing `predict_proba` / `classes_` like the batch model."""
+
+    def __init__(self, labels: Optional[List[str]] = None, hash_bits: int = INTENT_HASH_BITS,
+                 checkpoint_path: str = INTENT_ONLINE_CHECKPOINT):
+        """
+        :param labels: Fixed label set (every label the model may ever learn).
+        :param hash_bits: log2 of the feature-space size.
+        :param checkpoint_path: Where the model and log offset are saved.
+        """
+        from sklearn.linear_model import SGDClassifier
+
+        self.labels = sorted(set(labels or INTENT_LABELS))
+        self.hash_bits = hash_bits
+        self.checkpoint_path = Path(checkpoint_path).expanduser()
+        self._vec = _vectorizer(hash_bits)
+        self._clf = SGDClassifier(loss="log_loss", alpha=1e-4, random_state=0)
+        self._lock = threading.RLock()
+        self.log_offset = 0
+        self.seen = 0
+        self.skipped = 0
+        self._batches_since_checkpoint = 0
+
+    @property
+    def classes_(self) -> Any:
+        return self._clf.classes_
+
+    @property
+    def fitted(self) -> bool:
+        return hasattr(self._clf, "classes_")
+
+    def partial_fit(self, rows: List[Tuple[str, str]]) -> int:
+        """Update the model with one mini-batch; returns the number of rows used."""
+        usable = [(t, y) for t, y in rows if y in self.labels]
+        with self._lock:
+            self.skipped += len(rows) - len(usable)
+            if not usable:
+                return 0
+            X = self._vec.transform([t for t, _ in usable])
+            self._clf.partial_fit(X, [y for _, y in usable], classes=self.labels)
+            self.seen += len(usable)
+        return len(usable)
+
+    def bootstrap(self, extra_path: str = INTENT_TRAINING_DATA, epochs: int = BOOTSTRAP_EPOCHS) -> None:
+        """Initial fit on the seed/training data (a few shuffled passes)."""
+        data = load_training_data(extra_path)
+        rng = random.Random(0)
+        for _ in range(epochs):
+            rng.shuffle(data)
+            self.partial_fit(data)
+
+    def learn_from_log(self, log_path: str = INTENT_FEEDBACK_LOG,
+                       batch_size: int = INTENT_ONLINE_BATCH_SIZE) -> int:
+        """Absorb log lines added since the last call/checkpoint.
+
+        :return: Rows learned.
+        """
+        path = Path(log_path)
+        if not path.exists():
+            return 0
+        with self._lock:
+            if path.stat().st_size < self.log_offset:
+                print(f"[INTENT] Feedback log {path} shrank (rotated?); reading from the start")
+                self.log_offset = 0
+            learned = 0
+            for rows, offset in _read_batches(path, self.log_offset, batch_size):
+                learned += self.partial_fit(rows)
+                self.log_offset = offset
+                self._batches_since_checkpoint += 1
+                if self._batches_since_checkpoint >= INTENT_CHECKPOINT_EVERY:
+                    self.checkpoint()
+            if self._batches_since_checkpoint:
+                self.checkpoint()
+        return learned
+
+    def predict_proba(self, texts: List[str]) -> Any:
+        with self._lock:
+            return self._clf.predict_proba(self._vec.transform(list(texts)))
+
+    def checkpoint(self) -> None:
+        """Atomically write the model and log offset."""
+        import joblib
+        import sklearn
+
+        with self._lock:
+            state = {
+                "clf": self._clf,
+                "labels": self.labels,
+                "hash_bits": self.hash_bits,
+                "log_offset": self.log_offset,
+                "seen": self.seen,
+                "skipped": self.skipped,
+                "sklearn_version": sklearn.__version__,
+                "saved_at": time.time(),
+            }
+            self._batches_since_checkpoint = 0
+            try:
+                self.checkpoint_path.parent.mkdir(parents=True, exist_ok=True)
+                tmp = self.checkpoint_path.with_suffix(self.checkpoint_path.suffix + ".tmp")
+                joblib.dump(state, tmp)
+                tmp.replace(self.checkpoint_path)
+            except OSError as e:
+                print(f"[INTENT] Could not write online checkpoint: {e}")
+
+    @classmethod
+    def restore(cls, checkpoint_path: str = INTENT_ONLINE_CHECKPOINT) -> Optional["OnlineIntentLearner"]:
+        """Load a compatible checkpoint; None if missing, unreadable or the config changed."""
+        import joblib
+        import sklearn
+
+        p = Path(checkpoint_path).expanduser()
+        if not p.exists():
+            return None
+        try:
+            state = joblib.load(p)
+        except Exception as e:
+            print(f"[INTENT] Ignoring unreadable online checkpoint {p}: {e}")
+            return None
+        if (state.get("labels") != sorted(set(INTENT_LABELS)) or state.get("hash_bits") != INTENT_HASH_BITS
+                or state.get("sklearn_version") != sklearn.__version__):
+            print("[INTENT] Online checkpoint was built with different settings; starting over")
+            return None
+        learner = cls(state["labels"], state["hash_bits"], checkpoint_path)
+        learner._clf = state["clf"]
+        learner.log_offset = state.get("log_offset", 0)
+        learner.seen = state.get("seen", 0)
+        learner.skipped = state.get("skipped", 0)
+        return learner
+
+    def stats(self) -> Dict[str, Any]:
+        return {"seen": self.seen, "skipped": self.skipped, "log_offset": self.log_offset,
+                "n_features": 2 ** self.hash_bits, "labels": list(self.labels)}
+
+
+def load_learner(checkpoint_path: str = INTENT_ONLINE_CHECKPOINT,
+                 log_path: str = INTENT_FEEDBACK_LOG) -> OnlineIntentLearner:
+    """Restore from the checkpoint (bootstrapping if there is none) and catch up on the log."""
+    learner = OnlineIntentLearner.restore(checkpoint_path)
+    if learner is None:
+        learner = OnlineIntentLearner(checkpoint_path=checkpoint_path)
+        learner.bootstrap()
+        learner.checkpoint()
+    learned = learner.learn_from_log(log_path)
+    if learned:
+        print(f"[INTENT] Learned {learned} new feedback rows")
+    return learner
+
+
+def record_feedback(text: str, label: str, log_path: str = INTENT_FEEDBACK_LOG) -> None:
+    """Append one labelled query to the feedback log."""
+    with open(log_path, "a", encoding="utf-8") as f:
+        f.write(json.dumps({"text": text, "label": label}, ensure_ascii=False) + "\n")
+
+
+def main(argv: Optional[list] = None) -> None:
+    ap = argparse.ArgumentParser(description="Update the online RunBuddy intent model")
+    ap.add_argument("--learn", action="store_true", help="Absorb new feedback-log rows and checkpoint")
+    ap.add_argument("--log", default=INTENT_FEEDBACK_LOG, help="Feedback JSONL log")
+    ap.add_argument("--checkpoint", default=INTENT_ONLINE_CHECKPOINT, help="Checkpoint path")
+    args = ap.parse_args(argv)
+    if args.learn:
+        learner = load_learner(args.checkpoint, args.log)
+        print(f"[INTENT] Online model: {learner.stats()}")
+    else:
+        ap.print_help()
+
+
+if __name__ == "__main__":
+    main()
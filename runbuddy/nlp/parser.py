@@ -1,28 +1,37 @@
-"""NLP parsing utilities. Duckling-first time extraction + fallbacks."""
+"""NLP parsing utilities. Duckling-first time extraction + fallbacks.
+
+spaCy and dateparser are heavy to import, so they are loaded lazily on
+first use (thread-safe) instead of at import time.
+"""
 
 
 # nlp_utils.py (Duckling-first NLP)
-from typing import Optional, Dict, List
+from typing import Any, Optional, Dict, List, Tuple
+from collections import Counter
 from datetime import datetime
 from zoneinfo import ZoneInfo
-import os, json
-import dateparser
-from dateparser.search import search_dates
-
-try:
-    import spacy
-    _NLP = spacy.load("en_core_web_sm")
-except Exception:
-    _NLP = None
+import os, json, re, threading, copy, hashlib
 
-from .duckling_client import parse_time as duckling_time
+from ..cache import TTLCache
+from ..config import (
+    SPACY_MODEL,
+    SPACY_EXCLUDE,
+    PARSE_CACHE_MAX_ENTRIES,
+    PARSE_CACHE_TTL_S,
+    PARSE_CACHE_BUCKET_S,
+    PARSE_BATCH_SIZE,
+)
+from .duckling_client import parse_time as duckling_time, duckling_available
+from .fast_time import fast_extract_datetime
+from .date_resolver import resolve_datetime
+from .gazetteer import get_gazetteer
 
 LOCAL_TZ = ZoneInfo("America/Toronto")
 
 try:
-    from nlp_model import predict_label as ml_predict_label
+    from .intent_model import predict_label as ml_predict_label, predict_labels as ml_predict_labels
 except Exception:
-    ml_predict_label = None
+    ml_predict_label = ml_predict_labels = None
 
 _DEF_POD = {"morning":"07:30","noon":"12:00","afternoon":"15:00","evening":"18:30","night":"21:30","tonight":"21:30","midnight":"00:00"}
 try:
@@ -30,69 +39,136 @@ try:
 except Exception:
     _POD = _DEF_POD
 
+_nlp_lock = threading.Lock()
+_NLP: Any = None
+_nlp_loaded = False
+
+def _get_nlp() -> Any:
+    """Slim spaCy pipeline (NER only), loaded once on first use; None if unavailable."""
+    global _NLP, _nlp_loaded
+    if _nlp_loaded:
+        return _NLP
+    with _nlp_lock:
+        if not _nlp_loaded:
+            try:
+                import spacy
+                try:
+                    _NLP = spacy.load(SPACY_MODEL, exclude=SPACY_EXCLUDE)
+                except Exception:
+                    # Model layout differs (e.g. NER listens to a shared tok2vec): load it whole
+                    _NLP = spacy.load(SPACY_MODEL)
+            except Exception:
+                _NLP = None
+            _nlp_loaded = True
+    return _NLP
+
 def _to_local(dt: datetime) -> datetime:
     if dt.tzinfo is None:
         return dt.replace(tzinfo=LOCAL_TZ)
     return dt.astimezone(LOCAL_TZ)
 
-def extract_city(text: str) -> Optional[str]:
-    if _NLP:
-        doc = _NLP(text)
-        for ent in doc.ents:
-            if ent.label_ in ("GPE", "LOC", "FAC"):
-                return ent.text.strip()
+def _place_entity(doc: Any) -> Optional[str]:
+    for ent in doc.ents:
+        if ent.label_ in ("GPE", "LOC", "FAC"):
+            return ent.text.strip()
     return None
 
-def _part_of_day_default(text: str) -> Optional[str]:
-    t = text.lower()
-    for k,v in _POD.items():
-        if k in t:
-            return v
+def extract_city(text: str) -> Optional[str]:
+    nlp = _get_nlp()
+    if nlp:
+        return _place_entity(nlp(text))
     return None
 
-def extract_datetime(text: str, now: Optional[datetime] = None) -> Optional[datetime]:
+def extract_cities(texts: List[str], batch_size: int = PARSE_BATCH_SIZE) -> List[Optional[str]]:
+    """Batched `extract_city`: streams texts through `nlp.pipe`, results in input order."""
+    nlp = _get_nlp()
+    if not nlp:
+        return [None] * len(texts)
+    return [_place_entity(doc) for doc in nlp.pipe(texts, batch_size=batch_size)]
+
+# Which engine resolved each query: "fast", "duckling", "dateparser" or "none"
+_engine_counts: Counter = Counter()
+_engine_lock = threading.Lock()
+
+def time_engine_stats() -> Dict[str, int]:
+    """Per-engine counts of resolved queries (coverage of the fast path)."""
+    with _engine_lock:
+        return dict(_engine_counts)
+
+def extract_datetime_with_engine(text: str, now: Optional[datetime] = None) -> Tuple[Optional[datetime], str]:
+    """Resolve the query's time and report which engine produced it.
+
+    Order: precompiled fast path → Duckling → dateparser. The slower engines
+    only run when the fast path finds nothing.
+    """
     now = _to_local(now or datetime.now(LOCAL_TZ))
-    dt = duckling_time(text, base_dt=now)
-    if dt:
-        return _to_local(dt)
-
-    base = dateparser.parse(
-        text,
-        settings={
-            "RELATIVE_BASE": now,
-            "PREFER_DATES_FROM": "future",
-            "TIMEZONE": "America/Toronto",
-            "RETURN_AS_TIMEZONE_AWARE": True,
-        },
-    )
-    if not base:
-        return None
-    base = _to_local(base)
-
-    found = search_dates(
-        text,
-        settings={
-            "RELATIVE_BASE": base,
-            "PREFER_DATES_FROM": "future",
-            "TIMEZONE": "America/Toronto",
-            "RETURN_AS_TIMEZONE_AWARE": True,
-        },
-    )
-    if found:
-        _, candidate = found[-1]
-        candidate = _to_local(candidate)
-        if candidate.date() != base.date():
-            candidate = candidate.replace(year=base.year, month=base.month, day=base.day)
-        dt = candidate
-    else:
-        dt = base
-
-    if dt == base:
-        hhmm = _part_of_day_default(text)
-        if hhmm:
-            h, m = map(int, hhmm.split(":"))
-            dt = dt.replace(hour=h, minute=m, second=0, microsecond=0)
-    return _to_local(dt)
+    dt = fast_extract_datetime(text, now, _POD)
+    engine = "fast"
+    if dt is None and duckling_available():
+        dt = duckling_time(text, base_dt=now)
+        engine = "duckling"
+    if dt is None:
+        dt = resolve_datetime(text, now, _POD)
+        engine = "dateparser" if dt else "none"
+    with _engine_lock:
+        _engine_counts[engine] += 1
+    return (_to_local(dt) if dt else None), engine
+
+def extract_datetime(text: str, now: Optional[datetime] = None) -> Optional[datetime]:
+    return extract_datetime_with_engine(text, now)[0]
+
+_KM = r"(\d+(?:\.\d+)?)\s*(?:km|kms|kilometers?|kilometres?|k)\b"
+_MAX_LEN_RE = re.compile(r"\b(?:under|below|less than|shorter than|at most|up to|max(?:imum)?|no more than)\s+" + _KM)
+_MIN_LEN_RE = re.compile(r"\b(?:over|above|more than|longer than|at least|min(?:imum)?)\s+" + _KM)
+_MUD_RE = re.compile(r"\b(low|medium|moderate|high)\s+(?:mud|rain|mud/rain)(?:\s+risk)?\b")
+_NO_MUD_RE = re.compile(r"\b(?:no|not|without|avoid(?:ing)?)\s+(?:much\s+)?mud(?:dy)?\b|\bdry trail")
+_SHADE_RE = re.compile(r"\b(?:shaded|shady|lots of shade|(?:good|high|plenty of) shade)\b")
+# Difficulty words only count next to a trail noun ("easy run", "hard flat trail")
+# or the word difficulty/level, so "raining hard" or "moderate mud" set no filter.
+_LEVEL = r"(easy|moderate|hard|difficult|challenging)"
+_TRAIL_NOUN = r"(?:trails?|runs?|routes?|loops?|paths?|courses?)"
+_DIFFICULTY_RE = re.compile(
+    r"\b" + _LEVEL + r"(?:\s+(?:paved|gravel|forest|natural|flat|ravine|short|long|little))?\s+" + _TRAIL_NOUN + r"\b"
+    r"|\b(?:difficulty|level)\s*(?::|=|is|of)?\s*" + _LEVEL + r"\b"
+    r"|\b" + _LEVEL + r"\s+(?:difficulty|level)\b"
+)
+_TERRAIN_RE = re.compile(r"\b(paved|gravel|forest|natural|flat|ravine|boardwalk)\b")
+
+def extract_trail_constraints(text: str) -> Dict[str, Any]:
+    """Pull simple trail filters out of a question.
+
+    Recognizes length bounds ("under 8 km"), mud risk ("low mud risk"),
+    shade, difficulty next to a trail noun ("easy run", "difficulty: hard")
+    and terrain words. Keys match `TrailIndex.query`.
+
+    :param text: Free-form question.
+    :return: Dict of constraints (empty when none are mentioned).
+    """
+    t = text.lower()
+    out: Dict[str, Any] = {}
+    m = _MAX_LEN_RE.search(t)
+    if m:
+        out["max_length_km"] = float(m.group(1))
+    m = _MIN_LEN_RE.search(t)
+    if m:
+        out["min_length_km"] = float(m.group(1))
+    mud = _MUD_RE.search(t)
+    if mud:
+        out["mud_risk"] = "medium" if mud.group(1) == "moderate" else mud.group(1)
+    elif _NO_MUD_RE.search(t):
+        out["mud_risk"] = "low"
+    if _SHADE_RE.search(t):
+        out["shade"] = ["high", "mixed", "moderate"]
+    for m in _DIFFICULTY_RE.finditer(t):
+        if mud and m.start() < mud.end() and mud.start() < m.end():
+            continue  # a word already used for the mud constraint
+        level = next(g for g in m.groups() if g)
+        out["difficulty"] = {"difficult": "hard", "challenging": "hard"}.get(level, level)
+        break
+    m = _TERRAIN_RE.search(t)
+    if m:
+        out["terrain"] = m.group(1)
+    return out
 
 def classify_intent(text: str) -> str:
     if ml_predict_label:
@@ -102,6 +178,19 @@ def classify_intent(text: str) -> str:
                 return lbl
         except Exception:
             pass
+    return _rule_intent(text)
+
+def classify_intents(texts: List[str]) -> List[str]:
+    """Batched `classify_intent`: one model call for all texts, rules for the rest."""
+    labels: List[Optional[str]] = [None] * len(texts)
+    if ml_predict_labels and texts:
+        try:
+            labels = list(ml_predict_labels(texts))
+        except Exception:
+            pass
+    return [lbl if lbl and lbl != "free_form" else _rule_intent(t) for t, lbl in zip(texts, labels)]
+
+def _rule_intent(text: str) -> str:
     t = text.lower()
     if "tomorrow" in t and "run" in t:
         return "where_tomorrow"
@@ -109,27 +198,147 @@ def classify_intent(text: str) -> str:
         return "where_today"
     return "free_form"
 
-def parse_user_query(q: str, allowed_cities: Optional[List[str]] = None, now: Optional[datetime] = None) -> Dict:
+# Memoized parse results. Keys combine the normalized text, the reference time
+# bucketed within its local day (so "tomorrow" never crosses midnight), the
+# allowed cities and a fingerprint of _POD, so changing either misses the cache.
+PARSE_CACHE = TTLCache(max_entries=PARSE_CACHE_MAX_ENTRIES, ttl_s=PARSE_CACHE_TTL_S)
+_WS_RE = re.compile(r"\s+")
+
+def _normalize_query(q: str) -> str:
+    return _WS_RE.sub(" ", q.strip().lower()).rstrip("?!. ")
+
+def _time_bucket(now: datetime) -> str:
+    local = _to_local(now)
+    since_midnight = local.hour * 3600 + local.minute * 60 + local.second
+    return f"{local.date().isoformat()}#{since_midnight // max(1, PARSE_CACHE_BUCKET_S)}"
+
+def _config_fingerprint(allowed_cities: Optional[List[str]]) -> str:
+    blob = json.dumps([sorted(_POD.items()), sorted(allowed_cities or [])])
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()[:16]
+
+def parse_cache_key(q: str, allowed_cities: Optional[List[str]] = None, now: Optional[datetime] = None) -> str:
+    now = now or datetime.now(LOCAL_TZ)
+    return "|".join((_normalize_query(q), _time_bucket(now), _config_fingerprint(allowed_cities)))
+
+def parse_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters of the parse cache."""
+    return PARSE_CACHE.stats()
+
+def invalidate_parse_cache() -> None:
+    """Drop all memoized parses (e.g. after editing _POD or the city list in place)."""
+    PARSE_CACHE.invalidate()
+
+def set_part_of_day(table: Dict[str, str]) -> None:
+    """Replace the part-of-day table and invalidate cached parses."""
+    global _POD
+    _POD = {**_DEF_POD, **table}
+    invalidate_parse_cache()
+
+def parse_user_query(q: str, allowed_cities: Optional[List[str]] = None, now: Optional[datetime] = None,
+                     use_cache: bool = True) -> Dict:
+    """Parse a question into intent, city, datetime and trail constraints.
+
+    Results are memoized per (normalized text, time bucket, config); a hit
+    returns a copy computed at most PARSE_CACHE_BUCKET_S earlier, so relative
+    offsets such as "in 2 hours" may be off by up to one bucket.
+    """
+    if not use_cache:
+        return _parse_user_query(q, allowed_cities, now)
+    key = parse_cache_key(q, allowed_cities, now)
+    cached = PARSE_CACHE.get(key)
+    if cached is None:
+        cached = _parse_user_query(q, allowed_cities, now)
+        PARSE_CACHE.set(key, cached)
+    out = copy.deepcopy(cached)
+    out["raw"] = q
+    return out
+
+def parse_user_queries(texts: List[str], allowed_cities: Optional[List[str]] = None,
+                       now: Optional[datetime] = None, batch_size: int = PARSE_BATCH_SIZE,
+                       use_cache: bool = True) -> List[Dict]:
+    """Parse many questions at once; results are returned in input order.
+
+    Cache hits are served directly. The remaining distinct queries get one
+    vectorized intent-model call and one `nlp.pipe` pass (only for texts
+    that name no known place); time extraction stays per query.
+
+    :param texts: Questions to parse.
+    :param allowed_cities: Optional list of cities to constrain to.
+    :param now: Reference time shared by the batch.
+    :param batch_size: spaCy `nlp.pipe` batch size.
+    :return: One parse dict per input text.
+    """
+    now = now or datetime.now(LOCAL_TZ)
+    keys = [parse_cache_key(q, allowed_cities, now) for q in texts]
+    found: Dict[str, Dict] = {}
+    todo: Dict[str, str] = {}
+    for q, key in zip(texts, keys):
+        if key in found or key in todo:
+            continue
+        hit = PARSE_CACHE.get(key) if use_cache else None
+        if hit is not None:
+            found[key] = hit
+        else:
+            todo[key] = q
+
+    if todo:
+        todo_keys, todo_texts = list(todo), list(todo.values())
+        intents = classify_intents(todo_texts)
+        cities = [_allowed_city_in_text(q, allowed_cities) for q in todo_texts]
+        need_ner = [i for i, c in enumerate(cities) if c is None]
+        for i, ner_city in zip(need_ner, extract_cities([todo_texts[i] for i in need_ner], batch_size)):
+            cities[i] = _constrain_city(ner_city, allowed_cities)
+        for key, q, intent, city in zip(todo_keys, todo_texts, intents, cities):
+            dt, engine = extract_datetime_with_engine(q, now=now)
+            found[key] = _assemble(q, intent, city, dt, engine)
+            if use_cache:
+                PARSE_CACHE.set(key, found[key])
+
+    out = []
+    for q, key in zip(texts, keys):
+        res = copy.deepcopy(found[key])
+        res["raw"] = q
+        out.append(res)
+    return out
+
+def _allowed_city_in_text(q: str, allowed_cities: Optional[List[str]]) -> Optional[str]:
+    """First known place named in the text, via the gazetteer (no NER needed).
+
+    Aliases and neighbourhoods map to their city ("STC" -> Scarborough).
+    With an allowed list, places in other cities are skipped.
+    """
+    m = get_gazetteer(allowed_cities).match(q, allowed_cities)
+    if m is None:
+        return None
+    return _allowed_spelling(m.city, allowed_cities) if allowed_cities else m.city
+
+def _allowed_spelling(city: str, allowed_cities: List[str]) -> Optional[str]:
+    return next((c for c in allowed_cities if c.lower() == city.lower()), None)
+
+def _constrain_city(city_found: Optional[str], allowed_cities: Optional[List[str]]) -> Optional[str]:
+    """Map an NER place to its allowed-city spelling; unconstrained when no list is given."""
+    if city_found:
+        city_found = get_gazetteer(allowed_cities).resolve(city_found) or city_found
+    if not allowed_cities:
+        return city_found
+    return _allowed_spelling(city_found, allowed_cities) if city_found else None
+
+def _parse_user_query(q: str, allowed_cities: Optional[List[str]] = None, now: Optional[datetime] = None) -> Dict:
     intent = classify_intent(q)
-    dt = extract_datetime(q, now=now)
-
-    # City constrained to allowed list (if provided)
-    city_found = extract_city(q)
-    city_final = None
-    if allowed_cities:
-        t = q.lower()
-        for c in allowed_cities:
-            if c.lower() in t:
-                city_final = c
-                break
-        if not city_final and city_found and any(c.lower() == city_found.lower() for c in allowed_cities):
-            city_final = next(c for c in allowed_cities if c.lower() == city_found.lower())
-    else:
-        city_final = city_found
+    dt, time_engine = extract_datetime_with_engine(q, now=now)
+
+    # City constrained to allowed list (if provided); NER only runs when the gazetteer finds no place
+    city_final = _allowed_city_in_text(q, allowed_cities)
+    if not city_final:
+        city_final = _constrain_city(extract_city(q), allowed_cities)
+    return _assemble(q, intent, city_final, dt, time_engine)
 
+def _assemble(q: str, intent: str, city_final: Optional[str], dt: Optional[datetime], time_engine: str) -> Dict:
     return {
         "intent": intent,
         "city": city_final,
         "datetime": (dt.isoformat() if dt else None),
+        "time_engine": time_engine,
+        "constraints": extract_trail_constraints(q),
         "raw": q,
     }
@@ -0,0 +1,151 @@
+"""Compact, token-lean encoding of the recommender context.
+
+Instead of one JSON object per trail (repeated keys, nulls), the context is
+sent as a header-plus-rows table with short level codes:
+
+    run: 2025-08-15 07:00
+    weather: temp 18C, precip 0mm, wind 8km/h, clear
+    trails:
+    name|city|km|diff|terrain|sens|shade|mud|elev|hazards
+    Bluffers Park Trail|Scarborough|2|E|Paved|L|L|L|L|Multi-use path
+
+Columns that are empty for every trail are left out. When the estimated
+size exceeds the token budget, low-value columns are dropped first
+(DROP_ORDER), then hazard notes are shortened, then trailing rows go.
+The format is explained to the model by `prompts.TRAIL_CONTEXT_FORMAT_NOTE`.
+"""
+
+import re
+from datetime import datetime
+from typing import Any, Callable, Dict, List, Optional, Tuple
+
+from ..models.domain import Trail
+
+_LEVEL_CODES = {"none": "L", "minimal": "L", "low": "L", "mixed": "M", "medium": "M",
+                "moderate": "M", "high": "H", "easy": "E", "hard": "H", "difficult": "H",
+                "challenging": "H"}
+_SPLIT_RE = re.compile(r"\s*(?:[-–—/]|\bto\b)\s*")
+_TOKEN_RE = re.compile(r"\w+|[^\w\s]")
+
+HAZARD_MAX_CHARS = 48
+
+
+def _levels(value: Optional[str]) -> str:
+    """Level codes: "Medium" -> "M", "Easy–Moderate" -> "E-M"; other text is kept."""
+    if not value:
+        return ""
+    parts = [p.lower() for p in _SPLIT_RE.split(value.strip()) if p]
+    if parts and all(p in _LEVEL_CODES for p in parts):
+        return "-".join(_LEVEL_CODES[p] for p in parts)
+    return _text(value)
+
+
+def _text(value: Any) -> str:
+    if value is None:
+        return ""
+    return re.sub(r"\s*/\s*", "/", " ".join(str(value).split())).replace("|", "/")
+
+
+def _number(value: Optional[float]) -> str:
+    if value is None:
+        return ""
+    return f"{value:g}"
+
+
+# (header, Trail field, cell encoder), in table order
+COLUMNS: List[Tuple[str, str, Callable[[Any], str]]] = [
+    ("name", "name", _text),
+    ("city", "location", _text),
+    ("km", "length_km", _number),
+    ("diff", "difficulty", _levels),
+    ("terrain", "terrain_type", _text),
+    ("sens", "weather_sensitivity", _levels),
+    ("shade", "shade_coverage", _levels),
+    ("mud", "mud_rain_risk", _levels),
+    ("elev", "elevation_gain", _levels),
+    ("hazards", "hazards", _text),
+]
+# Columns removed first when over budget (safety-relevant ones are never dropped)
+DROP_ORDER = ("elev", "km", "diff", "terrain")
+
+
+def estimate_tokens(text: str) -> int:
+    """Rough BPE token count: one per word or symbol, plus one per 6 extra characters of long words."""
+    return sum(1 + (len(t) - 1) // 6 for t in _TOKEN_RE.findall(text))
+
+
+def _run_line(calendar_event: Dict[str, Any]) -> Optional[str]:
+    start = calendar_event.get("start")
+    if start:
+        try:
+            return "run: " + datetime.fromisoformat(str(start).replace("Z", "+00:00")).strftime("%Y-%m-%d %H:%M")
+        except ValueError:
+            return f"run: {start}"
+    parts = [str(calendar_event[k]) for k in ("date", "time") if calendar_event.get(k)]
+    return "run: " + " ".join(parts) if parts else None
+
+
+def _weather_line(weather: Dict[str, Any]) -> Optional[str]:
+    parts = []
+    for key, label, unit in (("temperature", "temp", "C"), ("precipitation", "precip", "mm"),
+                             ("windspeed", "wind", "km/h")):
+        if weather.get(key) is not None:
+            parts.append(f"{label} {weather[key]:g}{unit}" if isinstance(weather[key], (int, float))
+                         else f"{label} {weather[key]}{unit}")
+    if weather.get("condition"):
+        parts.append(str(weather["condition"]))
+    return "weather: " + ", ".join(parts) if parts else None
+
+
+def _render(head: List[str], rows: List[List[str]], columns: List[str]) -> str:
+    idx = [i for i, (h, _, _) in enumerate(COLUMNS) if h in columns]
+    lines = head + ["trails:", "|".join(COLUMNS[i][0] for i in idx)]
+    lines += ["|".join(r[i] for i in idx) for r in rows]
+    return "\n".join(lines)
+
+
+def encode_context(
+    calendar_event: Dict[str, Any],
+    weather_forecast: Dict[str, Any],
+    trails: List[Trail],
+    token_budget: Optional[int] = None,
+) -> Tuple[str, Dict[str, Any]]:
+    """Encode the context as a compact table, shrinking it to fit `token_budget`.
+
+    :param calendar_event: {"start": ISO} or {"date", "time"}.
+    :param weather_forecast: Snapshot {"temperature", "precipitation", "windspeed", "condition"}.
+    :param trails: Candidate trails (best first; trailing rows are dropped last).
+    :param token_budget: Max estimated tokens; None or <= 0 = unlimited.
+    :return: (text, info) with info = {"tokens", "trails", "columns", "dropped"}.
+    """
+    head = [line for line in (_run_line(calendar_event or {}), _weather_line(weather_forecast or {})) if line]
+    rows = [[enc(getattr(t, field)) for _, field, enc in COLUMNS] for t in trails]
+    columns = [h for i, (h, _, _) in enumerate(COLUMNS) if h in ("name", "city") or any(r[i] for r in rows)]
+    dropped: List[str] = []
+
+    def over(s: str) -> bool:
+        return bool(token_budget and token_budget > 0 and estimate_tokens(s) > token_budget)
+
+    text = _render(head, rows, columns)
+    for col in DROP_ORDER:
+        if not over(text):
+            break
+        if col in columns:
+            columns.remove(col)
+            dropped.append(col)
+            text = _render(head, rows, columns)
+    if over(text):
+        h = [c for c, _, _ in COLUMNS].index("hazards")
+        for r in rows:
+            if len(r[h]) > HAZARD_MAX_CHARS:
+                r[h] = r[h][:HAZARD_MAX_CHARS - 1].rstrip() + "…"
+        dropped.append("hazards>" + str(HAZARD_MAX_CHARS))
+        text = _render(head, rows, columns)
+    while over(text) and len(rows) > 1:
+        rows.pop()
+        text = _render(head, rows, columns)
+    if len(rows) < len(trails):
+        dropped.append(f"rows>{len(rows)}")
+
+    info = {"tokens": estimate_tokens(text), "trails": len(rows), "columns": columns, "dropped": dropped}
+    return text, info
@@ -0,0 +1,113 @@
+"""Incremental brace-balanced JSON object scanner for streamed LLM output.
+
+Text is fed in arbitrary chunks. The scanner skips any prose before the
+first "{", tracks nesting depth and string/escape state, and returns the
+object as soon as its closing brace arrives. Top-level fields are reported
+through `on_field(key, value)` the moment each value is complete, so a
+caller can show "trail_name" while "reason" is still being generated.
+"""
+
+import json
+from typing import Any, Callable, Dict, Optional
+
+FieldCallback = Callable[[str, Any], None]
+
+
+class JSONObjectScanner:
+    """Finds the first complete JSON object in a stream of text chunks."""
+
+    def __init__(self, on_field: Optional[FieldCallback] = None):
+        """
+        :param on_field: Called with (key, decoded value) for each top-level field.
+        """
+        self.on_field = on_field
+        self.text = ""
+        self._pos = 0
+        self._start: Optional[int] = None  # index of the current object's "{"
+        self._depth = 0
+        self._in_string = False
+        self._escape = False
+        self._expect_key = True
+        self._key_start: Optional[int] = None
+        self._key: Optional[str] = None
+        self._value_start: Optional[int] = None
+
+    def feed(self, chunk: str) -> Optional[Dict[str, Any]]:
+        """Consume a chunk; return the parsed object once it is complete, else None."""
+        self.text += chunk
+        text = self.text
+        while self._pos < len(text):
+            i = self._pos
+            ch = text[i]
+            self._pos += 1
+            if self._start is None:
+                if ch == "{":
+                    self._open_object(i)
+                continue
+            if self._in_string:
+                if self._escape:
+                    self._escape = False
+                elif ch == "\\":
+                    self._escape = True
+                elif ch == '"':
+                    self._in_string = False
+                    if self._depth == 1 and self._expect_key and self._key_start is not None:
+                        self._key = self._decode(text[self._key_start:i + 1])
+                        self._key_start = None
+                continue
+            if ch == '"':
+                self._in_string = True
+                if self._depth == 1 and self._expect_key:
+                    self._key_start = i
+            elif ch in "{[":
+                self._depth += 1
+            elif ch in "}]":
+                self._depth -= 1
+                if self._depth == 0:
+                    self._emit_field(i)
+                    obj = self._decode(text[self._start:i + 1])
+                    self._start = None
+                    if isinstance(obj, dict):
+                        return obj
+                    # Not valid JSON (e.g. "{placeholder}" in prose): keep scanning
+            elif self._depth == 1:
+                if ch == ":" and self._expect_key:
+                    self._expect_key = False
+                    self._value_start = i + 1
+                elif ch == ",":
+                    self._emit_field(i)
+        return None
+
+    def _open_object(self, i: int) -> None:
+        self._start = i
+        self._depth = 1
+        self._in_string = self._escape = False
+        self._expect_key = True
+        self._key = self._key_start = self._value_start = None
+
+    def _emit_field(self, end: int) -> None:
+        if self._key is not None and self._value_start is not None and self.on_field is not None:
+            raw = self.text[self._value_start:end].strip()
+            value = self._decode(raw)
+            if value is not None or raw == "null":
+                self.on_field(self._key, value)
+        self._key = self._value_start = None
+        self._expect_key = True
+
+    @staticmethod
+    def _decode(raw: str) -> Any:
+        try:
+            return json.loads(raw)
+        except ValueError:
+            return None
+
+
+def extract_json_object(text: str) -> Optional[Dict[str, Any]]:
+    """First JSON object in `text` (handles prose around it and code fences)."""
+    try:
+        obj = json.loads(text)
+        if isinstance(obj, dict):
+            return obj
+    except ValueError:
+        pass
+    return JSONObjectScanner().feed(text)
@@ -816,4 +816,27 @@ Output:
   "reason": "Both forecasts are clear, but the Scarborough option is closed due to an event; select the safe alternative.",
   "cautions": null
 }
-"""
\ No newline at end of file
+"""
+# --- Appended to the system prompt when the context is sent in the compact table form ---
+TRAIL_CONTEXT_FORMAT_NOTE = """
+Input format:
+The user message is a compact table carrying the same data as the JSON examples:
+  run: <date> <time>                                  (calendar_event)
+  weather: temp <°C>, precip <mm>, wind <km/h>, <condition>   (weather_forecast)
+  trails:                                             (trail_conditions, one row per trail)
+  name|city|km|diff|terrain|sens|shade|mud|elev|hazards
+Columns: name = name, city = location, km = length_km, diff = difficulty,
+terrain = terrain_type, sens = weather_sensitivity, shade = shade_coverage,
+mud = mud_rain_risk, elev = elevation_gain, hazards = hazards.
+Levels: L = low/minimal, M = medium/moderate/mixed, H = high; difficulty E = easy, M = moderate, H = hard;
+"E-M" means between the two. An empty cell means unknown. Columns may be left out to save space.
+Copy the name and city values exactly into trail_name and location.
+
+Example 1 in this format:
+run: 2025-08-15 07:00
+weather: temp 18C, precip 0mm, clear
+trails:
+name|city|km|diff|terrain|sens|shade|mud|elev|hazards
+Highland Creek Trail|Scarborough|9|E|Paved/Gravel|M|M|M|L|Flooding sometimes; mixed surface
+Bluffers Park Trail|Scarborough|2|E|Paved|L|L|L|L|Multi-use path
+"""
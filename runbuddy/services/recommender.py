@@ -1,14 +1,56 @@
-"""LLM (Groq) based trail recommender. Wraps prompts and parsing."""
+"""LLM (Groq) based trail recommender. Wraps prompts and parsing.
+
+Answers are memoized: requests with the same candidate trails, the same
+weather bands (temperature / precipitation / wind) and the same time-of-day
+bucket reuse the earlier answer without calling Groq.
+
+With stream=True the completion is read from Groq's stream API and parsed
+incrementally (`json_stream.JSONObjectScanner`): the call returns as soon as
+the JSON object closes, and `on_field(name, value)` fires for each field as
+it completes, so "trail_name" can be shown before "reason" has arrived.
+
+`recommend_with_deadline` caps the stage's latency: the LLM call runs on a
+worker thread, a hedged request to a cheaper model is fired after
+RECOMMENDER_HEDGE_AFTER_S, and once RECOMMENDER_DEADLINE_S has passed the
+rule-based pick from the local trail scores is returned instead. Its
+answers carry "source": "cache", "llm", "llm_hedge" or "rules".
+"""
 
 # llm_agent.py — Groq version
+import copy
+import hashlib
 import json
-import re
+import math
+import queue
+import threading
+import time
+from datetime import datetime
 from typing import Any, Dict, List, Optional
 import os
 
 from groq import Groq
-from ..config import GROQ_API_KEY
+from ..cache import SQLiteStore, TTLCache
+from ..config import (
+    GROQ_API_KEY,
+    RECOMMENDATION_CACHE_MAX_ENTRIES,
+    RECOMMENDATION_CACHE_TTL_S,
+    RECOMMENDATION_CACHE_MAX_ROWS,
+    RECOMMENDATION_CACHE_PATH,
+    RECOMMENDATION_TEMP_BAND_C,
+    RECOMMENDATION_TIME_BUCKET_H,
+    RECOMMENDER_CONTEXT_FORMAT,
+    RECOMMENDER_CONTEXT_TOKEN_BUDGET,
+    RECOMMENDER_DEADLINE_S,
+    RECOMMENDER_HEDGE_AFTER_S,
+    RECOMMENDER_HEDGE_MODEL,
+    RECOMMENDER_MODEL,
+)
+from ..models.domain import Trail
 from .prompts import TRAIL_ASSISTANT_SYSTEM_PROMPT_LITE as TRAIL_ASSISTANT_SYSTEM_PROMPT  # <- your prompt.py file
+from .prompts import TRAIL_CONTEXT_FORMAT_NOTE
+from .context_encoder import encode_context, estimate_tokens
+from .json_stream import FieldCallback, JSONObjectScanner, extract_json_object
+from .trail_scoring import rule_based_recommendation
 
 # Create Groq client (reads GROQ_API_KEY from env)
 # Create Groq client from config/env; kept module-level for reuse.
@@ -18,19 +60,7 @@ _REQUIRED_KEYS = ["trail_name", "location", "reason", "cautions"]
 
 def _extract_json(text: str) -> Optional[Dict[str, Any]]:
     """Extract the first JSON object from text (handles prose / code fences)."""
-    # Try direct parse
-    try:
-        return json.loads(text)
-    except Exception:
-        pass
-    # Fallback: find {...} block
-    m = re.search(r"\{(?:[^{}]|(?R))*\}", text, flags=re.DOTALL)
-    if m:
-        try:
-            return json.loads(m.group(0))
-        except Exception:
-            return None
-    return None
+    return extract_json_object(text or "")
 
 def _validate_model_output(payload: Dict[str, Any]) -> Dict[str, Any]:
     if not isinstance(payload, dict):
@@ -60,67 +90,315 @@ def _validate_model_output(payload: Dict[str, Any]) -> Dict[str, Any]:
 
     return out
 
-def _normalize_trails(trails: List[Dict[str, Any]]) -> List[Dict[str, Any]]:
-    """
-    Normalize trail records to the names used in your prompt examples.
-    Accepts either your Google Sheet keys or the normalized keys.
-    Preserves per-trail 'forecast' if present:
-    forecast: {temperature, precipitation, condition}
-    """
-    normed = []
-    for t in trails:
-        normed.append({
-            "name": t.get("name") or t.get("Trail Name"),
-            "location": t.get("location") or t.get("Location"),
-            "length_km": t.get("length_km") or t.get("Length (km)"),
-            "difficulty": t.get("difficulty") or t.get("Difficulty"),
-            "terrain_type": t.get("terrain_type") or t.get("Terrain Type"),
-            "weather_sensitivity": t.get("weather_sensitivity") or t.get("Weather Sensitivity"),
-            "shade_coverage": t.get("shade_coverage") or t.get("Shade Coverage"),
-            "mud_rain_risk": t.get("mud_rain_risk") or t.get("Mud/Rain Risk"),
-            "elevation_gain": t.get("elevation_gain") or t.get("Elevation Gain"),
-            "hazards": t.get("hazards") or t.get("Notes & Hazards"),
-            "forecast": t.get("forecast"),
-        })
-    return normed
+def _trail_context(trails: List[Trail]) -> List[Dict[str, Any]]:
+    """Trail records in the field-name shape used by the prompt examples."""
+    return [t.to_dict() for t in trails]
+
+def _system_prompt() -> str:
+    if RECOMMENDER_CONTEXT_FORMAT == "compact":
+        return TRAIL_ASSISTANT_SYSTEM_PROMPT + TRAIL_CONTEXT_FORMAT_NOTE
+    return TRAIL_ASSISTANT_SYSTEM_PROMPT
+
+def build_messages(calendar_event: Dict[str, Any], weather_forecast: Dict[str, Any],
+                   trail_conditions: List[Trail]) -> List[Dict[str, str]]:
+    """Chat messages for one request; logs the estimated prompt size."""
+    system = _system_prompt()
+    if RECOMMENDER_CONTEXT_FORMAT == "compact":
+        user, info = encode_context(calendar_event, weather_forecast, trail_conditions,
+                                    RECOMMENDER_CONTEXT_TOKEN_BUDGET)
+        dropped = f", dropped {', '.join(info['dropped'])}" if info["dropped"] else ""
+    else:
+        context = {
+            "calendar_event": calendar_event,         # {"date": "YYYY-MM-DD", "time": "HH:MM"}
+            "weather_forecast": weather_forecast,     # {"temperature": <num>, "precipitation": <num>, "condition": <str>}
+            "trail_conditions": _trail_context(trail_conditions)
+        }
+        user, dropped = json.dumps(context, ensure_ascii=False, separators=(",", ":")), ""
+    print(f"[REC] Prompt ~{estimate_tokens(system) + estimate_tokens(user)} tokens "
+          f"(context ~{estimate_tokens(user)}, {len(trail_conditions)} trails{dropped})")
+    return [
+        {"role": "system", "content": system},
+        {"role": "user", "content": user},
+    ]
+
+def _open_recommendation_cache() -> TTLCache:
+    # The SQLite file is only opened on first lookup/write (nothing is created at import).
+    disk = None
+    if RECOMMENDATION_CACHE_PATH:
+        disk = SQLiteStore(RECOMMENDATION_CACHE_PATH, "recommendations", max_rows=RECOMMENDATION_CACHE_MAX_ROWS)
+    return TTLCache(max_entries=RECOMMENDATION_CACHE_MAX_ENTRIES, ttl_s=RECOMMENDATION_CACHE_TTL_S, disk=disk)
+
+RECOMMENDATION_CACHE = _open_recommendation_cache()
+
+# Upper bounds (mm/h, km/h) of the precipitation and wind bands
+_PRECIP_BANDS = (0.05, 0.5, 2.5, 7.5)
+_WIND_BANDS = (10, 20, 35, 50)
+
+def _band(value: Any, bounds: tuple) -> Optional[int]:
+    if value is None:
+        return None
+    return next((i for i, b in enumerate(bounds) if float(value) < b), len(bounds))
+
+def weather_bands(weather: Dict[str, Any]) -> Dict[str, Optional[int]]:
+    """Quantized weather used in the cache key."""
+    t = weather.get("temperature")
+    return {
+        "temp": None if t is None else math.floor(float(t) / RECOMMENDATION_TEMP_BAND_C),
+        "precip": _band(weather.get("precipitation"), _PRECIP_BANDS),
+        "wind": _band(weather.get("windspeed"), _WIND_BANDS),
+        "condition": weather.get("condition"),
+    }
+
+def _time_bucket(calendar_event: Dict[str, Any]) -> Optional[int]:
+    """Hour-of-day bucket of the run ("start" ISO time or "time" HH:MM)."""
+    try:
+        if calendar_event.get("start"):
+            hour = datetime.fromisoformat(str(calendar_event["start"]).replace("Z", "+00:00")).hour
+        else:
+            hour = int(str(calendar_event["time"]).split(":")[0])
+    except (KeyError, ValueError):
+        return None
+    return hour // max(1, RECOMMENDATION_TIME_BUCKET_H)
+
+def candidate_set_hash(trails: List[Trail]) -> str:
+    """Order-independent hash of the candidate trails' contents."""
+    rows = sorted(json.dumps(t.to_dict(), sort_keys=True, ensure_ascii=False) for t in trails)
+    return hashlib.sha1("\n".join(rows).encode("utf-8")).hexdigest()
+
+def recommendation_cache_key(calendar_event: Dict[str, Any], weather_forecast: Dict[str, Any],
+                             trail_conditions: List[Trail], model: str, temperature: float) -> str:
+    blob = json.dumps({
+        "trails": candidate_set_hash(trail_conditions),
+        "weather": weather_bands(weather_forecast),
+        "time": _time_bucket(calendar_event),
+        "model": model,
+        "temperature": temperature,
+        "prompt": hashlib.sha1(_system_prompt().encode("utf-8")).hexdigest()[:12],
+        "budget": RECOMMENDER_CONTEXT_TOKEN_BUDGET,
+    }, sort_keys=True)
+    return hashlib.sha1(blob.encode("utf-8")).hexdigest()
+
+def recommendation_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters and hit rate of the recommendation cache."""
+    return RECOMMENDATION_CACHE.stats()
+
+def _cached_recommendation(key: str, on_field: Optional[FieldCallback]) -> Optional[Dict[str, Any]]:
+    cached = RECOMMENDATION_CACHE.get(key)
+    if cached is None:
+        return None
+    print("[REC] Recommendation cache hit")
+    if on_field is not None:
+        for k in _REQUIRED_KEYS:
+            on_field(k, cached.get(k))
+    return copy.deepcopy(cached)
+
+def _stream_json(messages: List[Dict[str, str]], model: str, temperature: float,
+                 on_field: Optional[FieldCallback], **request: Any) -> Optional[Dict[str, Any]]:
+    """Stream the completion and stop reading once the first JSON object closes."""
+    scanner = JSONObjectScanner(on_field=on_field)
+    stream = client.chat.completions.create(
+        model=model,
+        messages=messages,
+        temperature=temperature,
+        stream=True,
+        **request,
+    )
+    try:
+        for chunk in stream:
+            delta = chunk.choices[0].delta.content if chunk.choices else None
+            if delta:
+                parsed = scanner.feed(delta)
+                if parsed is not None:
+                    return parsed
+    finally:
+        close = getattr(stream, "close", None)
+        if close is not None:
+            close()  # drop the rest of the response
+    return None
 
 def get_trail_recommendation(
     calendar_event: Dict[str, Any],
     weather_forecast: Dict[str, Any],
-    trail_conditions: List[Dict[str, Any]],
+    trail_conditions: List[Trail],
     *,
-    model: str = "llama3-70b-8192",   # or "llama3-8b-8192" for cheaper
-    temperature: float = 0.2
+    model: str = RECOMMENDER_MODEL,
+    temperature: float = 0.2,
+    use_cache: bool = True,
+    stream: bool = False,
+    on_field: Optional[FieldCallback] = None,
+    timeout_s: Optional[float] = None,
 ) -> Dict[str, Any]:
     """
     Calls Groq chat with your system prompt and context.
     Returns a validated dict: { trail_name, location, reason, cautions }.
+    A cached answer for the same candidates, weather bands and time bucket
+    is returned without any network call (disable with use_cache=False).
+    With stream=True the answer is returned as soon as the JSON object is
+    complete; `on_field(name, value)` is called for each field as it arrives
+    (on a cache hit, once per field in order). `timeout_s` bounds the HTTP
+    request itself.
     """
-    trail_conditions = _normalize_trails(trail_conditions)
-    context = {
-        "calendar_event": calendar_event,         # {"date": "YYYY-MM-DD", "time": "HH:MM"}
-        "weather_forecast": weather_forecast,     # {"temperature": <num>, "precipitation": <num>, "condition": <str>}
-        "trail_conditions": trail_conditions
-    }
+    key = recommendation_cache_key(calendar_event, weather_forecast, trail_conditions, model, temperature) \
+        if use_cache else None
+    if key is not None:
+        cached = _cached_recommendation(key, on_field)
+        if cached is not None:
+            return cached
 
-    print("ANIL CONTEXT :")
-    print(json.dumps(context, indent=2, ensure_ascii=False))
+    messages = build_messages(calendar_event, weather_forecast, trail_conditions)
+    request = {"timeout": timeout_s} if timeout_s is not None else {}
 
+    if stream:
+        parsed = _stream_json(messages, model, temperature, on_field, **request)
+    else:
+        # Groq API: chat.completions
+        resp = client.chat.completions.create(
+            model=model,
+            messages=messages,
+            temperature=temperature,
+            **request,
+        )
+        raw = resp.choices[0].message.content
+        parsed = _extract_json(raw)
+    if not parsed:
+        raise ValueError("Could not extract JSON from model output.")
+    result = _validate_model_output(parsed)
+    if key is not None:
+        RECOMMENDATION_CACHE.set(key, copy.deepcopy(result))
+    return result
 
-    messages = [
-        {"role": "system", "content": TRAIL_ASSISTANT_SYSTEM_PROMPT},
-        {"role": "user", "content": json.dumps(context, ensure_ascii=False)}
-    ]
+class _FieldGate:
+    """Passes streamed fields from one attempt only (the first to produce a field)."""
 
-    # Groq API: chat.completions
-    resp = client.chat.completions.create(
-        model=model,
-        messages=messages,
-        temperature=temperature,
-    )
+    def __init__(self, on_field: Optional[FieldCallback]):
+        self.on_field = on_field
+        self.owner: Optional[str] = None
+        self._lock = threading.Lock()
 
-    raw = resp.choices[0].message.content
-    parsed = _extract_json(raw)
-    if not parsed:
-        raise ValueError("Could not extract JSON from model output.")
-    return _validate_model_output(parsed)
+    def for_source(self, source: str) -> Optional[FieldCallback]:
+        if self.on_field is None:
+            return None
+
+        def emit(name: str, value: Any) -> None:
+            with self._lock:
+                if self.owner is None:
+                    self.owner = source
+                if self.owner == source:
+                    self.on_field(name, value)
+        return emit
+
+    def replay(self, source: str, result: Dict[str, Any]) -> None:
+        """Show `result` if it is not what was streamed so far."""
+        with self._lock:
+            if self.on_field is None or self.owner == source:
+                return
+            if self.owner is not None:
+                print(f"[REC] Streamed answer from {self.owner} abandoned; using {source}")
+            self.owner = source
+            for k in _REQUIRED_KEYS:
+                self.on_field(k, result.get(k))
+
+def recommend_with_deadline(
+    calendar_event: Dict[str, Any],
+    weather_forecast: Dict[str, Any],
+    trail_conditions: List[Trail],
+    *,
+    city_weather: Optional[Dict[str, Dict[str, Any]]] = None,
+    model: str = RECOMMENDER_MODEL,
+    temperature: float = 0.2,
+    deadline_s: float = RECOMMENDER_DEADLINE_S,
+    hedge_after_s: float = RECOMMENDER_HEDGE_AFTER_S,
+    hedge_model: Optional[str] = RECOMMENDER_HEDGE_MODEL,
+    stream: bool = False,
+    on_field: Optional[FieldCallback] = None,
+) -> Dict[str, Any]:
+    """Recommendation that is returned within `deadline_s`, whatever the provider does.
+
+    The LLM request runs on a daemon thread. If it has not answered after
+    `hedge_after_s` (or fails earlier), the same request goes to `hedge_model`;
+    the first valid answer wins. At the deadline, or when every attempt
+    failed, the rule-based pick from the local trail scores is returned.
+
+    The cache is consulted once, under the primary model's key, and the
+    winning LLM answer (hedge included) is stored under that same key, so
+    the next identical request is a hit. Rule-based answers are not cached.
+
+    :param city_weather: Per-city snapshots for the rule-based fallback.
+    :param deadline_s: Budget for the whole stage; <= 0 disables the deadline.
+    :param hedge_after_s: Delay before the hedged request; <= 0 disables hedging.
+    :param hedge_model: Cheaper model for the hedge (None = no hedge).
+    :return: {trail_name, location, reason, cautions, source}.
+    """
+    key = recommendation_cache_key(calendar_event, weather_forecast, trail_conditions, model, temperature)
+    cached = _cached_recommendation(key, on_field)
+    if cached is not None:
+        return {**cached, "source": "cache"}
+    if deadline_s <= 0:
+        result = get_trail_recommendation(calendar_event, weather_forecast, trail_conditions, model=model,
+                                          temperature=temperature, use_cache=False, stream=stream,
+                                          on_field=on_field)
+        RECOMMENDATION_CACHE.set(key, copy.deepcopy(result))
+        return {**result, "source": "llm"}
+
+    started = time.monotonic()
+    deadline = started + deadline_s
+    gate = _FieldGate(on_field)
+    answers: "queue.Queue[tuple]" = queue.Queue()
+
+    def attempt(source: str, attempt_model: str) -> None:
+        try:
+            out = get_trail_recommendation(
+                calendar_event, weather_forecast, trail_conditions, model=attempt_model,
+                temperature=temperature, use_cache=False, stream=stream, on_field=gate.for_source(source),
+                timeout_s=max(0.1, deadline - time.monotonic()),
+            )
+        except Exception as e:
+            out = e
+        answers.put((source, out))
+
+    def launch(source: str, attempt_model: str) -> None:
+        threading.Thread(target=attempt, args=(source, attempt_model), daemon=True,
+                         name=f"runbuddy-rec-{source}").start()
+
+    hedge_at = started + hedge_after_s if (hedge_model and 0 < hedge_after_s < deadline_s) else None
+    launch("llm", model)
+    pending, fallback_reason = 1, "deadline"
+    parked: Optional[tuple] = None  # finished answer waiting behind the streaming attempt
+    while True:
+        now = time.monotonic()
+        wake = min(deadline, hedge_at) if hedge_at is not None else deadline
+        try:
+            source, out = answers.get(timeout=max(0.0, wake - now))
+        except queue.Empty:
+            if hedge_at is not None and time.monotonic() < deadline:
+                print(f"[REC] Hedging with {hedge_model} after {time.monotonic() - started:.1f}s")
+                launch("llm_hedge", hedge_model)
+                hedge_at, pending = None, pending + 1
+                continue
+            break
+        pending -= 1
+        if isinstance(out, Exception):
+            print(f"[REC] {source} failed: {out}")
+            if hedge_at is not None:
+                hedge_at = time.monotonic()  # hedge right away instead of waiting
+            elif pending == 0:
+                fallback_reason = "LLM errors"
+                break
+            continue
+        if gate.owner not in (None, source) and pending > 0:
+            # The other attempt is already streaming its answer; it gets until the deadline.
+            parked = parked or (source, out)
+            continue
+        parked = (source, out)
+        break
+
+    if parked is not None:
+        source, out = parked
+        RECOMMENDATION_CACHE.set(key, copy.deepcopy(out))
+        gate.replay(source, out)
+        print(f"[REC] Answer from {source} in {(time.monotonic() - started) * 1000:.0f}ms")
+        return {**out, "source": source}
+    result = rule_based_recommendation(trail_conditions, weather_forecast, city_weather=city_weather)
+    print(f"[REC] Using rule-based recommendation ({fallback_reason}, {deadline_s:g}s budget)")
+    gate.replay("rules", result)
+    return {**result, "source": "rules"}
@@ -1,12 +1,37 @@
 """Trail prefilter and simple city+weather chooser."""
 
-from typing import List, Dict, Tuple, Optional
-
-def prefilter_trails(trails: List[Dict], city: Optional[str]) -> List[Dict]:
-    if not city:
+from typing import Any, List, Dict, Tuple, Optional
+
+from ..models.domain import Trail
+from .trail_index import get_trail_index
+
+def prefilter_trails(
+    trails: List[Trail],
+    city: Optional[str],
+    constraints: Optional[Dict[str, Any]] = None,
+    version: Optional[str] = None,
+) -> List[Trail]:
+    """Narrow the catalog with the trail index.
+
+    Constraints use `TrailIndex.query` keywords (difficulty, mud_risk,
+    max_length_km, ...). If they eliminate every trail, they are dropped
+    and only the city filter is kept, so the LLM still gets candidates.
+
+    :param trails: Full catalog.
+    :param city: City to keep, or None for all cities.
+    :param constraints: Optional extra filters extracted from the question.
+    :param version: Catalog version, so the index is rebuilt only on change.
+    :return: Candidate trails in catalog order.
+    """
+    if not city and not constraints:
         return trails
-    city_key = "location" if "location" in (trails[0] if trails else {}) else "Location"
-    return [t for t in trails if (t.get(city_key) == city)]
+    index = get_trail_index(trails, version)
+    if constraints:
+        found = index.query(city=city, **constraints)
+        if found:
+            return found
+        print(f"[TRAILS] No trail matches {constraints}; relaxing to city only")
+    return index.query(city=city)
 
 def pick_best_city_and_weather(city_weather: Dict[str, Dict]) -> Tuple[Optional[str], Dict]:
     """Choose the best city based on weather snapshot.
@@ -0,0 +1,142 @@
+"""Inverted index over the trail catalog for fast prefiltering.
+
+- Categorical postings (city, difficulty, terrain, shade, mud risk): value -> trail ids.
+  Compound sheet values ("Paved / Gravel", "Easy–Moderate") are indexed whole
+  and per part, so "gravel" or "easy" match them too.
+- Sorted (value, id) arrays for length and elevation range queries via bisect.
+Queries intersect the smallest candidate sets first and never scan the catalog.
+"""
+
+import re
+import threading
+from bisect import bisect_left, bisect_right
+from typing import Dict, FrozenSet, Iterable, List, Optional, Set, Tuple, Union
+
+from ..models.domain import Trail
+
+# Query keyword -> Trail field
+CATEGORICAL_FIELDS = {
+    "city": "location",
+    "difficulty": "difficulty",
+    "terrain": "terrain_type",
+    "shade": "shade_coverage",
+    "mud_risk": "mud_rain_risk",
+}
+
+_PART_SPLIT = re.compile(r"\s*(?:/|,|;|–|—|\s-\s|\band\b)\s*")
+
+Wanted = Union[str, Iterable[str], None]
+
+
+def _norm(value: str) -> str:
+    return " ".join(value.lower().split())
+
+
+def _terms(value: Optional[str]) -> Set[str]:
+    if not value:
+        return set()
+    whole = _norm(value)
+    parts = {_norm(p) for p in _PART_SPLIT.split(value) if p.strip()}
+    return {whole} | parts
+
+
+class TrailIndex:
+    """Read-only index over one catalog version."""
+
+    def __init__(self, trails: List[Trail]):
+        """Build postings and sorted range arrays (O(n log n) once per catalog)."""
+        self.trails = list(trails)
+        self._postings: Dict[str, Dict[str, FrozenSet[int]]] = {}
+        for key, field in CATEGORICAL_FIELDS.items():
+            buckets: Dict[str, Set[int]] = {}
+            for i, t in enumerate(self.trails):
+                for term in _terms(getattr(t, field)):
+                    buckets.setdefault(term, set()).add(i)
+            self._postings[key] = {term: frozenset(ids) for term, ids in buckets.items()}
+        self._ranges: Dict[str, Tuple[List[float], List[int]]] = {
+            "length": self._sorted_by("length_km"),
+            "elevation": self._sorted_by("elevation_gain_m"),
+        }
+
+    def _sorted_by(self, field: str) -> Tuple[List[float], List[int]]:
+        pairs = sorted(
+            (getattr(t, field), i) for i, t in enumerate(self.trails) if getattr(t, field) is not None
+        )
+        return [v for v, _ in pairs], [i for _, i in pairs]
+
+    def _match(self, key: str, wanted: Wanted) -> FrozenSet[int]:
+        values = [wanted] if isinstance(wanted, str) else list(wanted)
+        postings = self._postings[key]
+        out: Set[int] = set()
+        for v in values:
+            out |= postings.get(_norm(v), frozenset())
+        return frozenset(out)
+
+    def _range(self, key: str, lo: Optional[float], hi: Optional[float]) -> FrozenSet[int]:
+        values, ids = self._ranges[key]
+        start = 0 if lo is None else bisect_left(values, lo)
+        end = len(values) if hi is None else bisect_right(values, hi)
+        return frozenset(ids[start:end])
+
+    def query(
+        self,
+        *,
+        city: Wanted = None,
+        difficulty: Wanted = None,
+        terrain: Wanted = None,
+        shade: Wanted = None,
+        mud_risk: Wanted = None,
+        min_length_km: Optional[float] = None,
+        max_length_km: Optional[float] = None,
+        min_elevation_m: Optional[float] = None,
+        max_elevation_m: Optional[float] = None,
+    ) -> List[Trail]:
+        """Trails matching every given constraint (any-of within one attribute).
+
+        Range filters drop trails whose value is unknown. With no
+        constraints the whole catalog is returned.
+
+        :return: Matching trails in catalog order.
+        """
+        wanted = {"city": city, "difficulty": difficulty, "terrain": terrain,
+                  "shade": shade, "mud_risk": mud_risk}
+        sets = [self._match(k, v) for k, v in wanted.items() if v]
+        if min_length_km is not None or max_length_km is not None:
+            sets.append(self._range("length", min_length_km, max_length_km))
+        if min_elevation_m is not None or max_elevation_m is not None:
+            sets.append(self._range("elevation", min_elevation_m, max_elevation_m))
+        if not sets:
+            return list(self.trails)
+
+        sets.sort(key=len)
+        ids = set(sets[0])
+        for s in sets[1:]:
+            if not ids:
+                break
+            ids &= s
+        return [self.trails[i] for i in sorted(ids)]
+
+
+_lock = threading.Lock()
+# (version, trails list the index was built from, index)
+_cached: Optional[Tuple[Optional[str], List[Trail], TrailIndex]] = None
+
+
+def get_trail_index(trails: List[Trail], version: Optional[str] = None) -> TrailIndex:
+    """Return the index for this catalog, building it only when the catalog changes.
+
+    The cached index is reused only for the very list it was built from
+    (and the same version), so a refreshed snapshot or another list of the
+    same length always gets its own index.
+
+    :param trails: Current catalog.
+    :param version: Catalog version (e.g. `trail_catalog.catalog_version()`).
+    """
+    global _cached
+    with _lock:
+        if _cached is not None and _cached[1] is trails and _cached[0] == version:
+            return _cached[2]
+    index = TrailIndex(trails)
+    with _lock:
+        _cached = (version, trails, index)
+    return index
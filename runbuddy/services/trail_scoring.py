@@ -0,0 +1,353 @@
+"""Deterministic trail scoring against a weather snapshot (numpy-vectorized).
+
+Each trail's sheet fields are turned into numeric features once per
+catalog version (mud/rain risk, shade, weather sensitivity, paved surface,
+wet/cold/wind hazard flags); a question's candidates are scored on rows
+sliced out of those cached columns. Scoring a snapshot is then a handful
+of array operations:
+
+- wet:  precipitation × (mud risk, sensitivity, wet hazards), paved bonus
+- heat: temperature above HEAT_C × shade (bonus) / exposure (penalty)
+- cold: temperature below COLD_C × (sensitivity, icy hazards)
+- wind: wind speed above WIND_KMH × (exposure, wind hazards)
+
+Higher is better. The recommender sends only the top RECOMMENDER_TOP_K to
+the LLM (always including the best trail of each candidate city, so a tie
+in mild weather cannot drop a whole city), and `rule_based_recommendation` turns the best trail and its
+factors into an answer when the LLM misses its deadline; offline use:
+
+    python -m runbuddy.services.trail_scoring --temp 28 --precip 0 --wind 10 [--city Markham] [--top 5]
+"""
+
+import argparse
+import json
+import re
+import threading
+from dataclasses import dataclass
+from typing import Any, Dict, List, Optional, Tuple
+
+import numpy as np
+
+from ..config import RECOMMENDER_TOP_K
+from ..models.domain import Trail
+
+# Weather thresholds and scale (°C, mm/h, km/h)
+HEAT_C, HEAT_SPAN_C = 22.0, 10.0
+COLD_C, COLD_SPAN_C = 5.0, 10.0
+WET_MM = 2.0
+WIND_KMH, WIND_SPAN_KMH = 20.0, 30.0
+
+WEIGHTS = {
+    "wet_mud": 3.0,
+    "wet_sensitivity": 1.0,
+    "wet_hazard": 1.5,
+    "wet_paved": 0.5,
+    "heat_shade": 1.5,
+    "heat_exposure": 1.0,
+    "cold_sensitivity": 1.0,
+    "cold_hazard": 1.5,
+    "wind_exposure": 0.5,
+    "wind_hazard": 1.0,
+}
+
+_LEVELS = {"none": 0.0, "minimal": 0.0, "low": 0.0, "mixed": 0.5, "medium": 0.5,
+           "moderate": 0.5, "mid": 0.5, "partial": 0.5, "high": 1.0, "full": 1.0}
+_LEVEL_RE = re.compile(r"\b(" + "|".join(_LEVELS) + r")\b")
+_WET_HAZARD_RE = re.compile(r"flood|mud|slipper|creek|crossing|erosion|puddl|wet")
+_COLD_HAZARD_RE = re.compile(r"\bic[ey]|\bice\b|snow|frost")
+_WIND_HAZARD_RE = re.compile(r"wind|expos|shoreline|lakefront|waterfront")
+_PAVED_RE = re.compile(r"paved|asphalt|boardwalk")
+_UNPAVED_RE = re.compile(r"natural|forest|dirt|ravine")
+
+
+def _total(components: Dict[str, np.ndarray]) -> np.ndarray:
+    return np.sum(np.vstack(list(components.values())), axis=0)
+
+
+def _level(value: Optional[str], default: float = 0.5) -> float:
+    """Map Low/Medium/High-style cells to 0 / 0.5 / 1 (mean of the levels named)."""
+    found = _LEVEL_RE.findall((value or "").lower())
+    return sum(_LEVELS[f] for f in found) / len(found) if found else default
+
+
+def _paved(terrain: Optional[str]) -> float:
+    t = (terrain or "").lower()
+    if not _PAVED_RE.search(t):
+        return 0.0
+    return 0.5 if _UNPAVED_RE.search(t) or "gravel" in t else 1.0
+
+
+class TrailFeatures:
+    """Numeric feature columns for one catalog (row i = trails[i])."""
+
+    _COLUMNS = ("mud", "shade", "sensitivity", "paved", "wet_hazard", "cold_hazard", "wind_hazard")
+
+    def __init__(self, trails: List[Trail]):
+        self.trails = list(trails)
+        hazards = [(t.hazards or "").lower() for t in self.trails]
+        self.locations = [(t.location or "") for t in self.trails]
+        self.mud = np.array([_level(t.mud_rain_risk) for t in self.trails], dtype=float)
+        self.shade = np.array([_level(t.shade_coverage) for t in self.trails], dtype=float)
+        self.sensitivity = np.array([_level(t.weather_sensitivity) for t in self.trails], dtype=float)
+        self.paved = np.array([_paved(t.terrain_type) for t in self.trails], dtype=float)
+        self.wet_hazard = np.array([bool(_WET_HAZARD_RE.search(h)) for h in hazards], dtype=float)
+        self.cold_hazard = np.array([bool(_COLD_HAZARD_RE.search(h)) for h in hazards], dtype=float)
+        self.wind_hazard = np.array([bool(_WIND_HAZARD_RE.search(h)) for h in hazards], dtype=float)
+        self._rows = {id(t): i for i, t in enumerate(self.trails)}
+
+    def select(self, trails: List[Trail]) -> Optional["TrailFeatures"]:
+        """Features for a subset of this catalog's Trail objects (None if one is not in it)."""
+        rows = [self._rows.get(id(t)) for t in trails]
+        if any(r is None or self.trails[r] is not t for r, t in zip(rows, trails)):
+            return None
+        sub = TrailFeatures.__new__(TrailFeatures)
+        sub.trails = list(trails)
+        sub.locations = [self.locations[r] for r in rows]
+        idx = np.array(rows, dtype=int)
+        for col in self._COLUMNS:
+            setattr(sub, col, getattr(self, col)[idx])
+        sub._rows = {id(t): i for i, t in enumerate(sub.trails)}
+        return sub
+
+    def weather_columns(self, weather: Dict[str, Any],
+                        city_weather: Optional[Dict[str, Dict[str, Any]]] = None) -> Tuple[np.ndarray, ...]:
+        """Per-trail (temperature, precipitation, windspeed); a trail's own city snapshot wins."""
+        n = len(self.trails)
+        temp = np.full(n, float(weather.get("temperature") or 0.0))
+        precip = np.full(n, float(weather.get("precipitation") or 0.0))
+        wind = np.full(n, float(weather.get("windspeed") or 0.0))
+        if city_weather:
+            by_city = {c.lower(): w for c, w in city_weather.items() if w}
+            for i, loc in enumerate(self.locations):
+                w = by_city.get(loc.lower())
+                if w:
+                    temp[i] = float(w.get("temperature") or 0.0)
+                    precip[i] = float(w.get("precipitation") or 0.0)
+                    wind[i] = float(w.get("windspeed") or 0.0)
+        return temp, precip, wind
+
+    def components(self, weather: Dict[str, Any],
+                   city_weather: Optional[Dict[str, Dict[str, Any]]] = None) -> Dict[str, np.ndarray]:
+        """Signed weighted contribution of every factor, one array per factor."""
+        temp, precip, wind = self.weather_columns(weather, city_weather)
+        wet = np.clip(precip / WET_MM, 0.0, 1.0)
+        heat = np.clip((temp - HEAT_C) / HEAT_SPAN_C, 0.0, 1.0)
+        cold = np.clip((COLD_C - temp) / COLD_SPAN_C, 0.0, 1.0)
+        windy = np.clip((wind - WIND_KMH) / WIND_SPAN_KMH, 0.0, 1.0)
+        exposure = 1.0 - self.shade
+        w = WEIGHTS
+        return {
+            "wet_mud": -w["wet_mud"] * wet * self.mud,
+            "wet_sensitivity": -w["wet_sensitivity"] * wet * self.sensitivity,
+            "wet_hazard": -w["wet_hazard"] * wet * self.wet_hazard,
+            "wet_paved": w["wet_paved"] * wet * self.paved,
+            "heat_shade": w["heat_shade"] * heat * self.shade,
+            "heat_exposure": -w["heat_exposure"] * heat * exposure,
+            "cold_sensitivity": -w["cold_sensitivity"] * cold * self.sensitivity,
+            "cold_hazard": -w["cold_hazard"] * cold * self.cold_hazard,
+            "wind_exposure": -w["wind_exposure"] * windy * exposure,
+            "wind_hazard": -w["wind_hazard"] * windy * self.wind_hazard,
+        }
+
+    def score(self, weather: Dict[str, Any],
+              city_weather: Optional[Dict[str, Dict[str, Any]]] = None) -> np.ndarray:
+        """Total score per trail (0 = neutral, higher is better)."""
+        return _total(self.components(weather, city_weather))
+
+
+@dataclass(frozen=True)
+class ScoredTrail:
+    trail: Trail
+    score: float
+    factors: Dict[str, float]  # non-zero contributions, most influential first
+
+
+_lock = threading.Lock()
+# (version, catalog list the features were built from, features)
+_cached: Optional[Tuple[Optional[str], List[Trail], TrailFeatures]] = None
+
+
+def get_trail_features(trails: List[Trail], version: Optional[str] = None) -> TrailFeatures:
+    """Feature matrix for this catalog, rebuilt only when the catalog changes.
+
+    Reused only for the very list it was built from and the same version.
+
+    :param version: Catalog version (e.g. `trail_catalog.catalog_version()`).
+    """
+    global _cached
+    with _lock:
+        if _cached is not None and _cached[1] is trails and _cached[0] == version:
+            return _cached[2]
+    features = TrailFeatures(trails)
+    with _lock:
+        _cached = (version, trails, features)
+    return features
+
+
+def _features_for(trails: List[Trail], catalog: Optional[List[Trail]], version: Optional[str]) -> TrailFeatures:
+    if catalog is not None:
+        features = get_trail_features(catalog, version)
+        if catalog is trails:
+            return features
+        sub = features.select(trails)
+        if sub is not None:
+            return sub
+    return TrailFeatures(trails)
+
+
+def rank_trails(
+    trails: List[Trail],
+    weather: Dict[str, Any],
+    top_k: Optional[int] = None,
+    *,
+    city_weather: Optional[Dict[str, Dict[str, Any]]] = None,
+    catalog: Optional[List[Trail]] = None,
+    version: Optional[str] = None,
+) -> List[ScoredTrail]:
+    """Trails ordered best-first for this weather (ties keep catalog order).
+
+    :param trails: Candidate trails.
+    :param weather: Snapshot {"temperature", "precipitation", "windspeed"}.
+    :param top_k: Keep only the best K (None/0 = all).
+    :param city_weather: Optional per-city snapshots, used for trails in those cities.
+    :param catalog: Full catalog `trails` were taken from; its features are cached per
+        `version` and the candidates' rows are sliced out instead of re-parsed.
+    :param version: Catalog version for that cache.
+    :return: ScoredTrail list.
+    """
+    if not trails:
+        return []
+    features = _features_for(trails, catalog, version)
+    comps = features.components(weather, city_weather)
+    scores = _total(comps)
+    order = np.lexsort((np.arange(len(trails)), -np.round(scores, 9)))
+    if top_k:
+        order = order[:top_k]
+    out = []
+    for i in order:
+        factors = {k: round(float(v[i]), 3) for k, v in comps.items() if abs(v[i]) > 1e-9}
+        factors = dict(sorted(factors.items(), key=lambda kv: -abs(kv[1])))
+        out.append(ScoredTrail(features.trails[i], round(float(scores[i]), 3), factors))
+    return out
+
+
+def shortlist_trails(
+    trails: List[Trail],
+    weather: Dict[str, Any],
+    top_k: int = RECOMMENDER_TOP_K,
+    *,
+    city_weather: Optional[Dict[str, Dict[str, Any]]] = None,
+    catalog: Optional[List[Trail]] = None,
+    version: Optional[str] = None,
+) -> List[Trail]:
+    """The `top_k` best trails for the LLM prompt (all of them when top_k <= 0 or already few).
+
+    The best trail of every candidate city is kept first (best cities first
+    when there are more cities than slots), then the remaining slots go by
+    score. In mild weather, when all scores tie, the shortlist therefore
+    still spans every city instead of the first K rows of the catalog.
+    """
+    if top_k <= 0 or len(trails) <= top_k:
+        return list(trails)
+    ranked = rank_trails(trails, weather, city_weather=city_weather, catalog=catalog, version=version)
+    picked: List[int] = []
+    seen_cities = set()
+    for i, s in enumerate(ranked):
+        city = (s.trail.location or "").lower()
+        if city not in seen_cities:
+            seen_cities.add(city)
+            picked.append(i)
+    picked = picked[:top_k]
+    chosen = set(picked)
+    picked += [i for i in range(len(ranked)) if i not in chosen][:top_k - len(picked)]
+    return [ranked[i].trail for i in sorted(picked)]
+
+
+# How each factor reads in a rule-based answer (positive -> reason, negative -> caution)
+FACTOR_PHRASES = {
+    "wet_mud": "mud risk in the rain",
+    "wet_sensitivity": "trail conditions suffer in wet weather",
+    "wet_hazard": "wet-weather hazards",
+    "wet_paved": "paved surface holds up in the rain",
+    "heat_shade": "shade helps in the heat",
+    "heat_exposure": "little shade in the heat",
+    "cold_sensitivity": "conditions suffer in the cold",
+    "cold_hazard": "possible ice or snow",
+    "wind_exposure": "exposed to the wind",
+    "wind_hazard": "wind-exposed sections",
+}
+
+
+def _weather_summary(weather: Dict[str, Any]) -> str:
+    parts = []
+    if weather.get("temperature") is not None:
+        parts.append(f"{float(weather['temperature']):g}°C")
+    if weather.get("precipitation"):
+        parts.append(f"{float(weather['precipitation']):g} mm/h precipitation")
+    if weather.get("windspeed") is not None:
+        parts.append(f"wind {float(weather['windspeed']):g} km/h")
+    return ", ".join(parts)
+
+
+def rule_based_recommendation(
+    trails: List[Trail],
+    weather: Dict[str, Any],
+    *,
+    city_weather: Optional[Dict[str, Dict[str, Any]]] = None,
+) -> Dict[str, Any]:
+    """Best-scoring trail as a recommender answer {trail_name, location, reason, cautions}.
+
+    :param trails: Candidate trails.
+    :param weather: Snapshot {"temperature", "precipitation", "windspeed"}.
+    :param city_weather: Optional per-city snapshots, used for trails in those cities.
+    :return: Answer dict; trail_name/location are None when there are no candidates.
+    """
+    ranked = rank_trails(trails, weather, 1, city_weather=city_weather)
+    if not ranked:
+        return {"trail_name": None, "location": None,
+                "reason": "No candidate trails matched the request.", "cautions": None}
+    best = ranked[0]
+    pros = [FACTOR_PHRASES[k] for k, v in best.factors.items() if v > 0]
+    cons = [FACTOR_PHRASES[k] for k, v in best.factors.items() if v < 0]
+    summary = _weather_summary(weather)
+    reason = "Best weather score among the candidates"
+    if summary:
+        reason += f" for {summary}"
+    if pros:
+        reason += ": " + "; ".join(pros)
+    cautions = "; ".join(cons + ([best.trail.hazards] if best.trail.hazards else []))
+    return {
+        "trail_name": best.trail.name,
+        "location": best.trail.location,
+        "reason": reason + ".",
+        "cautions": cautions or None,
+    }
+
+
+def main(argv: Optional[list] = None) -> None:
+    ap = argparse.ArgumentParser(description="Rank RunBuddy trails for a weather snapshot")
+    ap.add_argument("--temp", type=float, required=True, help="Temperature (°C)")
+    ap.add_argument("--precip", type=float, default=0.0, help="Precipitation (mm/h)")
+    ap.add_argument("--wind", type=float, default=0.0, help="Wind speed (km/h)")
+    ap.add_argument("--city", help="Only rank trails in this city")
+    ap.add_argument("--top", type=int, default=RECOMMENDER_TOP_K, help="How many to show (0 = all)")
+    ap.add_argument("--trails", help="JSON file with trail rows (default: the trail catalog)")
+    args = ap.parse_args(argv)
+
+    if args.trails:
+        with open(args.trails, "r", encoding="utf-8") as f:
+            trails = [Trail.from_row(r) for r in json.load(f)]
+    else:
+        from ..integrations.trail_catalog import load_trail_catalog
+        trails = load_trail_catalog()
+    if args.city:
+        trails = [t for t in trails if (t.location or "").lower() == args.city.lower()]
+
+    weather = {"temperature": args.temp, "precipitation": args.precip, "windspeed": args.wind}
+    for rank, s in enumerate(rank_trails(trails, weather, args.top), 1):
+        why = ", ".join(f"{k} {v:+.2f}" for k, v in list(s.factors.items())[:3]) or "neutral"
+        print(f"{rank:>2}. {s.score:+.2f}  {s.trail.name} ({s.trail.location})  [{why}]")
+
+
+if __name__ == "__main__":
+    main()
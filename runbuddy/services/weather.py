@@ -1,5 +1,103 @@
-import requests
+"""Open-Meteo weather client: hourly snapshots for one or many locations."""
+
+import time
 from datetime import datetime
+from typing import Any, Dict, List, Optional, Tuple
+
+from ..cache import SQLiteStore, TTLCache
+from ..integrations import http_transport
+from ..config import (
+    WEATHER_BATCH_SIZE,
+    FORECAST_GRID_DECIMALS,
+    FORECAST_MODEL_REFRESH_S,
+    FORECAST_PUBLISH_LAG_S,
+    FORECAST_CACHE_MAX_ENTRIES,
+    FORECAST_CACHE_MAX_ROWS,
+    FORECAST_CACHE_PATH,
+)
+
+OPEN_METEO_URL = "https://api.open-meteo.com/v1/forecast"
+HOURLY_VARS = "temperature_2m,precipitation,windspeed_10m"
+_HOURLY_KEYS = ("time",) + tuple(HOURLY_VARS.split(","))
+
+
+def _open_forecast_cache() -> TTLCache:
+    # The SQLite file is only opened on first lookup/write (nothing is created at import).
+    disk = None
+    if FORECAST_CACHE_PATH:
+        disk = SQLiteStore(FORECAST_CACHE_PATH, "hourly_forecasts", max_rows=FORECAST_CACHE_MAX_ROWS)
+    return TTLCache(max_entries=FORECAST_CACHE_MAX_ENTRIES, disk=disk)
+
+
+# Whole hourly series per (grid cell, day); any hour of a cached day is served locally.
+FORECAST_CACHE = _open_forecast_cache()
+
+
+def _cell_key(lat: float, lon: float, date_str: str) -> str:
+    """Cache key: lat/lon rounded to the forecast grid, plus the day."""
+    return f"{lat:.{FORECAST_GRID_DECIMALS}f},{lon:.{FORECAST_GRID_DECIMALS}f},{date_str}"
+
+
+def _next_model_refresh(now: Optional[float] = None) -> float:
+    """Epoch time at which a newer model run should be available.
+
+    Runs start every FORECAST_MODEL_REFRESH_S seconds and are published
+    FORECAST_PUBLISH_LAG_S later, so data fetched now stays current until
+    the next publish boundary.
+    """
+    now = time.time() if now is None else now
+    cadence = max(1, FORECAST_MODEL_REFRESH_S)
+    return ((now - FORECAST_PUBLISH_LAG_S) // cadence + 1) * cadence + FORECAST_PUBLISH_LAG_S
+
+
+def forecast_cache_stats() -> Dict[str, Any]:
+    """Hit/miss counters of the hourly forecast cache."""
+    return FORECAST_CACHE.stats()
+
+
+def _fetch_hourly(coords: List[Tuple[float, float]], date_str: str) -> List[Dict[str, Any]]:
+    """Fetch one day of hourly data for one or more locations in a single call.
+
+    Open-Meteo accepts comma-separated latitude/longitude lists and answers
+    with a JSON list (one payload per location, in request order). A single
+    location comes back as a bare object, so it is wrapped for uniformity.
+
+    :param coords: List of (lat, lon) tuples.
+    :param date_str: Day to fetch as YYYY-MM-DD.
+    :return: List of per-location payloads, aligned with `coords`.
+    """
+    params = {
+        "latitude": ",".join(str(lat) for lat, _ in coords),
+        "longitude": ",".join(str(lon) for _, lon in coords),
+        "hourly": HOURLY_VARS,
+        "start_date": date_str,
+        "end_date": date_str,
+        "timezone": "America/Toronto",
+    }
+    response = http_transport.get(OPEN_METEO_URL, params=params, timeout=5)
+    response.raise_for_status()
+    data = response.json()
+    return data if isinstance(data, list) else [data]
+
+
+def _snapshot_at(hourly: Dict[str, List[Any]], datetime_obj: datetime) -> dict | None:
+    """Pick the requested hour out of an Open-Meteo `hourly` block.
+
+    :param hourly: The `hourly` object of an Open-Meteo payload.
+    :param datetime_obj: Target datetime (timezone-aware).
+    :return: Dict with keys {"temperature", "precipitation", "windspeed"} or None if not found.
+    """
+    try:
+        # Match requested hour exactly in the API's hourly list
+        idx = hourly["time"].index(datetime_obj.strftime("%Y-%m-%dT%H:00"))
+    except (KeyError, ValueError):
+        return None
+
+    return {
+        "temperature": hourly["temperature_2m"][idx],
+        "precipitation": hourly["precipitation"][idx],
+        "windspeed": hourly["windspeed_10m"][idx],
+    }
 
 
 def get_weather_forecast(lat: float, lon: float, datetime_obj: datetime) -> dict | None:
@@ -7,6 +105,7 @@ def get_weather_forecast(lat: float, lon: float, datetime_obj: datetime) -> dict
 
     Uses the Open-Meteo API to pull hourly data and returns the weather
     snapshot (temperature, precipitation, windspeed) at the requested time.
+    The full day is cached, so later hours of the same day are served locally.
 
     :param lat: Latitude of the location.
     :param lon: Longitude of the location.
@@ -14,30 +113,65 @@ def get_weather_forecast(lat: float, lon: float, datetime_obj: datetime) -> dict
     :return: Dict with keys {"temperature", "precipitation", "windspeed"} or None if not found.
     """
     date_str = datetime_obj.strftime("%Y-%m-%d")
+    key = _cell_key(lat, lon, date_str)
+    hourly = FORECAST_CACHE.get(key)
+    if hourly is None:
+        payload = _fetch_hourly([(lat, lon)], date_str)[0]
+        hourly = _store_hourly(key, payload)
+    return _snapshot_at(hourly, datetime_obj)
 
-    url = (
-        f"https://api.open-meteo.com/v1/forecast?"
-        f"latitude={lat}&longitude={lon}&hourly=temperature_2m,precipitation,windspeed_10m"
-        f"&start_date={date_str}&end_date={date_str}"
-        f"&timezone=America/Toronto"
-    )
 
-    response = requests.get(url, timeout=5)
-    data = response.json()
+def _store_hourly(key: str, payload: Dict[str, Any]) -> Dict[str, List[Any]]:
+    """Keep only the hourly arrays we use and cache them until the next model run."""
+    raw = payload.get("hourly") or {}
+    hourly = {k: raw[k] for k in _HOURLY_KEYS if k in raw}
+    if len(hourly) == len(_HOURLY_KEYS):
+        FORECAST_CACHE.set(key, hourly, expires_at=_next_model_refresh())
+    return hourly
 
-    times = data["hourly"]["time"]
-    temps = data["hourly"]["temperature_2m"]
-    rain = data["hourly"]["precipitation"]
-    wind = data["hourly"]["windspeed_10m"]
 
-    try:
-        # Match requested hour exactly in the API's hourly list
-        idx = times.index(datetime_obj.strftime("%Y-%m-%dT%H:00"))
-    except ValueError:
-        return None
+def get_weather_forecasts(
+    coords: Dict[str, Tuple[float, float]],
+    datetime_obj: datetime,
+    *,
+    batch_size: int = WEATHER_BATCH_SIZE,
+) -> Dict[str, dict]:
+    """Fetch weather snapshots for many named locations with batched requests.
 
-    return {
-        "temperature": temps[idx],
-        "precipitation": rain[idx],
-        "windspeed": wind[idx],
-    }
+    All locations go into one Open-Meteo call; lists longer than `batch_size`
+    are split into chunks so the query string stays bounded. A failed chunk
+    is logged and skipped, the other chunks still contribute. Cells whose day
+    is already cached are answered without a request.
+
+    :param coords: Dict mapping name -> (lat, lon).
+    :param datetime_obj: Target datetime (timezone-aware).
+    :param batch_size: Maximum number of locations per request.
+    :return: Dict mapping name -> snapshot, only for locations with data at that hour.
+    """
+    date_str = datetime_obj.strftime("%Y-%m-%d")
+    hourly_by_name: Dict[str, Dict[str, List[Any]]] = {}
+    missing: List[str] = []
+    for name, (lat, lon) in coords.items():
+        hourly = FORECAST_CACHE.get(_cell_key(lat, lon, date_str))
+        if hourly is None:
+            missing.append(name)
+        else:
+            hourly_by_name[name] = hourly
+
+    for start in range(0, len(missing), max(1, batch_size)):
+        chunk = missing[start:start + max(1, batch_size)]
+        try:
+            payloads = _fetch_hourly([coords[n] for n in chunk], date_str)
+        except Exception as e:
+            print(f"[WX] batch fetch failed for {', '.join(chunk)}: {e}")
+            continue
+        for name, payload in zip(chunk, payloads):
+            lat, lon = coords[name]
+            hourly_by_name[name] = _store_hourly(_cell_key(lat, lon, date_str), payload)
+
+    out: Dict[str, dict] = {}
+    for name in coords:
+        snap = _snapshot_at(hourly_by_name.get(name) or {}, datetime_obj)
+        if snap:
+            out[name] = snap
+    return out
@@ -0,0 +1,64 @@
+"""Deterministic corpus of realistic RunBuddy questions for the parser benchmarks.
+
+Queries combine an opener, a place (city, alias, neighbourhood, unknown
+place or none), a time phrase (relative days, weekdays, parts of day,
+clock times, calendar dates, offsets) and optional trail constraints.
+The same seed always yields the same corpus.
+"""
+
+import random
+from typing import List
+
+PLACES = [
+    "Scarborough", "Markham", "Pickering", "scarboro", "STC", "Rouge Park", "Unionville",
+    "Bay Ridges", "Agincourt", "Cornell", "Frenchman's Bay", "Toronto", "Ajax", "Whitby", "",
+]
+
+TIMES = [
+    # fast-path phrases
+    "today", "tonight", "tomorrow", "tomorrow morning", "tomorrow evening", "this evening",
+    "saturday", "this saturday morning", "next sunday afternoon", "this weekend", "friday at 6pm",
+    "at 7am", "at 6:30 pm", "around 18:00", "in 2 hours", "in 45 minutes", "right now",
+    # calendar dates / phrases left to the full engines
+    "on october 25", "on oct 3 at 7am", "on the 14th", "on 11/02", "on 2026-11-15 morning",
+    "in 3 days", "in two weeks", "next week", "on december 1st evening", "on may 9 at noon",
+    "the day after tomorrow at 8", "",
+]
+
+OPENERS = [
+    "where should i run {time} {place}",
+    "where do i run {time} {place}",
+    "what running location do i go to {time} {place}",
+    "which location should i go {time} {place}",
+    "recommend a run {time} {place}",
+    "i am going to {place} {time} where should i run",
+    "i will be in {place} {time}, where to run?",
+    "any good trail {place} {time}",
+    "need a running spot {time} near {place}",
+    "what trail should i pick {time} {place}",
+    "hello",
+]
+
+CONSTRAINTS = [
+    "", "", "", "under 8 km", "at least 10k", "with low mud risk", "somewhere shaded",
+    "paved please", "easy gravel trail", "no mud", "something challenging", "flat and shady",
+]
+
+
+def build_corpus(n: int = 3000, seed: int = 7) -> List[str]:
+    """`n` pseudo-random queries, identical for a given seed."""
+    rng = random.Random(seed)
+    out: List[str] = []
+    for _ in range(n):
+        place = rng.choice(PLACES)
+        opener = rng.choice(OPENERS)
+        if "going to" in opener or "be in" in opener or "near" in opener:
+            place_text = place or "the city"
+        else:
+            place_text = f"in {place}" if place else ""
+        q = opener.format(time=rng.choice(TIMES), place=place_text)
+        extra = rng.choice(CONSTRAINTS)
+        if extra:
+            q = f"{q} {extra}"
+        out.append(" ".join(q.split()))
+    return out
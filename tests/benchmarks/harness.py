@@ -0,0 +1,205 @@
+"""Parser latency benchmarks: per-function p50/p95/p99 and throughput.
+
+Duckling is stubbed out (reported unavailable), so the numbers cover the
+local engines only: fast path, dateparser, spaCy NER and the intent model.
+
+    python -m tests.benchmarks.harness [--n 3000] [--update-baseline]
+    RUNBUDDY_BENCH=1 python -m pytest tests/benchmarks
+
+Absolute milliseconds depend on the machine, so every run also times a
+fixed pure-Python reference workload (`reference_call`) over the same
+corpus. Baselines live in baseline.json as multiples of the reference mean,
+{function: {"p50_ratio", "p95_ratio", "p99_ratio"}}, and are kept
+deliberately generous; a run fails when a measured ratio exceeds its
+baseline times BENCH_TOLERANCE.
+
+`extract_city` and `parse_user_query` only do real work when the spaCy
+model is installed; without it NER is a no-op and their timings mean
+nothing. The harness therefore refuses to run or record without NER, and
+the baseline carries an "ner_available" flag so a baseline recorded
+without the model is rejected rather than trusted.
+"""
+
+import argparse
+import contextlib
+import json
+import os
+import re
+import time
+from datetime import datetime
+from pathlib import Path
+from typing import Any, Callable, Dict, Iterator, List, Optional
+from unittest import mock
+
+from runbuddy.config import ALLOWED_CITIES
+from runbuddy.nlp import parser
+
+from .corpus import build_corpus
+
+BASELINE_PATH = Path(__file__).with_name("baseline.json")
+BENCH_QUERIES = int(os.getenv("BENCH_QUERIES", "3000"))
+BENCH_TOLERANCE = float(os.getenv("BENCH_TOLERANCE", "1.0"))
+PERCENTILES = (50, 95, 99)
+
+# Fixed reference time so date resolution is reproducible (a Wednesday morning)
+NOW = datetime(2026, 10, 14, 9, 0, tzinfo=parser.LOCAL_TZ)
+
+
+@contextlib.contextmanager
+def duckling_stubbed() -> Iterator[None]:
+    """Report Duckling as down so no HTTP call is ever attempted."""
+    def _no_duckling(*args: Any, **kwargs: Any) -> None:
+        raise AssertionError("Duckling must not be called during benchmarks")
+
+    with mock.patch.object(parser, "duckling_available", lambda: False), \
+            mock.patch.object(parser, "duckling_time", _no_duckling):
+        yield
+
+
+def percentile(sorted_values: List[float], pct: float) -> float:
+    """Nearest-rank percentile of an ascending list."""
+    if not sorted_values:
+        return 0.0
+    rank = max(1, int(round(pct / 100.0 * len(sorted_values) + 0.5)))
+    return sorted_values[min(rank, len(sorted_values)) - 1]
+
+
+def time_calls(fn: Callable[[str], Any], queries: List[str]) -> Dict[str, float]:
+    """Time `fn` once per query; latency percentiles in ms plus throughput."""
+    samples: List[float] = []
+    start = time.perf_counter()
+    for q in queries:
+        t0 = time.perf_counter()
+        fn(q)
+        samples.append((time.perf_counter() - t0) * 1000.0)
+    total = time.perf_counter() - start
+    samples.sort()
+    out = {f"p{p}_ms": round(percentile(samples, p), 3) for p in PERCENTILES}
+    out["mean_ms"] = round(sum(samples) / len(samples), 3) if samples else 0.0
+    out["qps"] = round(len(samples) / total, 1) if total > 0 else 0.0
+    out["n"] = len(samples)
+    return out
+
+
+REFERENCE = "reference"
+NER_FLAG = "ner_available"
+_REF_PATTERNS = [re.compile(p) for p in (r"\b\d{1,2}(?::\d{2})?\s*(?:am|pm)\b", r"\b(?:in|near|at)\s+(\w+)",
+                                         r"\b(?:today|tomorrow|tonight|weekend)\b", r"[aeiou]{2,}")]
+
+
+def reference_call(q: str) -> int:
+    """Machine-speed yardstick: regex scans, tokenizing and JSON round-trips of the query."""
+    n = 0
+    for _ in range(10):
+        low = q.lower()
+        for pat in _REF_PATTERNS:
+            n += len(pat.findall(low))
+        counts: Dict[str, int] = {}
+        for tok in low.split():
+            counts[tok] = counts.get(tok, 0) + 1
+        n += len(json.loads(json.dumps({"q": q, "counts": counts, "sorted": sorted(counts)}))["sorted"])
+    return n
+
+
+def ratios(report: Dict[str, Dict[str, float]]) -> Dict[str, Dict[str, float]]:
+    """Percentiles of every target as multiples of the reference mean latency."""
+    ref = report[REFERENCE]["mean_ms"] or 1e-9
+    return {name: {f"p{p}_ratio": round(r[f"p{p}_ms"] / ref, 2) for p in PERCENTILES}
+            for name, r in report.items() if name != REFERENCE}
+
+
+def ner_available() -> bool:
+    """Whether spaCy NER is loaded (otherwise the NER-bearing targets time a no-op)."""
+    return parser._get_nlp() is not None
+
+
+def benchmark_targets() -> Dict[str, Callable[[str], Any]]:
+    allowed = sorted(ALLOWED_CITIES)
+    return {
+        REFERENCE: reference_call,
+        "extract_datetime": lambda q: parser.extract_datetime(q, now=NOW),
+        "extract_city": parser.extract_city,
+        "classify_intent": parser.classify_intent,
+        "parse_user_query": lambda q: parser.parse_user_query(q, allowed, now=NOW, use_cache=False),
+    }
+
+
+def run_benchmarks(n: int = BENCH_QUERIES, seed: int = 7) -> Dict[str, Dict[str, float]]:
+    """Benchmark every target over the same corpus (after one warm-up call each)."""
+    queries = build_corpus(n, seed)
+    report: Dict[str, Dict[str, float]] = {}
+    with duckling_stubbed():
+        for name, fn in benchmark_targets().items():
+            fn(queries[0])  # lazy model/library loading is not part of the per-query cost
+            report[name] = time_calls(fn, queries)
+    return report
+
+
+def load_baseline(path: Path = BASELINE_PATH) -> Dict[str, Any]:
+    return json.loads(path.read_text()) if path.exists() else {}
+
+
+def baseline_limits(baseline: Dict[str, Any]) -> Dict[str, Dict[str, float]]:
+    """Per-function ratio ceilings, without the metadata flags."""
+    return {name: limits for name, limits in baseline.items() if isinstance(limits, dict)}
+
+
+def regressions(report: Dict[str, Dict[str, float]], baseline: Dict[str, Any],
+                tolerance: float = BENCH_TOLERANCE) -> List[str]:
+    """Human-readable list of reference ratios exceeding baseline × tolerance.
+
+    A baseline not recorded with NER available is itself reported, since its
+    NER-bearing ceilings were measured against a no-op.
+    """
+    measured_ratios = ratios(report)
+    out = []
+    if baseline and baseline.get(NER_FLAG) is not True:
+        out.append("baseline was recorded without spaCy NER; re-record it with the model installed")
+    for name, limits in baseline_limits(baseline).items():
+        measured = measured_ratios.get(name)
+        if measured is None:
+            continue
+        for key, limit in limits.items():
+            if key in measured and measured[key] > limit * tolerance:
+                out.append(f"{name} {key}: {measured[key]:.1f}x > {limit * tolerance:.1f}x reference")
+    return out
+
+
+def format_report(report: Dict[str, Dict[str, float]]) -> str:
+    rel = ratios(report)
+    lines = [f"{'function':<18}{'n':>6}{'p50 ms':>10}{'p95 ms':>10}{'p99 ms':>10}{'qps':>10}{'p95 x ref':>11}"]
+    for name, r in report.items():
+        x = f"{rel[name]['p95_ratio']:>11.1f}" if name in rel else f"{'1 = mean':>11}"
+        lines.append(f"{name:<18}{r['n']:>6}{r['p50_ms']:>10.2f}{r['p95_ms']:>10.2f}{r['p99_ms']:>10.2f}"
+                     f"{r['qps']:>10.1f}{x}")
+    return "\n".join(lines)
+
+
+def main(argv: Optional[list] = None) -> int:
+    ap = argparse.ArgumentParser(description="RunBuddy parser latency benchmarks")
+    ap.add_argument("--n", type=int, default=BENCH_QUERIES, help="Corpus size")
+    ap.add_argument("--update-baseline", action="store_true",
+                    help="Write 3x the measured reference ratios as the new baseline")
+    args = ap.parse_args(argv)
+
+    if not ner_available():
+        print("[BENCH] spaCy NER is unavailable (install the model); refusing to benchmark a no-op")
+        return 2
+    report = run_benchmarks(args.n)
+    print(format_report(report))
+    if args.update_baseline:
+        baseline = {name: {k: max(1.0, round(v * 3, 1)) for k, v in r.items()}
+                    for name, r in ratios(report).items()}
+        rows = [f"  {json.dumps(NER_FLAG)}: true"]
+        rows += [f"  {json.dumps(name)}: {json.dumps(limits)}" for name, limits in baseline.items()]
+        BASELINE_PATH.write_text("{\n" + ",\n".join(rows) + "\n}\n")
+        print(f"[BENCH] Wrote {BASELINE_PATH}")
+        return 0
+    failed = regressions(report, load_baseline())
+    for f in failed:
+        print(f"[BENCH] Regression: {f}")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    raise SystemExit(main())
@@ -0,0 +1,43 @@
+"""Latency regression gate for the parser (see harness.py for the CLI).
+
+Skipped by default; run with RUNBUDDY_BENCH=1 python -m pytest tests/benchmarks.
+Also skipped when the spaCy model is missing, since NER would be a no-op.
+"""
+
+import pytest
+
+from .harness import (NER_FLAG, PERCENTILES, REFERENCE, baseline_limits, format_report, load_baseline,
+                      ner_available, ratios, regressions, run_benchmarks)
+
+pytestmark = pytest.mark.benchmark
+
+
+@pytest.fixture(scope="module")
+def report():
+    if not ner_available():
+        pytest.skip("spaCy NER model not installed; NER-bearing timings would be meaningless")
+    r = run_benchmarks()
+    print("\n" + format_report(r))
+    return r
+
+
+def test_baseline_recorded_with_ner(report):
+    assert load_baseline().get(NER_FLAG) is True, \
+        "re-record with: python -m tests.benchmarks.harness --update-baseline"
+
+
+@pytest.mark.parametrize("name", sorted(baseline_limits(load_baseline())))
+def test_within_baseline(report, name):
+    assert name in report
+    assert report[name]["n"] > 0
+    limits = baseline_limits(load_baseline())[name]
+    assert not regressions(report, {NER_FLAG: True, name: limits})
+
+
+def test_report_has_percentiles_and_throughput(report):
+    for r in report.values():
+        assert all(f"p{p}_ms" in r for p in PERCENTILES)
+        assert r["p50_ms"] <= r["p95_ms"] <= r["p99_ms"]
+        assert r["qps"] > 0
+    assert REFERENCE in report
+    assert set(ratios(report)) == set(report) - {REFERENCE}
@@ -0,0 +1,33 @@
+"""Shared pytest setup.
+
+The on-disk cache tiers, the trail catalog snapshot and the calendar sync
+state are disabled before any runbuddy module is imported, so test runs
+never write under ~/.cache/runbuddy. Tests that need a disk tier point one at tmp_path.
+
+Tests marked `benchmark` (tests/benchmarks) are skipped unless
+RUNBUDDY_BENCH=1 is set.
+"""
+
+import os
+
+import pytest
+
+for _var in ("FORECAST_CACHE_PATH", "RECOMMENDATION_CACHE_PATH", "TRAIL_CATALOG_PATH", "CALENDAR_STATE_PATH"):
+    os.environ.setdefault(_var, "")
+# recommender.py builds its Groq client at import; tests replace it with a fake
+os.environ.setdefault("GROQ_API_KEY", "test-key")
+
+BENCH_ENV = "RUNBUDDY_BENCH"
+
+
+def pytest_configure(config):
+    config.addinivalue_line("markers", f"benchmark: wall-clock latency gate, runs only with {BENCH_ENV}=1")
+
+
+def pytest_collection_modifyitems(config, items):
+    if os.getenv(BENCH_ENV) == "1":
+        return
+    skip = pytest.mark.skip(reason=f"benchmark; set {BENCH_ENV}=1 to run")
+    for item in items:
+        if "benchmark" in item.keywords:
+            item.add_marker(skip)
@@ -0,0 +1,87 @@
+"""TTLCache (expiry, LRU eviction, counters) and the SQLiteStore disk tier."""
+
+import time
+
+from runbuddy.cache import SQLiteStore, TTLCache
+
+
+def test_get_set_and_hit_rate():
+    c = TTLCache(max_entries=4)
+    assert c.get("a") is None
+    c.set("a", 1)
+    assert c.get("a") == 1
+    s = c.stats()
+    assert (s["hits"], s["misses"], s["size"]) == (1, 1, 1)
+    assert s["hit_rate"] == 0.5
+
+
+def test_default_ttl_and_explicit_expiry():
+    c = TTLCache(max_entries=4, ttl_s=0.05)
+    c.set("a", 1)
+    c.set("b", 2, expires_at=time.time() + 60)
+    time.sleep(0.06)
+    assert c.get("a") is None
+    assert c.get("b") == 2
+    assert c.stats()["expired"] == 1
+
+
+def test_lru_eviction_keeps_recently_used():
+    c = TTLCache(max_entries=2)
+    c.set("a", 1)
+    c.set("b", 2)
+    c.get("a")  # "b" is now least recently used
+    c.set("c", 3)
+    assert c.get("b") is None
+    assert c.get("a") == 1 and c.get("c") == 3
+    assert c.stats()["evictions"] == 1
+
+
+def test_invalidate_one_and_all():
+    c = TTLCache()
+    c.set("a", 1)
+    c.set("b", 2)
+    c.invalidate("a")
+    assert c.get("a") is None and c.get("b") == 2
+    c.invalidate()
+    assert c.stats()["size"] == 0
+
+
+def test_disk_store_is_created_lazily(tmp_path):
+    path = tmp_path / "sub" / "cache.sqlite"
+    store = SQLiteStore(path, "t")
+    assert not path.exists()
+    store.set("k", {"v": 1}, None)
+    assert path.exists()
+    assert store.get("k") == ({"v": 1}, None)
+
+
+def test_disk_tier_survives_restart_and_promotes(tmp_path):
+    path = tmp_path / "cache.sqlite"
+    TTLCache(disk=SQLiteStore(path, "t")).set("k", [1, 2], expires_at=time.time() + 60)
+
+    fresh = TTLCache(disk=SQLiteStore(path, "t"))
+    assert fresh.get("k") == [1, 2]
+    assert fresh.stats()["disk_hits"] == 1
+    assert fresh.get("k") == [1, 2]
+    assert fresh.stats()["hits"] == 1  # promoted into memory
+
+
+def test_disk_rows_expire_and_are_capped(tmp_path):
+    store = SQLiteStore(tmp_path / "cache.sqlite", "t", max_rows=2)
+    store.set("old", 1, time.time() - 1)
+    assert store.get("old") is None
+    for i in range(3):
+        store.set(f"k{i}", i, None)
+        time.sleep(0.001)
+    assert store.get("k0") is None
+    assert store.get("k2") == (2, None)
+
+
+def test_unwritable_disk_tier_falls_back_to_memory(tmp_path):
+    blocker = tmp_path / "file"
+    blocker.write_text("x")
+    c = TTLCache(disk=SQLiteStore(blocker / "cache.sqlite", "t"))
+    c.set("k", 1)
+    assert c.get("k") == 1
+    c.invalidate()
+    assert c.get("k") is None
@@ -0,0 +1,83 @@
+"""RunEventStore incremental sync and its persisted state (fake Calendar API)."""
+
+import datetime
+
+import pytest
+
+from runbuddy.config import LOCAL_TZ
+from runbuddy.integrations import calendar
+
+NOW = datetime.datetime(2026, 10, 14, 9, 0, tzinfo=LOCAL_TZ)
+
+
+def _event(eid, summary, start, hours=1, status="confirmed"):
+    end = start + datetime.timedelta(hours=hours)
+    return {"id": eid, "summary": summary, "status": status,
+            "start": {"dateTime": start.isoformat()}, "end": {"dateTime": end.isoformat()}}
+
+
+class FakeCalendar:
+    """events().list(...).execute() returning canned pages per sync token."""
+
+    def __init__(self, pages):
+        self.pages = pages  # sync token (None = full sync) -> (items, next token)
+        self.calls = []
+
+    def events(self):
+        return self
+
+    def list(self, **kwargs):
+        self.calls.append(kwargs)
+        items, token = self.pages[kwargs.get("syncToken")]
+        return type("Req", (), {"execute": lambda _self: {"items": items, "nextSyncToken": token}})()
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    service = FakeCalendar({
+        None: ([
+            _event("past", "Morning run", NOW - datetime.timedelta(days=3)),
+            _event("today", "Evening run", NOW.replace(hour=18)),
+            _event("meeting", "Standup", NOW.replace(hour=10)),
+        ], "t1"),
+        "t1": ([_event("fri", "Long jog", NOW + datetime.timedelta(days=2))], "t2"),
+        "t2": ([], "t2"),
+    })
+    monkeypatch.setattr(calendar, "get_google_service", lambda *a, **k: service)
+    return service
+
+
+def test_full_sync_keeps_upcoming_run_events(fake):
+    store = calendar.RunEventStore()
+    store.sync(now=NOW)
+    assert store.time_for_date(NOW.date(), now=NOW) == NOW.replace(hour=18)
+    assert store.next_run_time(now=NOW) == NOW.replace(hour=18)
+    assert set(store._events) == {"today"}  # finished and non-run events are dropped
+
+
+def test_incremental_sync_applies_changes(fake):
+    store = calendar.RunEventStore()
+    store.sync(now=NOW)
+    store.sync(now=NOW)
+    assert fake.calls[1]["syncToken"] == "t1"
+    assert set(store._events) == {"today", "fri"}
+
+
+def test_state_is_persisted_and_resumed(fake, tmp_path):
+    path = tmp_path / "calendar.json"
+    calendar.RunEventStore(state_path=str(path)).sync(now=NOW)
+    assert path.exists()
+
+    resumed = calendar.RunEventStore(state_path=str(path))
+    resumed.sync(now=NOW)
+    assert fake.calls[-1]["syncToken"] == "t1"  # no second full listing
+    assert resumed.next_run_time(now=NOW) == NOW.replace(hour=18)
+    assert set(resumed._events) == {"today", "fri"}
+
+
+def test_state_for_another_calendar_is_ignored(fake, tmp_path):
+    path = tmp_path / "calendar.json"
+    calendar.RunEventStore(state_path=str(path)).sync(now=NOW)
+    other = calendar.RunEventStore(calendar_id="team", state_path=str(path))
+    other.sync(now=NOW)
+    assert "syncToken" not in fake.calls[-1]
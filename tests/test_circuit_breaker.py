@@ -0,0 +1,83 @@
+"""CircuitBreaker state transitions and counters (fake monotonic clock)."""
+
+import pytest
+
+from runbuddy.integrations import circuit_breaker
+from runbuddy.integrations.circuit_breaker import CLOSED, HALF_OPEN, OPEN, CircuitBreaker
+
+
+class FakeClock:
+    def __init__(self):
+        self.now = 1000.0
+
+    def monotonic(self):
+        return self.now
+
+
+@pytest.fixture
+def clock(monkeypatch):
+    c = FakeClock()
+    monkeypatch.setattr(circuit_breaker, "time", c)
+    return c
+
+
+def tripped(clock, **kwargs):
+    b = CircuitBreaker("test", failure_threshold=2, reset_timeout_s=30, **kwargs)
+    b.record_failure()
+    b.record_failure()
+    return b
+
+
+def test_trips_after_consecutive_failures(clock):
+    b = CircuitBreaker("test", failure_threshold=3)
+    b.record_failure()
+    b.record_failure()
+    b.record_success()  # resets the streak
+    b.record_failure()
+    b.record_failure()
+    assert b.state == CLOSED and b.allow_request()
+    b.record_failure()
+    assert b.state == OPEN
+    assert not b.allow_request()
+    snap = b.snapshot()
+    assert (snap["trips"], snap["failures"], snap["successes"], snap["rejected"]) == (1, 5, 1, 1)
+
+
+def test_open_becomes_half_open_after_timeout(clock):
+    b = tripped(clock)
+    clock.now += 29
+    assert b.state == OPEN and b.snapshot()["retry_in_s"] == pytest.approx(1)
+    clock.now += 1
+    assert b.state == HALF_OPEN
+
+
+def test_half_open_limits_probes(clock):
+    b = tripped(clock, half_open_probes=2)
+    clock.now += 30
+    assert b.allow_request() and b.allow_request()
+    assert not b.allow_request()
+
+
+def test_probe_success_closes(clock):
+    b = tripped(clock)
+    clock.now += 30
+    assert b.allow_request()
+    b.record_success()
+    assert b.state == CLOSED and b.snapshot()["consecutive_failures"] == 0
+
+
+def test_probe_failure_reopens_for_a_full_timeout(clock):
+    b = tripped(clock)
+    clock.now += 30
+    assert b.allow_request()
+    b.record_failure()
+    assert b.state == OPEN
+    clock.now += 29
+    assert not b.allow_request()
+    assert b.snapshot()["trips"] == 2
+
+
+def test_reset_closes(clock):
+    b = tripped(clock)
+    b.reset()
+    assert b.state == CLOSED and b.allow_request()
@@ -0,0 +1,62 @@
+"""Compact recommender context and its token budget (runbuddy.services.context_encoder)."""
+
+from runbuddy.models.domain import Trail
+from runbuddy.services.context_encoder import HAZARD_MAX_CHARS, encode_context, estimate_tokens
+
+EVENT = {"start": "2026-10-14T07:00:00-04:00"}
+WEATHER = {"temperature": 18, "precipitation": 0.4, "windspeed": 8, "condition": "clear"}
+
+
+def trail(i, hazards="Multi-use path"):
+    return Trail(f"Trail {i}", "Scarborough", length_km=2.5, difficulty="Easy–Moderate", terrain_type="Paved",
+                 weather_sensitivity="Low", shade_coverage="High", mud_rain_risk="Medium",
+                 elevation_gain="Low", hazards=hazards)
+
+
+def test_table_layout_and_level_codes():
+    text, info = encode_context(EVENT, WEATHER, [trail(1)])
+    lines = text.splitlines()
+    assert lines[0] == "run: 2026-10-14 07:00"
+    assert lines[1] == "weather: temp 18C, precip 0.4mm, wind 8km/h, clear"
+    assert lines[3] == "name|city|km|diff|terrain|sens|shade|mud|elev|hazards"
+    assert lines[4] == "Trail 1|Scarborough|2.5|E-M|Paved|L|H|M|L|Multi-use path"
+    assert info == {"tokens": estimate_tokens(text), "trails": 1, "columns": lines[3].split("|"), "dropped": []}
+
+
+def test_empty_columns_are_left_out_and_pipes_escaped():
+    text, info = encode_context({"date": "2026-10-14", "time": "07:00"}, {}, [Trail("A|B", "Markham")])
+    assert text.splitlines() == ["run: 2026-10-14 07:00", "trails:", "name|city", "A/B|Markham"]
+    assert info["columns"] == ["name", "city"]
+
+
+def test_no_budget_keeps_everything():
+    _, info = encode_context(EVENT, WEATHER, [trail(i) for i in range(20)], token_budget=0)
+    assert info["trails"] == 20 and info["dropped"] == []
+
+
+def test_budget_drops_low_value_columns_then_hazards_then_rows():
+    trails = [trail(i, hazards="Steep eroded slopes near the creek, slippery roots and stairs " * 2)
+              for i in range(10)]
+    full, _ = encode_context(EVENT, WEATHER, trails)
+
+    text, info = encode_context(EVENT, WEATHER, trails, token_budget=estimate_tokens(full) - 5)
+    assert info["dropped"][0] == "elev"
+    assert info["tokens"] <= estimate_tokens(full) - 5
+
+    text, info = encode_context(EVENT, WEATHER, trails, token_budget=60)
+    assert info["dropped"][:5] == ["elev", "km", "diff", "terrain", f"hazards>{HAZARD_MAX_CHARS}"]
+    assert info["dropped"][-1] == f"rows>{info['trails']}"
+    assert 1 <= info["trails"] < 10
+    assert {"name", "city", "sens", "shade", "mud", "hazards"} <= set(info["columns"])
+    assert text.splitlines()[4].startswith("Trail 0|")  # best trails are kept
+
+
+def test_budget_always_keeps_one_row():
+    _, info = encode_context(EVENT, WEATHER, [trail(1), trail(2)], token_budget=1)
+    assert info["trails"] == 1
+
+
+def test_estimate_tokens_counts_words_symbols_and_long_words():
+    assert estimate_tokens("") == 0
+    assert estimate_tokens("a|b") == 3
+    assert estimate_tokens("internationalization") > estimate_tokens("trail")
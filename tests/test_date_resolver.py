@@ -0,0 +1,52 @@
+"""Single-pass date/time resolution (runbuddy.nlp.date_resolver)."""
+
+from datetime import datetime
+
+import pytest
+
+from runbuddy.config import LOCAL_TZ
+from runbuddy.nlp.date_resolver import resolve_datetime
+from runbuddy.nlp.fast_time import fast_extract_datetime
+
+POD = {"morning": "07:30", "noon": "12:00", "evening": "18:30", "tonight": "21:30"}
+NOW = datetime(2026, 10, 14, 9, 0, tzinfo=LOCAL_TZ)  # a Wednesday morning
+
+
+def at(month, day, hour, minute=0, year=2026):
+    return datetime(year, month, day, hour, minute, tzinfo=LOCAL_TZ)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("october 25 at 7am", at(10, 25, 7)),
+    ("on oct 3 at 7am", at(10, 3, 7, year=2027)),  # past date without a year rolls forward
+    ("on the 13th", at(11, 13, 9)),  # bare ordinal already past -> next month
+    ("on 11/02", at(11, 2, 9)),
+    ("on 2026-11-15 morning", at(11, 15, 7, 30)),
+    ("on may 9 at noon", at(5, 9, 12, year=2027)),
+    ("december 1st evening", at(12, 1, 18, 30)),
+    ("in 3 days", at(10, 17, 9)),
+    ("next week", at(10, 21, 9)),
+    ("day after tomorrow at 8", at(10, 16, 8)),
+    ("5 days ago", at(10, 9, 9)),
+    ("in 2 hours", at(10, 14, 11)),
+    ("at 18:00", at(10, 14, 18)),
+])
+def test_resolves_dates_and_times(text, expected):
+    assert resolve_datetime(text, NOW, POD) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "next sat morning", "run on wed at 6pm", "wednesday", "next wednesday", "this friday",
+    "this weekend", "tonight", "tomorrow evening", "saturday at 7",
+])
+def test_agrees_with_the_fast_path(text):
+    assert resolve_datetime(text, NOW, POD) == fast_extract_datetime(text, NOW, POD)
+
+
+@pytest.mark.parametrize("text", [
+    "where should I run in Markham?",
+    "I sat at my desk all day",
+    "we'd wed soon",
+])
+def test_no_date_or_time(text):
+    assert resolve_datetime(text, NOW, POD) is None
@@ -0,0 +1,55 @@
+"""Trail normalization from sheet rows (runbuddy.models.domain)."""
+
+import pytest
+
+from runbuddy.models.domain import Trail, _first_number
+
+ROW = {
+    "Trail Name": " Discovery Park Loop ",
+    "Location": "Seattle",
+    "Length (km)": "4.5 km",
+    "Difficulty": "Easy",
+    "Terrain Type": "Forest",
+    "Weather Sensitivity": "Low",
+    "Shade Coverage": "High",
+    "Mud/Rain Risk": "Medium",
+    "Elevation Gain": "120m",
+    "Notes & Hazards": "Bluff edges",
+}
+
+
+@pytest.mark.parametrize("cell, expected", [
+    ("9.0", 9.0), ("5.2 km", 5.2), ("120m", 120.0), ("~30 m", 30.0), ("4,5", 4.5),
+    (7, 7.0), (2.5, 2.5), ("Low", None), ("", None), (None, None),
+])
+def test_first_number(cell, expected):
+    assert _first_number(cell) == expected
+
+
+def test_from_row_maps_sheet_headers():
+    t = Trail.from_row(ROW)
+    assert t.name == "Discovery Park Loop"  # cells are stripped
+    assert t.location == "Seattle"
+    assert t.length_km == 4.5
+    assert (t.difficulty, t.terrain_type, t.weather_sensitivity) == ("Easy", "Forest", "Low")
+    assert (t.shade_coverage, t.mud_rain_risk, t.hazards) == ("High", "Medium", "Bluff edges")
+    assert (t.elevation_gain, t.elevation_gain_m) == ("120m", 120.0)
+
+
+def test_from_row_accepts_field_names():
+    t = Trail.from_row({"name": "Green Lake", "location": "Seattle", "length_km": 4.6})
+    assert (t.name, t.location, t.length_km) == ("Green Lake", "Seattle", 4.6)
+
+
+def test_missing_and_blank_cells_become_none():
+    t = Trail.from_row({"Trail Name": "Short Row", "Length (km)": "  ", "Elevation Gain": "Low"})
+    assert t.location is None and t.length_km is None and t.hazards is None
+    assert (t.elevation_gain, t.elevation_gain_m) == ("Low", None)
+
+
+def test_to_dict_drops_elevation_gain_m():
+    d = Trail.from_row(ROW).to_dict()
+    assert "elevation_gain_m" not in d
+    assert d["elevation_gain"] == "120m"
+    assert d["name"] == "Discovery Park Loop" and d["length_km"] == 4.5
+    assert set(d) == set(Trail.__slots__) - {"elevation_gain_m"}
@@ -0,0 +1,59 @@
+"""Rule-based fast-path time extraction (runbuddy.nlp.fast_time)."""
+
+from datetime import datetime
+
+import pytest
+
+from runbuddy.config import LOCAL_TZ
+from runbuddy.nlp.fast_time import fast_extract_datetime
+
+POD = {"morning": "07:30", "afternoon": "15:00", "evening": "18:30", "tonight": "21:30"}
+NOW = datetime(2026, 10, 14, 9, 0, tzinfo=LOCAL_TZ)  # a Wednesday morning
+
+
+def at(day, hour, minute=0):
+    return NOW.replace(day=day, hour=hour, minute=minute)
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("run tomorrow morning?", at(15, 7, 30)),
+    ("tonight in Markham", at(14, 21, 30)),
+    ("tonight at 8", at(14, 20)),
+    ("saturday evening", at(17, 18, 30)),
+    ("this friday at 6:30 am", at(16, 6, 30)),
+    ("next wednesday", at(21, 9)),
+    ("wednesday at 7pm", at(14, 19)),
+    ("at 18:00", at(14, 18)),
+    ("at 7", at(14, 19)),  # ambiguous bare hour -> next future occurrence
+    ("at 8 am", at(15, 8)),  # already past today -> tomorrow
+    ("in 2 hours", at(14, 11)),
+    ("in an hour", at(14, 10)),
+    ("this weekend", at(17, 9)),
+    ("run now", at(14, 9)),
+])
+def test_resolves_common_phrases(text, expected):
+    assert fast_extract_datetime(text, NOW, POD) == expected
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("next sat morning", at(17, 7, 30)),
+    ("run on wed at 6pm", at(14, 18)),
+    ("sat. 7am", at(17, 7)),
+])
+def test_ambiguous_abbreviations_with_a_cue(text, expected):
+    assert fast_extract_datetime(text, NOW, POD) == expected
+
+
+@pytest.mark.parametrize("text", [
+    "I sat at my desk all day, can I run in Markham?",
+    "we'd wed soon, run in Pickering",
+    "a run in the sun in Scarborough",
+    "run an 8 km loop",
+])
+def test_no_time_mentioned(text):
+    assert fast_extract_datetime(text, NOW, POD) is None
+
+
+@pytest.mark.parametrize("text", ["october 25 at 7am", "on 10/25", "the 14th", "in 3 days", "next week"])
+def test_calendar_dates_are_deferred(text):
+    assert fast_extract_datetime(text, NOW, POD) is None
@@ -0,0 +1,73 @@
+"""Gazetteer trie matching and the shipped place-name data file."""
+
+import json
+
+import pytest
+
+from runbuddy.nlp.gazetteer import Gazetteer, get_gazetteer
+
+DATA = {
+    "Scarborough": {"aliases": ["Scarboro", "STC"], "neighbourhoods": ["Rouge", "Rouge Park"]},
+    "Markham": {"aliases": ["Markham Village"], "neighbourhoods": ["Unionville"]},
+}
+
+
+@pytest.fixture(scope="module")
+def gaz():
+    return Gazetteer.from_dict(DATA, cities=["Pickering"])
+
+
+def test_matches_cities_aliases_and_neighbourhoods(gaz):
+    assert gaz.match("run in scarboro today").city == "Scarborough"
+    m = gaz.match("trails near Unionville?")
+    assert (m.city, m.name, m.kind) == ("Markham", "Unionville", "neighbourhood")
+    assert gaz.match("anything in Pickering").kind == "city"
+
+
+def test_whole_words_only(gaz):
+    assert gaz.match("Rougemount loop") is None
+    assert gaz.match("a 5k stcroll") is None
+
+
+def test_leftmost_longest(gaz):
+    m = gaz.match("Rouge Park or Markham Village")
+    assert (m.name, m.start, m.end) == ("Rouge Park", 0, 2)
+    assert [x.name for x in gaz.find_all("Rouge Park or Markham Village")] == ["Rouge Park", "Markham Village"]
+
+
+def test_city_wins_over_alias_for_the_same_name():
+    gaz = Gazetteer.from_dict({"Markham": {"aliases": ["Pickering"]}}, cities=["Pickering"])
+    assert gaz.resolve("pickering") == "Pickering"
+
+
+def test_allowed_restricts_matches(gaz):
+    text = "Rouge or Unionville"
+    assert gaz.match(text, allowed=["Markham"]).city == "Markham"
+    assert gaz.match(text, allowed=["Pickering"]) is None
+
+
+def test_resolve_exact_names_only(gaz):
+    assert gaz.resolve("STC") == "Scarborough"
+    assert gaz.resolve("Rouge") == "Scarborough"
+    assert gaz.resolve("Rouge Hill") is None
+    assert gaz.resolve("") is None
+
+
+def test_missing_file_gives_city_names_only(tmp_path, capsys):
+    gaz = Gazetteer.from_file(str(tmp_path / "missing.json"), cities=["Markham"])
+    assert gaz.cities() == ["Markham"]
+    assert "[GAZ]" in capsys.readouterr().out
+
+
+def test_get_gazetteer_is_cached_per_path_and_cities(tmp_path):
+    path = tmp_path / "gaz.json"
+    path.write_text(json.dumps(DATA))
+    first = get_gazetteer(["Pickering"], str(path))
+    assert get_gazetteer(["Pickering"], str(path)) is first
+    assert get_gazetteer([], str(path)) is not first
+
+
+def test_shipped_data_covers_allowed_cities():
+    gaz = get_gazetteer()
+    for name, city in [("STC", "Scarborough"), ("Unionville", "Markham"), ("Bay Ridges", "Pickering")]:
+        assert gaz.resolve(name) == city
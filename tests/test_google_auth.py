@@ -0,0 +1,81 @@
+"""In-memory credential cache and per-thread HTTP reuse (no real Google calls)."""
+
+import datetime
+import threading
+
+import pytest
+
+from runbuddy.integrations import google_auth
+
+
+class FakeCreds:
+    def __init__(self, minutes_left):
+        now = datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+        self.expiry = now + datetime.timedelta(minutes=minutes_left)
+        self.refresh_token = None  # no background timer in tests
+        self.token = "tok"
+
+    @property
+    def valid(self):
+        return self.expiry > datetime.datetime.now(datetime.timezone.utc).replace(tzinfo=None)
+
+
+@pytest.fixture
+def disk(monkeypatch):
+    reads = []
+
+    def _from_disk(base_dir):
+        creds = reads[-1] if reads and reads[-1].valid else FakeCreds(minutes_left=2)
+        reads.append(creds)
+        return creds
+
+    monkeypatch.setattr(google_auth, "_authenticate_from_disk", _from_disk)
+    return reads
+
+
+def test_credentials_inside_refresh_margin_are_served_from_memory(disk, tmp_path):
+    manager = google_auth._CredentialManager()
+    first = manager.get(tmp_path)
+    assert manager._expires_soon(first)  # 2 minutes left < 300 s margin
+    assert manager.get(tmp_path) is first
+    assert manager.get(tmp_path) is first
+    assert len(disk) == 1
+
+
+def test_expired_credentials_are_reloaded(disk, tmp_path):
+    manager = google_auth._CredentialManager()
+    first = manager.get(tmp_path)
+    first.expiry -= datetime.timedelta(minutes=5)
+    assert manager.get(tmp_path) is not first
+    assert len(disk) == 2
+
+
+@pytest.fixture
+def creds(monkeypatch):
+    holder = {"creds": FakeCreds(minutes_left=60)}
+    monkeypatch.setattr(google_auth, "authenticate_google_api", lambda base_dir=None: holder["creds"])
+    monkeypatch.setattr(google_auth, "_thread_http", threading.local())
+    return holder
+
+
+def test_authorized_http_is_reused_per_thread_and_service(creds):
+    key = ("sheets", "v4")
+    http = google_auth._authorized_http(key)
+    assert google_auth._authorized_http(key) is http
+    assert google_auth._authorized_http(("drive", "v3")) is not http
+
+    other = []
+    t = threading.Thread(target=lambda: other.append(google_auth._authorized_http(key)))
+    t.start()
+    t.join()
+    assert other[0] is not http  # httplib2 connections are never shared across threads
+
+
+def test_authorized_http_follows_replaced_credentials(creds):
+    key = ("sheets", "v4")
+    http = google_auth._authorized_http(key)
+    creds["creds"].token = "refreshed"  # refreshed in place: same connection
+    assert google_auth._authorized_http(key) is http
+    creds["creds"] = FakeCreds(minutes_left=60)  # re-consent: new credentials object
+    fresh = google_auth._authorized_http(key)
+    assert fresh is not http and fresh.credentials is creds["creds"]
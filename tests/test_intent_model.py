@@ -0,0 +1,66 @@
+"""Versioned intent-model artifact: reuse, and retraining when it goes stale."""
+
+import json
+
+import joblib
+import pytest
+
+from runbuddy.nlp import intent_model
+
+
+@pytest.fixture
+def paths(tmp_path, monkeypatch):
+    data = tmp_path / "training.jsonl"
+    data.write_text(json.dumps({"text": "find me a trail for today", "label": "where_today"}) + "\n")
+    trained = []
+    real_train = intent_model.train_model
+    monkeypatch.setattr(intent_model, "train_model", lambda extra: trained.append(extra) or real_train(extra))
+    return str(data), str(tmp_path / "model" / "intent.joblib"), trained
+
+
+def test_missing_artifact_is_trained_and_written(paths):
+    data, artifact, trained = paths
+    model = intent_model.load_model(data, artifact)
+    assert len(trained) == 1
+    saved = joblib.load(artifact)
+    assert saved["data_hash"] == intent_model.training_data_hash(intent_model.load_training_data(data))
+    assert list(model.classes_) == list(saved["model"].classes_)
+
+
+def test_matching_artifact_is_loaded_without_training(paths):
+    data, artifact, trained = paths
+    intent_model.export_model(data, artifact)
+    trained.clear()
+    model = intent_model.load_model(data, artifact)
+    assert trained == []
+    assert model.predict(["where should i run tomorrow"])[0] == "where_tomorrow"
+
+
+def test_changed_training_data_triggers_retrain(paths):
+    data, artifact, trained = paths
+    intent_model.export_model(data, artifact)
+    old_hash = joblib.load(artifact)["data_hash"]
+    with open(data, "a") as f:
+        f.write(json.dumps({"text": "any trail near me tomorrow", "label": "where_tomorrow"}) + "\n")
+    trained.clear()
+    intent_model.load_model(data, artifact)
+    assert len(trained) == 1
+    assert joblib.load(artifact)["data_hash"] != old_hash
+
+
+def test_other_sklearn_version_triggers_retrain(paths):
+    data, artifact, trained = paths
+    saved = intent_model.export_model(data, artifact)
+    joblib.dump({**saved, "sklearn_version": "0.0.1"}, artifact)
+    trained.clear()
+    intent_model.load_model(data, artifact)
+    assert len(trained) == 1
+    assert joblib.load(artifact)["sklearn_version"] != "0.0.1"
+
+
+def test_unreadable_artifact_triggers_retrain(paths, tmp_path):
+    data, artifact, trained = paths
+    (tmp_path / "model").mkdir()
+    (tmp_path / "model" / "intent.joblib").write_bytes(b"not a joblib file")
+    intent_model.load_model(data, artifact)
+    assert len(trained) == 1
@@ -0,0 +1,52 @@
+"""Incremental JSON object scanner (runbuddy.services.json_stream)."""
+
+import pytest
+
+from runbuddy.services.json_stream import JSONObjectScanner, extract_json_object
+
+ANSWER = ('Sure! ```json\n{"trail_name": "Rouge \\"Vista\\"", "location": "Scarborough", '
+          '"reason": "Shaded {cool} trail, 5\\\\10 km", "meta": {"k": [1, "}"]}, "cautions": null}\n``` bye')
+EXPECTED = {"trail_name": 'Rouge "Vista"', "location": "Scarborough", "reason": "Shaded {cool} trail, 5\\10 km",
+            "meta": {"k": [1, "}"]}, "cautions": None}
+
+
+@pytest.mark.parametrize("size", [1, 2, 3, 7, len(ANSWER)])
+def test_chunked_feed_returns_object_when_it_closes(size):
+    fields = []
+    scanner = JSONObjectScanner(on_field=lambda k, v: fields.append((k, v)))
+    chunks = [ANSWER[i:i + size] for i in range(0, len(ANSWER), size)]
+    results = [scanner.feed(c) for c in chunks]
+    done = next(i for i, r in enumerate(results) if r is not None)
+    assert results[done] == EXPECTED
+    assert done == (ANSWER.rindex("}")) // size  # the chunk holding the closing brace
+    assert fields == list(EXPECTED.items())
+
+
+def test_fields_arrive_before_the_object_closes():
+    fields = []
+    scanner = JSONObjectScanner(on_field=lambda k, v: fields.append(k))
+    assert scanner.feed('{"trail_name": "A", "reas') is None
+    assert fields == ["trail_name"]
+    assert scanner.feed('on": "B"}') == {"trail_name": "A", "reason": "B"}
+    assert fields == ["trail_name", "reason"]
+
+
+def test_invalid_brace_groups_are_skipped():
+    assert JSONObjectScanner().feed('use {placeholder} then {"a": 1}') == {"a": 1}
+
+
+def test_incomplete_object_returns_none():
+    scanner = JSONObjectScanner()
+    assert scanner.feed('{"a": "unterminated }') is None
+    assert scanner.feed("") is None
+
+
+@pytest.mark.parametrize("text, expected", [
+    ('{"a": 1}', {"a": 1}),
+    ("prefix {\"a\": {\"b\": 2}} suffix", {"a": {"b": 2}}),
+    ("```json\n{\"a\": [1, 2]}\n```", {"a": [1, 2]}),
+    ("[1, 2]", None),
+    ("no json here", None),
+])
+def test_extract_json_object(text, expected):
+    assert extract_json_object(text) == expected
@@ -0,0 +1,103 @@
+"""Online intent learner: byte-offset feedback replay and checkpoint cadence."""
+
+import json
+
+import pytest
+
+from runbuddy.nlp import online_intent
+from runbuddy.nlp.online_intent import OnlineIntentLearner
+
+
+def _line(text, label):
+    return json.dumps({"text": text, "label": label}) + "\n"
+
+
+@pytest.fixture
+def files(tmp_path):
+    return tmp_path / "feedback.jsonl", str(tmp_path / "ckpt" / "online.joblib")
+
+
+def _write(path, lines):
+    with open(path, "a", encoding="utf-8") as f:
+        f.write("".join(lines))
+
+
+def test_replays_only_lines_added_since_the_offset(files):
+    log, ckpt = files
+    _write(log, [_line("run today", "where_today"), _line("run tomorrow", "where_tomorrow")])
+    learner = OnlineIntentLearner(checkpoint_path=ckpt)
+    assert learner.learn_from_log(str(log), batch_size=10) == 2
+    assert learner.log_offset == log.stat().st_size
+
+    _write(log, [_line("which spot today", "which_location_today")])
+    assert learner.learn_from_log(str(log), batch_size=10) == 1
+    assert learner.seen == 3
+
+
+def test_partial_trailing_line_is_left_for_later(files):
+    log, ckpt = files
+    complete = _line("run today", "where_today")
+    _write(log, [complete, '{"text": "run tomo'])
+    learner = OnlineIntentLearner(checkpoint_path=ckpt)
+    assert learner.learn_from_log(str(log)) == 1
+    assert learner.log_offset == len(complete.encode())
+
+    _write(log, ['rrow", "label": "where_tomorrow"}\n'])
+    assert learner.learn_from_log(str(log)) == 1
+    assert learner.log_offset == log.stat().st_size
+
+
+def test_unknown_labels_and_bad_lines_are_skipped(files):
+    log, ckpt = files
+    _write(log, [_line("run today", "where_today"), _line("buy shoes", "shopping"), "not json\n"])
+    learner = OnlineIntentLearner(checkpoint_path=ckpt)
+    assert learner.learn_from_log(str(log)) == 1
+    assert learner.skipped == 1
+    assert learner.log_offset == log.stat().st_size
+
+
+def test_rotated_log_is_read_from_the_start(files):
+    log, ckpt = files
+    _write(log, [_line("run today", "where_today")] * 3)
+    learner = OnlineIntentLearner(checkpoint_path=ckpt)
+    learner.learn_from_log(str(log))
+    log.write_text(_line("run tomorrow", "where_tomorrow"))
+    assert learner.learn_from_log(str(log)) == 1
+    assert learner.log_offset == log.stat().st_size
+
+
+def test_checkpoints_every_n_batches_and_after_the_last(files, monkeypatch):
+    log, ckpt = files
+    monkeypatch.setattr(online_intent, "INTENT_CHECKPOINT_EVERY", 2)
+    _write(log, [_line(f"run today {i}", "where_today") for i in range(5)])
+    learner = OnlineIntentLearner(checkpoint_path=ckpt)
+    offsets = []
+    real_checkpoint = learner.checkpoint
+    monkeypatch.setattr(learner, "checkpoint", lambda: offsets.append(learner.log_offset) or real_checkpoint())
+
+    learner.learn_from_log(str(log), batch_size=1)
+    line_len = len(_line("run today 0", "where_today").encode())
+    assert offsets == [2 * line_len, 4 * line_len, 5 * line_len]
+    learner.learn_from_log(str(log), batch_size=1)  # nothing new: no extra checkpoint
+    assert len(offsets) == 3
+
+
+def test_restart_resumes_from_the_checkpointed_offset(files):
+    log, ckpt = files
+    _write(log, [_line("run today", "where_today"), _line("run tomorrow", "where_tomorrow")])
+    first = online_intent.load_learner(ckpt, str(log))
+    bootstrapped = first.seen
+
+    _write(log, [_line("which spot today", "which_location_today")])
+    resumed = online_intent.load_learner(ckpt, str(log))
+    assert resumed.seen == bootstrapped + 1  # only the new line was replayed
+    assert resumed.log_offset == log.stat().st_size
+    assert set(resumed.classes_) == set(resumed.labels)
+
+
+def test_checkpoint_with_other_settings_is_ignored(files, monkeypatch):
+    log, ckpt = files
+    _write(log, [_line("run today", "where_today")])
+    online_intent.load_learner(ckpt, str(log))
+    monkeypatch.setattr(online_intent, "INTENT_HASH_BITS", online_intent.INTENT_HASH_BITS - 1)
+    assert OnlineIntentLearner.restore(ckpt) is None
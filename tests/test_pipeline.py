@@ -0,0 +1,86 @@
+"""Stage graph validation and concurrent execution (runbuddy.app.pipeline)."""
+
+import threading
+import time
+
+import pytest
+
+from runbuddy.app.pipeline import Stage, run_stages, validate_graph
+
+
+def test_validate_graph_orders_dependencies_first():
+    stages = [Stage("c", lambda a, b: a + b, ("a", "b")), Stage("b", lambda x: x, ("x",)),
+              Stage("a", lambda: 1)]
+    names = [st.name for st in validate_graph(stages, ["x"])]
+    assert names.index("a") < names.index("c") and names.index("b") < names.index("c")
+
+
+@pytest.mark.parametrize("stages, inputs, message", [
+    ([Stage("a", lambda: 1), Stage("a", lambda: 2)], [], "Duplicate"),
+    ([Stage("x", lambda: 1)], ["x"], "Duplicate"),
+    ([Stage("a", lambda missing: 1, ("missing",))], [], "unknown"),
+    ([Stage("a", lambda b: 1, ("b",)), Stage("b", lambda a: 1, ("a",))], [], "Cycle"),
+])
+def test_validate_graph_rejects_bad_graphs(stages, inputs, message):
+    with pytest.raises(ValueError, match=message):
+        validate_graph(stages, inputs)
+
+
+def test_run_stages_passes_results_and_records_timings():
+    timings = {}
+    out = run_stages(
+        [Stage("double", lambda n: n * 2, ("n",)), Stage("plus", lambda double, n: double + n, ("double", "n"))],
+        {"n": 5},
+        timings=timings,
+    )
+    assert out == {"n": 5, "double": 10, "plus": 15}
+    assert set(timings) == {"double", "plus"}
+
+
+def test_independent_stages_overlap():
+    barrier = threading.Barrier(2, timeout=2)
+
+    def meet():
+        barrier.wait()  # only returns if both stages run at the same time
+        return True
+
+    out = run_stages([Stage("a", meet), Stage("b", meet)], max_workers=2)
+    assert out["a"] and out["b"]
+
+
+def test_failure_propagates_and_skips_dependents():
+    ran = []
+
+    def boom():
+        raise RuntimeError("stage failed")
+
+    def after(bad):
+        ran.append(bad)
+
+    with pytest.raises(RuntimeError, match="stage failed"):
+        run_stages([Stage("bad", boom), Stage("after", after, ("bad",))])
+    assert ran == []
+
+
+def test_failure_does_not_wait_for_slow_stages():
+    def slow():
+        time.sleep(1.0)
+
+    def boom():
+        raise RuntimeError("fast failure")
+
+    started = time.perf_counter()
+    with pytest.raises(RuntimeError):
+        run_stages([Stage("slow", slow), Stage("boom", boom)], max_workers=2)
+    assert time.perf_counter() - started < 0.9
+
+
+def test_answer_stages_use_the_version_loaded_with_the_trails(monkeypatch):
+    from runbuddy.app import runner
+
+    seen = []
+    monkeypatch.setattr(runner, "prefilter_trails", lambda trails, city, constraints, version:
+                        seen.append(version) or trails)
+    trails = ["t1", "t2"]
+    assert runner._stage_candidates({"city": "Seattle"}, (trails, "v1")) == trails
+    assert seen == ["v1"]
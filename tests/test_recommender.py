@@ -0,0 +1,181 @@
+"""Recommender LLM calls against a fake Groq client (no network)."""
+
+import json
+import time
+from types import SimpleNamespace
+
+import pytest
+
+from runbuddy.cache import TTLCache
+from runbuddy.models.domain import Trail
+from runbuddy.services import recommender
+
+TRAILS = [Trail("Bluffers Park Trail", "Scarborough", terrain_type="Paved", mud_rain_risk="Low"),
+          Trail("Rouge Vista", "Scarborough", terrain_type="Natural", mud_rain_risk="High")]
+EVENT = {"start": "2026-10-14T07:00:00-04:00"}
+WEATHER = {"temperature": 15, "precipitation": 3, "windspeed": 5}
+
+
+def answer(model):
+    return json.dumps({"trail_name": "Bluffers Park Trail", "location": "Scarborough",
+                       "reason": f"picked by {model}", "cautions": None})
+
+
+class FakeGroq:
+    """chat.completions.create with per-model delay, error or raw reply."""
+
+    def __init__(self, delays=None, replies=None, chunk=4):
+        self.delays = delays or {}
+        self.replies = replies or {}
+        self.chunk = chunk
+        self.calls = []
+        self.consumed = []
+        self.chat = SimpleNamespace(completions=SimpleNamespace(create=self.create))
+
+    def create(self, model, messages, temperature, stream=False, **kwargs):
+        self.calls.append({"model": model, "stream": stream, **kwargs})
+        delay = self.delays.get(model, 0)
+        if isinstance(delay, Exception):
+            raise delay
+        time.sleep(delay)
+        text = self.replies.get(model) or answer(model)
+        if not stream:
+            return SimpleNamespace(choices=[SimpleNamespace(message=SimpleNamespace(content=text))])
+        return self._stream(text)
+
+    def _stream(self, text):
+        for i in range(0, len(text), self.chunk):
+            self.consumed.append(text[i:i + self.chunk])
+            yield SimpleNamespace(choices=[SimpleNamespace(delta=SimpleNamespace(content=text[i:i + self.chunk]))])
+
+
+@pytest.fixture
+def fake(monkeypatch):
+    client = FakeGroq()
+    monkeypatch.setattr(recommender, "client", client)
+    monkeypatch.setattr(recommender, "RECOMMENDATION_CACHE", TTLCache())
+    return client
+
+
+def test_plain_call_extracts_json_wrapped_in_prose(fake):
+    fake.replies["m"] = "Here you go:\n```json\n" + answer("m") + "\n```"
+    out = recommender.get_trail_recommendation(EVENT, WEATHER, TRAILS, model="m")
+    assert out == {"trail_name": "Bluffers Park Trail", "location": "Scarborough",
+                   "reason": "picked by m", "cautions": None}
+    assert fake.calls == [{"model": "m", "stream": False}]
+
+
+def test_default_model_comes_from_config(fake):
+    recommender.get_trail_recommendation(EVENT, WEATHER, TRAILS)
+    recommender.get_trail_recommendation(EVENT, WEATHER, TRAILS)
+    assert [c["model"] for c in fake.calls] == [recommender.RECOMMENDER_MODEL]
+    key = recommender.recommendation_cache_key(EVENT, WEATHER, TRAILS, recommender.RECOMMENDER_MODEL, 0.2)
+    assert recommender.RECOMMENDATION_CACHE.get(key) is not None
+
+def test_stream_reports_fields_and_stops_at_the_closing_brace(fake):
+    fake.replies["m"] = answer("m") + " and a long trailing explanation " * 20
+    fields = []
+    out = recommender.get_trail_recommendation(EVENT, WEATHER, TRAILS, model="m", stream=True,
+                                               on_field=lambda k, v: fields.append(k))
+    assert out["reason"] == "picked by m"
+    assert fields == ["trail_name", "location", "reason", "cautions"]
+    assert "".join(fake.consumed).rstrip().endswith("}")  # the trailing text was never read
+    assert fake.calls[0]["stream"] is True
+
+
+def test_stream_without_json_raises(fake):
+    fake.replies["m"] = "sorry, no idea"
+    with pytest.raises(ValueError):
+        recommender.get_trail_recommendation(EVENT, WEATHER, TRAILS, model="m", stream=True)
+
+
+def test_cache_hit_replays_fields(fake):
+    recommender.get_trail_recommendation(EVENT, WEATHER, TRAILS, model="m")
+    fields = []
+    out = recommender.get_trail_recommendation(EVENT, WEATHER, TRAILS, model="m", stream=True,
+                                               on_field=lambda k, v: fields.append((k, v)))
+    assert len(fake.calls) == 1
+    assert fields == [(k, out[k]) for k in ("trail_name", "location", "reason", "cautions")]
+
+
+def deadline(**kwargs):
+    opts = {"model": "big", "hedge_model": "small", "deadline_s": 0.6, "hedge_after_s": 0.15}
+    opts.update(kwargs)
+    return recommender.recommend_with_deadline(EVENT, WEATHER, TRAILS, **opts)
+
+
+def test_fast_primary_answer(fake):
+    out = deadline()
+    assert out["source"] == "llm" and out["reason"] == "picked by big"
+    assert [c["model"] for c in fake.calls] == ["big"]
+    assert 0 < fake.calls[0]["timeout"] <= 0.6
+
+
+def test_slow_primary_is_hedged(fake):
+    fake.delays["big"] = 2
+    started = time.monotonic()
+    out = deadline()
+    assert out["source"] == "llm_hedge" and out["reason"] == "picked by small"
+    assert time.monotonic() - started < 0.5
+
+
+def test_primary_error_hedges_immediately(fake):
+    fake.delays["big"] = RuntimeError("429 rate limited")
+    started = time.monotonic()
+    assert deadline()["source"] == "llm_hedge"
+    assert time.monotonic() - started < 0.1
+
+
+def test_deadline_returns_rules_answer(fake):
+    fake.delays.update(big=2, small=2)
+    started = time.monotonic()
+    out = deadline()
+    assert 0.55 < time.monotonic() - started < 0.9
+    assert out["source"] == "rules"
+    assert set(out) == {"trail_name", "location", "reason", "cautions", "source"}
+    assert out["trail_name"] == "Bluffers Park Trail"  # paved, low mud in the rain
+
+
+def test_all_errors_return_rules_answer_without_waiting(fake):
+    fake.delays.update(big=RuntimeError("down"), small=RuntimeError("down"))
+    started = time.monotonic()
+    assert deadline()["source"] == "rules"
+    assert time.monotonic() - started < 0.1
+
+
+def test_no_hedge_model(fake):
+    fake.delays["big"] = 2
+    assert deadline(hedge_model=None)["source"] == "rules"
+    assert [c["model"] for c in fake.calls] == ["big"]
+
+
+def test_cache_counts_one_lookup_per_request_and_hedge_answer_is_reused(fake):
+    fake.delays["big"] = 2
+    assert deadline()["source"] == "llm_hedge"
+    out = deadline()
+    assert out["source"] == "cache" and out["reason"] == "picked by small"
+    stats = recommender.recommendation_cache_stats()
+    assert (stats["misses"], stats["hits"], stats["hit_rate"]) == (1, 1, 0.5)
+
+
+def test_rules_answer_is_not_cached(fake):
+    fake.delays.update(big=RuntimeError("down"), small=RuntimeError("down"))
+    deadline()
+    fake.delays.clear()
+    assert deadline()["source"] == "llm"
+
+
+def test_streamed_fields_come_from_the_winner_only(fake):
+    fake.delays["big"] = 2
+    fields = []
+    out = deadline(stream=True, on_field=lambda k, v: fields.append((k, v)))
+    assert out["source"] == "llm_hedge"
+    assert fields == [(k, out[k]) for k in ("trail_name", "location", "reason", "cautions")]
+
+
+def test_streamed_rules_fallback_replays_fields(fake):
+    fake.delays.update(big=2, small=2)
+    fields = []
+    out = deadline(stream=True, on_field=lambda k, v: fields.append(k))
+    assert out["source"] == "rules"
+    assert fields == ["trail_name", "location", "reason", "cautions"]
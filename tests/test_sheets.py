@@ -0,0 +1,107 @@
+"""Windowed Sheets reader: paging, trimmed windows and blank rows (fake Sheets API)."""
+
+import re
+
+import pytest
+
+from runbuddy.integrations import sheets
+
+HEADER = ["Name", "City"]
+_RANGE_RE = re.compile(r"!A(\d+):L(\d+)$")
+
+
+def _request(payload):
+    return type("Req", (), {"execute": lambda _self: payload})()
+
+
+class FakeSheets:
+    """spreadsheets().get / values().batchGet over an in-memory grid.
+
+    Like the real API, each returned window drops its trailing empty rows.
+    """
+
+    def __init__(self, grid, row_count=None):
+        self.grid = grid  # list of rows; [] is a blank row
+        self.row_count = row_count
+        self.batches = []
+
+    def spreadsheets(self):
+        return self
+
+    def values(self):
+        return self
+
+    def get(self, **kwargs):
+        props = {"title": sheets.SHEET_TAB}
+        if self.row_count is not None:
+            props["gridProperties"] = {"rowCount": self.row_count}
+        return _request({"sheets": [{"properties": props}]})
+
+    def batchGet(self, ranges, **kwargs):
+        self.batches.append(ranges)
+        out = []
+        for rng in ranges:
+            first, last = (int(g) for g in _RANGE_RE.search(rng).groups())
+            rows = self.grid[first - 1:last]
+            while rows and not rows[-1]:
+                rows = rows[:-1]
+            out.append({"range": rng, "values": rows} if rows else {"range": rng})
+        return _request({"valueRanges": out})
+
+
+@pytest.fixture
+def use(monkeypatch):
+    def _use(grid, row_count="grid"):
+        service = FakeSheets(grid, len(grid) if row_count == "grid" else row_count)
+        monkeypatch.setattr(sheets, "get_google_service", lambda *a, **k: service)
+        return service
+    return _use
+
+
+def _names(**kwargs):
+    return [r["Name"] for r in sheets.iter_sheet_rows(**kwargs)]
+
+
+def test_header_only_first_window(use):
+    use([HEADER, ["a", "Seattle"], ["b", "Portland"]])
+    assert _names(page_rows=1, pages_per_call=2) == ["a", "b"]
+
+
+def test_header_only_sheet_yields_nothing(use):
+    use([HEADER])
+    assert _names(page_rows=5, pages_per_call=2) == []
+
+
+def test_blank_rows_inside_a_window_are_skipped(use):
+    use([HEADER, ["a", "Seattle"], [], ["", ""], ["b"]])
+    rows = list(sheets.iter_sheet_rows(page_rows=10, pages_per_call=1))
+    assert rows == [{"Name": "a", "City": "Seattle"}, {"Name": "b", "City": None}]
+
+
+def test_middle_window_ending_in_blank_rows_does_not_stop_reading(use):
+    # Window 2 (rows 4-6) ends in two blank rows, so the API returns it short
+    grid = [HEADER, ["a"], ["b"], ["c"], [], [], ["d"], ["e"]]
+    use(grid)
+    assert _names(page_rows=3, pages_per_call=1) == ["a", "b", "c", "d", "e"]
+
+
+def test_without_row_count_only_an_empty_window_stops(use):
+    grid = [HEADER, ["a"], ["b"], ["c"], [], [], ["d"], ["e"]]
+    service = use(grid, row_count=None)
+    assert _names(page_rows=3, pages_per_call=1) == ["a", "b", "c", "d", "e"]
+    assert len(service.batches) == 4  # the fourth window came back empty
+
+
+def test_exact_multiple_of_page_rows(use):
+    grid = [HEADER] + [[f"t{i}"] for i in range(5)]  # 6 rows = 2 windows of 3
+    service = use(grid)
+    assert _names(page_rows=3, pages_per_call=1) == [f"t{i}" for i in range(5)]
+    assert len(service.batches) == 2  # nothing requested past the grid
+
+
+def test_multi_window_batch_get(use):
+    grid = [HEADER] + [[f"t{i}"] for i in range(9)]  # 10 rows
+    service = use(grid)
+    assert _names(page_rows=2, pages_per_call=3) == [f"t{i}" for i in range(9)]
+    assert [len(b) for b in service.batches] == [3, 2]  # last call clipped to the grid
+    assert service.batches[0][0].endswith("!A1:L2") and service.batches[1][-1].endswith("!A9:L10")
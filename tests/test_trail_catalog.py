@@ -0,0 +1,149 @@
+"""Trail catalog snapshot: TTL, stale-while-revalidate and Drive revalidation."""
+
+import pytest
+
+from runbuddy.integrations import trail_catalog
+from runbuddy.models.domain import Trail
+
+TTL = 100
+MAX_STALE = 1000
+
+
+class FakeClock:
+    def __init__(self, t=10_000.0):
+        self.t = t
+
+    def time(self):
+        return self.t
+
+
+class FakeSheet:
+    """Stands in for load_trails_from_sheet / fetch_sheet_modified_time."""
+
+    def __init__(self):
+        self.downloads = 0
+        self.modified = "2026-10-01T00:00:00Z"
+        self.checks = 0
+
+    def load(self):
+        self.downloads += 1
+        return [Trail.from_row({"name": f"Trail v{self.downloads}", "city": "Seattle"})]
+
+    def modified_time(self):
+        self.checks += 1
+        return self.modified
+
+
+@pytest.fixture
+def env(monkeypatch, tmp_path):
+    clock, sheet = FakeClock(), FakeSheet()
+    monkeypatch.setattr(trail_catalog, "time", clock)
+    monkeypatch.setattr(trail_catalog, "load_trails_from_sheet", sheet.load)
+    monkeypatch.setattr(trail_catalog, "fetch_sheet_modified_time", sheet.modified_time)
+    monkeypatch.setattr(trail_catalog, "TRAIL_CATALOG_PATH", str(tmp_path / "catalog.json"))
+    monkeypatch.setattr(trail_catalog, "TRAIL_CATALOG_TTL_S", TTL)
+    monkeypatch.setattr(trail_catalog, "TRAIL_CATALOG_MAX_STALE_S", MAX_STALE)
+    monkeypatch.setattr(trail_catalog, "TRAIL_CATALOG_REVALIDATE", "ttl")
+    monkeypatch.setattr(trail_catalog, "_snapshot", None)
+    monkeypatch.setattr(trail_catalog, "_background", None)
+    return clock, sheet
+
+
+def _names(trails):
+    return [t.name for t in trails]
+
+
+def _join_background():
+    if trail_catalog._background is not None:
+        trail_catalog._background.join(timeout=5)
+
+
+def test_fresh_snapshot_is_served_without_google_calls(env):
+    clock, sheet = env
+    assert _names(trail_catalog.load_trail_catalog()) == ["Trail v1"]
+    clock.t += TTL
+    assert _names(trail_catalog.load_trail_catalog()) == ["Trail v1"]
+    assert sheet.downloads == 1
+
+
+def test_snapshot_is_reused_across_runs(env):
+    clock, sheet = env
+    trail_catalog.load_trail_catalog()
+    trail_catalog._snapshot = None  # a new process: only the file remains
+    assert _names(trail_catalog.load_trail_catalog()) == ["Trail v1"]
+    assert sheet.downloads == 1
+
+
+def test_stale_snapshot_is_served_and_refreshed_in_background(env):
+    clock, sheet = env
+    trail_catalog.load_trail_catalog()
+    clock.t += TTL + 1
+    assert _names(trail_catalog.load_trail_catalog()) == ["Trail v1"]  # old data, no waiting
+    _join_background()
+    assert trail_catalog._background.daemon
+    assert sheet.downloads == 2
+    assert _names(trail_catalog.load_trail_catalog()) == ["Trail v2"]
+
+
+def test_expired_snapshot_is_refreshed_synchronously(env):
+    clock, sheet = env
+    trail_catalog.load_trail_catalog()
+    clock.t += TTL + MAX_STALE + 1
+    assert _names(trail_catalog.load_trail_catalog()) == ["Trail v2"]
+    assert trail_catalog._background is None
+
+
+def test_expired_snapshot_is_served_when_refresh_fails(env, monkeypatch):
+    clock, sheet = env
+    trail_catalog.load_trail_catalog()
+    clock.t += TTL + MAX_STALE + 1
+    monkeypatch.setattr(trail_catalog, "load_trails_from_sheet", lambda: 1 / 0)
+    assert _names(trail_catalog.load_trail_catalog()) == ["Trail v1"]
+
+
+def test_force_refresh_downloads_even_when_fresh(env):
+    clock, sheet = env
+    trail_catalog.load_trail_catalog()
+    assert _names(trail_catalog.load_trail_catalog(force_refresh=True)) == ["Trail v2"]
+    assert sheet.downloads == 2
+
+
+def test_drive_modified_time_short_circuits_download(env, monkeypatch):
+    clock, sheet = env
+    monkeypatch.setattr(trail_catalog, "TRAIL_CATALOG_REVALIDATE", "drive")
+    trail_catalog.load_trail_catalog()
+    version = trail_catalog.catalog_version()
+    assert version == sheet.modified
+
+    clock.t += TTL + MAX_STALE + 1
+    assert _names(trail_catalog.load_trail_catalog()) == ["Trail v1"]
+    assert (sheet.checks, sheet.downloads) == (2, 1)
+    assert trail_catalog.catalog_version() == version
+    clock.t += TTL  # the check renewed the snapshot's freshness
+    trail_catalog.load_trail_catalog()
+    assert sheet.checks == 2
+
+    sheet.modified = "2026-10-02T00:00:00Z"
+    clock.t += TTL + MAX_STALE + 1
+    assert _names(trail_catalog.load_trail_catalog()) == ["Trail v2"]
+    assert trail_catalog.catalog_version() == sheet.modified
+
+
+def test_catalog_version_changes_with_each_download(env):
+    clock, sheet = env
+    assert trail_catalog.catalog_version() is None
+    trail_catalog.load_trail_catalog()
+    first = trail_catalog.catalog_version()
+    clock.t += 1
+    trail_catalog.load_trail_catalog(force_refresh=True)
+    assert trail_catalog.catalog_version() != first
+
+
+def test_version_is_taken_from_the_returned_snapshot(env):
+    clock, sheet = env
+    trails, version = trail_catalog.load_trail_catalog_with_version()
+    clock.t += TTL + 1
+    stale_trails, stale_version = trail_catalog.load_trail_catalog_with_version()
+    _join_background()  # the refresh swaps in a new snapshot after we returned
+    assert (stale_trails, stale_version) == (trails, version)
+    assert trail_catalog.catalog_version() != version
@@ -0,0 +1,73 @@
+"""TrailIndex queries, index caching and constraint extraction from questions."""
+
+import pytest
+
+from runbuddy.models.domain import Trail
+from runbuddy.nlp.parser import extract_trail_constraints
+from runbuddy.services.trail_index import TrailIndex, get_trail_index
+
+TRAILS = [
+    Trail("Bluffers", "Scarborough", length_km=2.0, difficulty="Easy", terrain_type="Paved",
+          shade_coverage="Low", mud_rain_risk="Low", elevation_gain_m=10),
+    Trail("Rouge Vista", "Scarborough", length_km=6.5, difficulty="Moderate", terrain_type="Forest / Gravel",
+          shade_coverage="High", mud_rain_risk="High", elevation_gain_m=120),
+    Trail("Milne Park", "Markham", length_km=4.0, difficulty="Easy–Moderate", terrain_type="Paved",
+          shade_coverage="Mixed", mud_rain_risk="Medium"),
+    Trail("Seaton", "Pickering", length_km=12.0, difficulty="Hard", terrain_type="Natural",
+          shade_coverage="High", mud_rain_risk="High", elevation_gain_m=200),
+]
+
+
+def names(trails):
+    return [t.name for t in trails]
+
+
+@pytest.fixture(scope="module")
+def index():
+    return TrailIndex(TRAILS)
+
+
+def test_no_constraints_returns_catalog(index):
+    assert names(index.query()) == names(TRAILS)
+
+
+def test_categorical_match_is_case_insensitive_and_any_of(index):
+    assert names(index.query(city="scarborough")) == ["Bluffers", "Rouge Vista"]
+    assert names(index.query(city=["Markham", "Pickering"])) == ["Milne Park", "Seaton"]
+
+
+def test_compound_values_match_per_part(index):
+    assert names(index.query(terrain="gravel")) == ["Rouge Vista"]
+    assert names(index.query(difficulty="easy")) == ["Bluffers", "Milne Park"]
+
+
+def test_ranges_are_inclusive_and_drop_unknown_values(index):
+    assert names(index.query(min_length_km=4, max_length_km=6.5)) == ["Rouge Vista", "Milne Park"]
+    assert names(index.query(max_elevation_m=150)) == ["Bluffers", "Rouge Vista"]
+
+
+def test_constraints_intersect(index):
+    assert names(index.query(city="Scarborough", mud_risk="high", min_length_km=5)) == ["Rouge Vista"]
+    assert index.query(city="Markham", difficulty="hard") == []
+
+
+def test_index_cache_follows_the_list_not_its_length():
+    first = list(TRAILS)
+    assert get_trail_index(first, "v1") is get_trail_index(first, "v1")
+    other = list(reversed(TRAILS))  # same version and length, different list
+    assert names(get_trail_index(other, "v1").query(city="Pickering")) == ["Seaton"]
+    assert get_trail_index(other, "v1").trails == other
+    assert get_trail_index(other, "v2") is not get_trail_index(other, "v1")
+
+
+@pytest.mark.parametrize("text, expected", [
+    ("easy run under 8 km in Markham", {"difficulty": "easy", "max_length_km": 8.0}),
+    ("difficulty: hard please", {"difficulty": "hard"}),
+    ("a challenging paved loop", {"difficulty": "hard", "terrain": "paved"}),
+    ("shaded trail with low mud risk", {"shade": ["high", "mixed", "moderate"], "mud_risk": "low"}),
+    ("it's raining hard, any trail in Scarborough?", {}),
+    ("is moderate mud ok for a run?", {"mud_risk": "medium"}),
+    ("moderate difficulty, avoid mud", {"difficulty": "moderate", "mud_risk": "low"}),
+])
+def test_extract_trail_constraints(text, expected):
+    assert extract_trail_constraints(text) == expected
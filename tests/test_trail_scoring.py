@@ -0,0 +1,99 @@
+"""Weather-based trail scoring, shortlisting and the rule-based answer."""
+
+from runbuddy.models.domain import Trail
+from runbuddy.services.trail_scoring import (TrailFeatures, get_trail_features, rank_trails,
+                                             rule_based_recommendation, shortlist_trails)
+
+MUDDY = Trail("Ravine Loop", "Scarborough", terrain_type="Natural", shade_coverage="High",
+              mud_rain_risk="High", weather_sensitivity="High", hazards="Creek crossings")
+PAVED = Trail("Waterfront Path", "Pickering", terrain_type="Paved", shade_coverage="Low",
+              mud_rain_risk="Low", weather_sensitivity="Low", hazards="Exposed shoreline")
+MIXED = Trail("Park Trail", "Markham", terrain_type="Paved / Gravel", shade_coverage="Mixed",
+              mud_rain_risk="Medium", weather_sensitivity="Medium")
+TRAILS = [MUDDY, PAVED, MIXED]
+
+RAIN = {"temperature": 15, "precipitation": 4, "windspeed": 5}
+HEAT = {"temperature": 31, "precipitation": 0, "windspeed": 5}
+MILD = {"temperature": 15, "precipitation": 0, "windspeed": 5}
+
+
+def names(trails):
+    return [t.name for t in trails]
+
+
+def test_rain_prefers_paved_low_mud():
+    ranked = rank_trails(TRAILS, RAIN)
+    assert names(s.trail for s in ranked) == ["Waterfront Path", "Park Trail", "Ravine Loop"]
+    assert ranked[0].factors["wet_paved"] > 0
+    assert ranked[-1].factors["wet_mud"] < 0
+
+
+def test_heat_prefers_shade():
+    assert rank_trails(TRAILS, HEAT)[0].trail is MUDDY
+
+
+def test_mild_weather_is_neutral_and_keeps_catalog_order():
+    ranked = rank_trails(TRAILS, MILD)
+    assert all(s.score == 0 and not s.factors for s in ranked)
+    assert [s.trail for s in ranked] == TRAILS
+
+
+def test_city_weather_overrides_per_trail():
+    ranked = rank_trails(TRAILS, MILD, city_weather={"pickering": RAIN})
+    assert ranked[0].trail is PAVED and ranked[0].score > 0  # only Pickering got rain
+    assert all(s.score == 0 for s in ranked[1:])
+
+
+def test_shortlist_keeps_every_city_when_scores_tie():
+    catalog = [Trail(f"S{i}", "Seattle") for i in range(5)] + [Trail(f"P{i}", "Portland") for i in range(5)]
+    short = shortlist_trails(catalog, MILD, top_k=5)
+    assert len(short) == 5
+    assert {t.location for t in short} == {"Seattle", "Portland"}
+    assert short == [t for t in catalog if t in short]  # catalog order is kept
+
+
+def test_shortlist_fills_remaining_slots_by_score():
+    extra = [Trail(f"Paved {i}", "Pickering", terrain_type="Paved", mud_rain_risk="Low") for i in range(3)]
+    short = shortlist_trails(TRAILS + extra, RAIN, top_k=4)
+    assert {t.location for t in short} == {"Scarborough", "Pickering", "Markham"}
+    assert MUDDY in short  # its city's only trail
+    assert len(short) == 4
+
+
+def test_shortlist_returns_all_when_few_or_disabled():
+    assert shortlist_trails(TRAILS, RAIN, top_k=5) == TRAILS
+    assert shortlist_trails(TRAILS, RAIN, top_k=0) == TRAILS
+
+
+def test_features_cached_per_catalog_and_sliced_for_candidates(monkeypatch):
+    catalog = list(TRAILS)
+    assert get_trail_features(catalog, "v1") is get_trail_features(catalog, "v1")
+    assert get_trail_features(list(TRAILS), "v1") is not get_trail_features(catalog, "v1")
+
+    built = []
+    original = TrailFeatures.__init__
+
+    def counting(self, trails):
+        built.append(len(trails))
+        original(self, trails)
+
+    monkeypatch.setattr(TrailFeatures, "__init__", counting)
+    get_trail_features(catalog, "v2")
+    built.clear()
+    ranked = rank_trails([MIXED, MUDDY], RAIN, catalog=catalog, version="v2")
+    assert built == []  # rows come from the cached catalog features
+    assert [s.trail for s in ranked] == [MIXED, MUDDY]
+    assert ranked == rank_trails([MIXED, MUDDY], RAIN)
+
+
+def test_rule_based_recommendation_shape():
+    out = rule_based_recommendation(TRAILS, RAIN)
+    assert set(out) == {"trail_name", "location", "reason", "cautions"}
+    assert (out["trail_name"], out["location"]) == ("Waterfront Path", "Pickering")
+    assert "paved surface" in out["reason"]
+    assert "Exposed shoreline" in out["cautions"]
+
+
+def test_rule_based_recommendation_without_candidates():
+    out = rule_based_recommendation([], RAIN)
+    assert out["trail_name"] is None and out["reason"]